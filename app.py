@@ -5,43 +5,235 @@ Author: Jo$h
 REST API for making predictions on Ronin trader data.
 """
 
-from flask import Flask, request, jsonify
-import pickle
+from flask import Flask, Response, g, request, jsonify
+import json
+import math
 import numpy as np
 import traceback
 import os
+import queue
+import time
+
+import batch_formats
+from batching import batcher_from_env
+from cache import get_shared_cache
+from fast_json import FastJSONProvider
+from inference import FOREST_FILE
+from memstats import format_memory, memory_usage
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics_from_env
+from profiling import TOKEN_HEADER as PROFILE_TOKEN_HEADER, profiling_from_env
+from registry import ModelRegistry, ModelReloader, load_files
+from shadow import experiment_from_env
 
 app = Flask(__name__)
+# orjson-backed responses when orjson is installed
+app.json = FastJSONProvider(app)
+
+# Request counts, latencies and per-stage timings served at /metrics
+metrics = metrics_from_env()
+
+# Opt-in request and worker profiling (PROFILING_ENABLED, PROFILING_TOKEN)
+profiler = profiling_from_env()
+PROFILED_ENDPOINTS = ('/predict', '/predict_batch', '/predict_wallet/<address>')
 
-# Global variables for model and features
+# The model being served (registry.LoadedModel). Requests read it once and
+# use that snapshot throughout, so a hot reload never mixes two versions
+# within a request. model and feature_names mirror it for callers that
+# only need the current values.
+active = None
 model = None
 feature_names = None
+prediction_cache = None
+reloader = None
+
+def activate(loaded):
+    """Swap in a loaded (and warmed-up) model version."""
+    global active, model, feature_names
+    active = loaded
+    model, feature_names = loaded.model, loaded.feature_names
+    if prediction_cache is not None:
+        # Cached predictions came from the previous version
+        prediction_cache.clear()
+
+def current_model():
+    """The active model for a new request; starts the reloader in this process."""
+    if reloader is not None:
+        reloader.ensure_running()
+    return active
 
 def load_model():
     """Load the trained model and feature names at startup."""
-    global model, feature_names
+    global prediction_cache, reloader
     
     model_path = os.getenv('MODEL_PATH', 'models/best_model_random_forest.pkl')
     features_path = os.getenv('FEATURES_PATH', 'models/feature_names.pkl')
+    packed_model_dir = os.getenv('PACKED_MODEL_DIR')
+    registry_dir = os.getenv('MODEL_REGISTRY_DIR')
+    engine = os.getenv('INFERENCE_ENGINE', 'auto')
     
     print("Loading model...")
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
+    if registry_dir:
+        # Versioned registry: serve CURRENT and hot-reload when it changes
+        registry = ModelRegistry(registry_dir)
+        loaded = registry.load(engine=engine)
+        reloader = ModelReloader(registry, activate, engine=engine,
+                                 interval=float(os.getenv('MODEL_RELOAD_INTERVAL', 10)),
+                                 active_version=loaded.version)
+        watch_path = registry.current_path
+        engine = f"{engine}, registry {loaded.version}"
+    else:
+        # Read-only memory map of a packed export: pages are shared by every
+        # process mapping it
+        loaded = load_files(model_path, features_path, engine, packed_model_dir)
+        # forest.json is written last by save(), so it marks a new export;
+        # a pickle's own export is only served while the pickle is unchanged
+        if os.path.isdir(loaded.source):
+            watch_path = os.path.join(loaded.source, FOREST_FILE)
+        else:
+            watch_path = model_path
+        if getattr(loaded.model, 'path', None):
+            # A native export (INFERENCE_ENGINE=auto), a forest directory or PACKED_MODEL_DIR
+            engine = f'packed (mmap {loaded.model.path})'
+    
+    if os.getenv('MODEL_WARMUP', '1').lower() in ('1', 'true', 'yes'):
+        loaded.warm_up()
+    activate(loaded)
     
-    print("Loading feature names...")
-    with open(features_path, 'rb') as f:
-        feature_names = pickle.load(f)
+    # Optional LRU cache of predictions (PREDICTION_CACHE_* env vars)
+    prediction_cache = get_shared_cache(watch_path)
     
-    print(f"✅ Model loaded successfully!")
+    print(f"✅ Model loaded successfully! (engine: {engine}, {loaded.load_seconds}s)")
     print(f"✅ Feature names: {feature_names}")
+    print(f"✅ Memory: {format_memory(memory_usage())}")
 
 # Load model when app starts
 load_model()
 
-@app.route('/', methods=['GET'])
-def home():
-    """Home endpoint with API information."""
-    return jsonify({
+def validate_trader(trader, feature_names=None):
+    """
+    Validate a single trader record against the expected features.
+
+    Returns None when the record is valid, otherwise a JSON-serializable
+    error payload describing the first problem found.
+    """
+    if feature_names is None:
+        feature_names = active.feature_names
+    if not isinstance(trader, dict):
+        return {
+            'error': 'Trader must be a JSON object',
+            'received_type': type(trader).__name__
+        }
+
+    missing_features = set(feature_names) - set(trader.keys())
+    if missing_features:
+        return {
+            'error': 'Missing required features',
+            'missing': list(missing_features),
+            'required_features': feature_names
+        }
+
+    for feature in feature_names:
+        value = trader[feature]
+        if not isinstance(value, (int, float)):
+            return {
+                'error': f'Feature "{feature}" must be a number',
+                'received_type': type(value).__name__
+            }
+
+        # json.loads accepts NaN and Infinity
+        if isinstance(value, float) and not math.isfinite(value):
+            return {
+                'error': f'Feature "{feature}" must be a finite number',
+                'received_value': None if math.isnan(value) else str(value)
+            }
+        # Both engines score in float32, where larger values overflow
+        if abs(value) > batch_formats.MAX_VALUE:
+            return {
+                'error': f'Feature "{feature}" is out of range',
+                'received_value': str(value),
+                'max_value': batch_formats.MAX_VALUE
+            }
+
+        if value < 0:
+            return {
+                'error': f'Feature "{feature}" cannot be negative',
+                'received_value': value
+            }
+
+    return None
+
+def score(features, model=None):
+    """
+    Score a (n_samples, n_features) float64 matrix with one model call.
+
+    Args:
+        features (np.ndarray): Feature matrix
+        model: Model to use (default: the active one)
+
+    Returns:
+        tuple: (labels, probabilities) where labels are derived from the
+        probabilities exactly like model.predict does
+    """
+    if model is None:
+        model = current_model().model
+    metrics.inference(len(features))
+    probabilities = model.predict_proba(features)
+    labels = model.classes_.take(np.argmax(probabilities, axis=1))
+    return labels, probabilities
+
+def format_prediction(label, probability, fields=batch_formats.RESULT_FIELDS):
+    """Build the response fields for one scored row."""
+    result = {
+        'prediction': 'Good Trader' if label == 1 else 'Bad Trader',
+        'will_remain_active': bool(label),
+        'confidence': float(max(probability)),
+        'probability_good_trader': float(probability[1]),
+        'probability_bad_trader': float(probability[0])
+    }
+    if fields is not batch_formats.RESULT_FIELDS:
+        result = {name: result[name] for name in fields if name in result}
+    return result
+
+def _flag(args, name, default):
+    return str(args.get(name, default)).lower() in ('1', 'true', 'yes')
+
+def response_options(args, batch=False):
+    """
+    Response shaping options from query parameters.
+
+    ?fields=a,b returns only the listed fields, ?compact=true returns just
+    will_remain_active and probability_good_trader (as parallel arrays for
+    batches). Batches also take ?format= and ?include_inputs=.
+    """
+    options = {
+        'fields': args.get('fields'),
+        'compact': _flag(args, 'compact', False)
+    }
+    if batch:
+        options['response_format'] = args.get('format')
+        options['include_inputs'] = _flag(args, 'include_inputs', True)
+    return options
+
+# Optional micro-batching of concurrent /predict calls (MICROBATCH_* env vars)
+batcher = batcher_from_env(score)
+
+# Optional challenger models, shadow-scored on sampled traffic and/or served
+# to a weighted share of requests (CHALLENGER_MODELS, SHADOW_*, AB_WEIGHTS)
+challengers, shadow_scorer, ab_split = experiment_from_env(feature_names)
+
+# Per-wallet features for /predict_wallet (FEATURE_STORE_PATH), if built.
+# feature_store.py needs pandas, so it is only imported when a store exists
+feature_store = None
+if os.path.exists(os.getenv('FEATURE_STORE_PATH', 'models/feature_store.sqlite')):
+    from feature_store import store_from_env
+    feature_store = store_from_env()
+
+# Response builders shared by the Flask views and the ASGI app (asgi_app.py).
+# Each returns a JSON-serializable body and an HTTP status code.
+
+def api_info():
+    """API information served by GET /."""
+    return {
         'service': 'Ronin Trader Classification API',
         'version': '1.0',
         'author': 'Jo$h',
@@ -50,23 +242,453 @@ def home():
             '/': 'GET - API information',
             '/health': 'GET - Health check',
             '/predict': 'POST - Make a single prediction',
-            '/predict_batch': 'POST - Make batch predictions'
+            '/predict_batch': 'POST - Make batch predictions',
+            '/predict_wallet/<address>': 'GET - Predict from stored wallet features',
+            '/metrics': 'GET - Prometheus metrics'
         },
         'model': 'Random Forest',
         'model_performance': {
             'accuracy': '91.4%',
             'roc_auc': '0.9646'
         }
-    })
+    }
+
+def health_status():
+    """Service status served by GET /health."""
+    loaded = current_model()
+    status = {
+        'status': 'healthy',
+        'model_loaded': loaded.model is not None,
+        'features_loaded': loaded.feature_names is not None,
+        'model': loaded.info()
+    }
+    if getattr(loaded.model, 'compression', None):
+        status['model_variant'] = loaded.model.compression
+    if reloader is not None:
+        status['model_reload'] = reloader.stats()
+    if shadow_scorer is not None:
+        status['shadow'] = shadow_scorer.stats()
+    if ab_split is not None:
+        status['ab_test'] = ab_split.stats()
+    if batcher is not None:
+        status['micro_batching'] = batcher.stats()
+    if prediction_cache is not None:
+        status['prediction_cache'] = prediction_cache.stats()
+    if feature_store is not None:
+        status['feature_store'] = {'path': feature_store.path,
+                                   'watermark': feature_store.watermark}
+    return status
+
+def features_info():
+    """Feature names and descriptions served by GET /features."""
+    return {
+        'required_features': active.feature_names,
+        'descriptions': {
+            'tx_count_365d': 'Total number of transactions in the past 365 days',
+            'total_volume': 'Total transaction volume in USD',
+            'active_weeks': 'Number of weeks the user was active',
+            'avg_tx_value': 'Average value per transaction in USD',
+            'tx_per_active_week': 'Average transactions per active week'
+        },
+        'example': {
+            'tx_count_365d': 150,
+            'total_volume': 25.5,
+            'active_weeks': 20,
+            'avg_tx_value': 0.17,
+            'tx_per_active_week': 7.5
+        }
+    }
+
+def error_response(error, exc):
+    """500 body for an unexpected exception; call from its except block."""
+    return {
+        'error': error,
+        'message': str(exc),
+        'traceback': traceback.format_exc()
+    }, 500
+
+def choose_model(key=None):
+    """
+    The model for a new request: the active one, or a challenger when an
+    A/B split is configured and picks one.
+
+    Returns:
+        tuple: (LoadedModel, A/B arm name or None, whether it is a challenger)
+    """
+    loaded = current_model()
+    if ab_split is None:
+        return loaded, None, False
+    variant, challenger = ab_split.choose(key)
+    if challenger is None:
+        return loaded, variant, False
+    return challenger, variant, True
+
+def admin_profile_response(token, args):
+    """Start a worker profile for /admin/profile?seconds=N."""
+    if profiler is None:
+        return {'error': 'Not found'}, 404
+    if not profiler.authorized(token):
+        return {'error': f'Missing or wrong {PROFILE_TOKEN_HEADER}'}, 403
+    try:
+        seconds = float(args.get('seconds', 10))
+    except ValueError:
+        return {'error': 'seconds must be a number'}, 400
+    if not math.isfinite(seconds) or seconds <= 0:
+        return {'error': 'seconds must be a positive number',
+                'max_seconds': profiler.max_seconds}, 400
+    # Longer runs are cut to PROFILING_MAX_SECONDS
+    seconds = min(seconds, profiler.max_seconds)
+    body = profiler.start_worker_profile(seconds, include_idle=_flag(args, 'idle', False))
+    if body is None:
+        return {'error': 'A worker profile is already running',
+                'max_concurrent': profiler.max_concurrent}, 429
+    body['result'] = f"/admin/profile/{body['id']}"
+    return body, 202
+
+def admin_profile_result(profile_id, token):
+    """
+    A saved profile for GET /admin/profile/<id>.
+
+    Returns:
+        tuple: (body, status, mimetype); the profile itself is returned as
+        bytes (collapsed stacks as text, pstats as binary)
+    """
+    if profiler is None:
+        return {'error': 'Not found'}, 404, batch_formats.JSON
+    if not profiler.authorized(token):
+        return {'error': f'Missing or wrong {PROFILE_TOKEN_HEADER}'}, 403, batch_formats.JSON
+    
+    path = profiler.find(profile_id)
+    if path == 'running':
+        return {'id': profile_id, 'status': 'running'}, 202, batch_formats.JSON
+    if path is None:
+        # Profiles live in PROFILING_DIR; another worker's run appears once saved
+        return {'error': 'Unknown profile', 'id': profile_id}, 404, batch_formats.JSON
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.pstats'):
+        return data, 200, 'application/octet-stream'
+    return data, 200, 'text/plain'
+
+def predict_response(data, fields=None, compact=False, ab_key=None):
+    """
+    Score one trader for POST /predict.
+
+    ab_key pins the A/B arm (e.g. to a wallet address) instead of picking
+    one at random.
+    """
+    try:
+        fields = batch_formats.parse_fields(fields, compact)
+    except batch_formats.BatchFormatError as e:
+        return {'error': str(e)}, 400
+    
+    if not data:
+        return {'error': 'No data provided'}, 400
+    
+    loaded, variant, is_challenger = choose_model(ab_key)
+    
+    # Validate required features and values
+    started = time.perf_counter()
+    error = validate_trader(data, loaded.feature_names)
+    started = metrics.stage('/predict', 'validate', started)
+    if error:
+        return error, 400
+    
+    # Feature values in correct order
+    values = [data[feat] for feat in loaded.feature_names]
+    started = metrics.stage('/predict', 'array', started)
+    
+    # The cache and micro-batcher only ever hold the active model's outputs
+    cached = None
+    if prediction_cache is not None and not is_challenger:
+        cached = prediction_cache.get(values)
+    if cached is not None:
+        label, probability = cached
+    # Make prediction, coalesced with concurrent requests when enabled
+    # (a coalesced batch is scored by whichever version is active then)
+    elif batcher is not None and not is_challenger:
+        try:
+            label, probability = batcher.submit(values).result()
+        except queue.Full:
+            return {'error': 'Server busy, prediction queue is full'}, 503
+    else:
+        labels, probabilities = score(np.array([values], dtype=np.float64), loaded.model)
+        label, probability = labels[0], probabilities[0].tolist()
+    started = metrics.stage('/predict', 'inference', started)
+    
+    # Skip caching if a reload swapped the model (and cleared the cache) meanwhile
+    if cached is None and prediction_cache is not None and loaded is active:
+        prediction_cache.put(values, (label, probability))
+    
+    if shadow_scorer is not None and not is_challenger:
+        shadow_scorer.maybe_submit(np.array([values], dtype=np.float64),
+                                   np.array([probability]))
+    
+    result = format_prediction(label, probability, fields)
+    if 'input_features' in fields:
+        result['input_features'] = data
+    if variant is not None:
+        result['ab_variant'] = variant
+    metrics.stage('/predict', 'format', started)
+    metrics.predicted(int(label == 1))
+    
+    return result, 200
+
+def predict_wallet_response(address, fields=None, compact=False):
+    """Score a wallet from its stored features for GET /predict_wallet/<address>."""
+    if feature_store is None:
+        return {'error': 'Feature store not available',
+                'message': 'Build one with feature_store.py and set FEATURE_STORE_PATH'}, 503
+    from feature_store import is_wallet_address, normalize_wallet
+    
+    wallet = normalize_wallet(address)
+    if not is_wallet_address(wallet):
+        return {'error': 'Invalid wallet address', 'received_value': address}, 400
+    
+    started = time.perf_counter()
+    features = feature_store.get(wallet)
+    metrics.stage('/predict_wallet/<address>', 'lookup', started)
+    if features is None:
+        return {'error': 'No transactions for wallet in the last 365 days',
+                'wallet': wallet}, 404
+    
+    body, status = predict_response(features, fields, compact, ab_key=wallet)
+    if status == 200:
+        body['wallet'] = wallet
+    return body, status
+
+def decode_batch(body, content_type=batch_formats.JSON, feature_names=None):
+    """
+    Turn a /predict_batch body into a feature matrix.
+
+    Args:
+        body (bytes): Raw request body
+        content_type (str): Request mimetype; selects JSON, Arrow or raw float64
+        feature_names (list): Column order (default: the active model's)
+
+    Returns:
+        tuple: (X, valid, errors, inputs, layout) where valid marks the rows
+        that passed validation, errors describes the others by index, inputs
+        holds the original JSON objects for row-oriented requests (else None)
+        and layout names the request format
+    """
+    if feature_names is None:
+        feature_names = active.feature_names
+    started = time.perf_counter()
+    if content_type == batch_formats.ARROW:
+        X = batch_formats.decode_arrow(body, feature_names)
+        errors, inputs, layout = [], None, 'arrow'
+        started = metrics.stage('/predict_batch', 'parse', started)
+    elif content_type == batch_formats.RAW:
+        X = batch_formats.decode_raw(body, feature_names)
+        errors, inputs, layout = [], None, 'raw'
+        started = metrics.stage('/predict_batch', 'parse', started)
+    else:
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            raise batch_formats.BatchFormatError('Request body is not valid JSON')
+        started = metrics.stage('/predict_batch', 'parse', started)
+        if batch_formats.is_columnar(data, feature_names):
+            X, errors = batch_formats.decode_columnar_json(data, feature_names)
+            inputs, layout = None, 'columnar'
+            started = metrics.stage('/predict_batch', 'array', started)
+        else:
+            X, errors, inputs = decode_rows(data, feature_names)
+            layout = 'rows'
+
+    if layout != 'rows':
+        # Rows already went through validate_trader one by one
+        errors = errors + batch_formats.validate_matrix(
+            X, feature_names, skip=[error['index'] for error in errors])
+        errors.sort(key=lambda error: error['index'])
+        metrics.stage('/predict_batch', 'validate', started)
+
+    valid = np.ones(len(X), dtype=bool)
+    valid[[error['index'] for error in errors]] = False
+    return X, valid, errors, inputs, layout
+
+def decode_rows(data, feature_names=None):
+    """Validate a {"traders": [...]} body; bad rows are reported, not fatal."""
+    if feature_names is None:
+        feature_names = active.feature_names
+    if not data or 'traders' not in data:
+        raise batch_formats.BatchFormatError('No traders data provided')
+    
+    traders = data['traders']
+    
+    if not isinstance(traders, list):
+        raise batch_formats.BatchFormatError('traders must be a list')
+    
+    if len(traders) == 0:
+        raise batch_formats.BatchFormatError('traders list is empty')
+    
+    started = time.perf_counter()
+    X = np.full((len(traders), len(feature_names)), np.nan)
+    rows = []
+    valid_indices = []
+    errors = []
+    for i, trader in enumerate(traders):
+        error = validate_trader(trader, feature_names)
+        if error:
+            error['index'] = i
+            errors.append(error)
+            continue
+        rows.append([trader[feat] for feat in feature_names])
+        valid_indices.append(i)
+    started = metrics.stage('/predict_batch', 'validate', started)
+    
+    if rows:
+        X[valid_indices] = np.array(rows, dtype=np.float64)
+    metrics.stage('/predict_batch', 'array', started)
+    return X, errors, traders
+
+def predict_batch_response(body, content_type=batch_formats.JSON, accept=None,
+                           response_format=None, include_inputs=True,
+                           fields=None, compact=False):
+    """
+    Score many traders for POST /predict_batch.
+
+    Args:
+        body (bytes): Raw request body (JSON rows, columnar JSON, Arrow or raw)
+        content_type (str): Request mimetype
+        accept (str): Accept header, used when response_format is not given
+        response_format (str): 'rows', 'columnar', 'arrow' or 'raw'
+            (default: same layout as the request)
+        include_inputs (bool): Echo the input features in the response
+        fields (str): Comma-separated result fields to return (default: all)
+        compact (bool): Return only will_remain_active and
+            probability_good_trader, as parallel arrays unless a format is given
+
+    Returns:
+        tuple: (body, status, mimetype) where body is a JSON-serializable
+        dict for JSON responses and bytes for Arrow/raw responses
+    """
+    loaded, variant, is_challenger = choose_model()
+    model, feature_names = loaded.model, loaded.feature_names
+    try:
+        fields = batch_formats.parse_fields(fields, compact)
+        if not include_inputs:
+            fields = tuple(name for name in fields if name != 'input_features')
+        X, valid, errors, inputs, layout = decode_batch(body, content_type, feature_names)
+        if compact and not response_format and layout == 'rows':
+            response_format = 'columnar'
+        response_format = batch_formats.negotiate(response_format, accept, layout)
+    except batch_formats.BatchFormatError as e:
+        return {'error': str(e)}, 400, batch_formats.JSON
+    
+    n_scored = int(np.count_nonzero(valid))
+    if n_scored == 0:
+        return {
+            'error': 'No valid traders in batch',
+            'errors': errors
+        }, 400, batch_formats.JSON
+    
+    # One contiguous matrix, one model call for the whole batch
+    started = time.perf_counter()
+    if n_scored == len(X):
+        labels, probabilities = score(X, model)
+    else:
+        labels = np.zeros(len(X), dtype=model.classes_.dtype)
+        probabilities = np.full((len(X), model.n_classes_), np.nan)
+        labels[valid], probabilities[valid] = score(X[valid], model)
+    started = metrics.stage('/predict_batch', 'inference', started)
+    
+    if shadow_scorer is not None and not is_challenger:
+        shadow_scorer.maybe_submit(X[valid], probabilities[valid])
+    
+    # Summary statistics
+    good_traders = int(np.count_nonzero(labels[valid] == 1))
+    summary = {
+        'total': len(X),
+        'scored': n_scored,
+        'failed': len(errors),
+        'good_traders': good_traders,
+        'bad_traders': n_scored - good_traders,
+        'percentage_good': round(good_traders / n_scored * 100, 2)
+    }
+    if variant is not None:
+        summary['ab_variant'] = variant
+    result = {'X': X, 'valid': valid, 'labels': labels,
+              'probabilities': probabilities, 'errors': errors, 'summary': summary}
+    
+    metrics.batch_size('/predict_batch', len(X))
+    metrics.predicted(good_traders, n_scored)
+    
+    mimetype = batch_formats.MIMETYPES[response_format]
+    if response_format == 'columnar':
+        body = batch_formats.encode_columnar(result, feature_names, fields)
+    elif response_format == 'arrow':
+        body = batch_formats.encode_arrow(result, feature_names, fields)
+    elif response_format == 'raw':
+        body = batch_formats.encode_raw(result)
+    else:
+        results = []
+        for i in np.flatnonzero(valid).tolist():
+            result = {'index': i}
+            result.update(format_prediction(labels[i], probabilities[i].tolist(), fields))
+            if 'input_features' in fields:
+                result['input_features'] = (inputs[i] if inputs is not None
+                                            else dict(zip(feature_names, X[i].tolist())))
+            results.append(result)
+        body = {
+            'predictions': results,
+            'errors': errors,
+            'summary': summary
+        }
+    metrics.stage('/predict_batch', 'format', started)
+    
+    return body, 200, mimetype
+
+def json_response(body, status, endpoint):
+    """jsonify a response body, timed as the endpoint's serialize stage."""
+    started = time.perf_counter()
+    try:
+        response = jsonify(body)
+    except Exception as e:
+        # A JSON 500 like any other failure, not Flask's HTML error page
+        body, status = error_response('Response encoding failed', e)
+        response = jsonify(body)
+    metrics.stage(endpoint, 'serialize', started)
+    return response, status
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = metrics.start_request()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.finish_request(endpoint, request.method, response.status_code, started)
+    return response
+
+@app.before_request
+def start_request_profile():
+    if (profiler is not None and request.url_rule is not None
+            and request.url_rule.rule in PROFILED_ENDPOINTS):
+        g.profile = profiler.start_request(request.args, request.headers)
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        report, headers = profiler.finish_request(profile)
+        if profile.inline:
+            response = Response(report, status=response.status_code, mimetype='text/plain')
+        response.headers.update(headers)
+    return response
+
+@app.route('/', methods=['GET'])
+def home():
+    """Home endpoint with API information."""
+    return jsonify(api_info())
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'model_loaded': model is not None,
-        'features_loaded': feature_names is not None
-    })
+    return jsonify(health_status())
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -90,62 +712,18 @@ def predict():
         "probability_good_trader": 0.95,
         "probability_bad_trader": 0.05
     }
+    
+    ?fields=a,b returns only the listed fields; ?compact=true returns only
+    will_remain_active and probability_good_trader.
     """
     try:
-        # Get JSON data from request
+        started = time.perf_counter()
         data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Validate required features
-        missing_features = set(feature_names) - set(data.keys())
-        if missing_features:
-            return jsonify({
-                'error': 'Missing required features',
-                'missing': list(missing_features),
-                'required_features': feature_names
-            }), 400
-        
-        # Validate feature values
-        for feature in feature_names:
-            if not isinstance(data[feature], (int, float)):
-                return jsonify({
-                    'error': f'Feature "{feature}" must be a number',
-                    'received_type': type(data[feature]).__name__
-                }), 400
-            
-            if data[feature] < 0:
-                return jsonify({
-                    'error': f'Feature "{feature}" cannot be negative',
-                    'received_value': data[feature]
-                }), 400
-        
-        # Create feature array in correct order
-        features = np.array([[data[feat] for feat in feature_names]])
-        
-        # Make prediction
-        prediction = model.predict(features)[0]
-        probability = model.predict_proba(features)[0]
-        
-        # Prepare response
-        result = {
-            'prediction': 'Good Trader' if prediction == 1 else 'Bad Trader',
-            'will_remain_active': bool(prediction),
-            'confidence': float(max(probability)),
-            'probability_good_trader': float(probability[1]),
-            'probability_bad_trader': float(probability[0]),
-            'input_features': data
-        }
-        
-        return jsonify(result), 200
-    
+        metrics.stage('/predict', 'parse', started)
+        body, status = predict_response(data, **response_options(request.args))
     except Exception as e:
-        return jsonify({
-            'error': 'Prediction failed',
-            'message': str(e),
-            'traceback': traceback.format_exc()
-        }), 500
+        body, status = error_response('Prediction failed', e)
+    return json_response(body, status, '/predict')
 
 @app.route('/predict_batch', methods=['POST'])
 def predict_batch():
@@ -182,97 +760,87 @@ def predict_batch():
             },
             ...
         ],
+        "errors": [
+            {"index": 3, "error": "Missing required features", ...}
+        ],
         "summary": {
             "total": 2,
+            "scored": 2,
+            "failed": 0,
             "good_traders": 1,
             "bad_traders": 1
         }
     }
+    
+    Invalid traders are reported in "errors" by index and do not abort the
+    rest of the batch; a 400 is only returned when no trader is valid.
+    
+    Columnar JSON ({"tx_count_365d": [...], ...}), Arrow IPC streams
+    (application/vnd.apache.arrow.stream) and raw little-endian float64 rows
+    (application/octet-stream) are also accepted. The response format follows
+    the request unless ?format= or the Accept header asks for another one;
+    ?include_inputs=false drops the echoed input features, ?fields= picks
+    the result fields and ?compact=true returns parallel arrays of
+    will_remain_active and probability_good_trader only.
     """
     try:
-        # Get JSON data from request
-        data = request.get_json()
-        
-        if not data or 'traders' not in data:
-            return jsonify({'error': 'No traders data provided'}), 400
-        
-        traders = data['traders']
-        
-        if not isinstance(traders, list):
-            return jsonify({'error': 'traders must be a list'}), 400
-        
-        if len(traders) == 0:
-            return jsonify({'error': 'traders list is empty'}), 400
-        
-        # Process each trader
-        results = []
-        for i, trader in enumerate(traders):
-            # Validate features
-            missing_features = set(feature_names) - set(trader.keys())
-            if missing_features:
-                return jsonify({
-                    'error': f'Trader at index {i} is missing features',
-                    'missing': list(missing_features)
-                }), 400
-            
-            # Create feature array
-            features = np.array([[trader[feat] for feat in feature_names]])
-            
-            # Make prediction
-            prediction = model.predict(features)[0]
-            probability = model.predict_proba(features)[0]
-            
-            results.append({
-                'index': i,
-                'prediction': 'Good Trader' if prediction == 1 else 'Bad Trader',
-                'will_remain_active': bool(prediction),
-                'confidence': float(max(probability)),
-                'probability_good_trader': float(probability[1]),
-                'probability_bad_trader': float(probability[0]),
-                'input_features': trader
-            })
-        
-        # Summary statistics
-        good_traders = sum(1 for r in results if r['will_remain_active'])
-        bad_traders = len(results) - good_traders
-        
-        return jsonify({
-            'predictions': results,
-            'summary': {
-                'total': len(results),
-                'good_traders': good_traders,
-                'bad_traders': bad_traders,
-                'percentage_good': round(good_traders / len(results) * 100, 2)
-            }
-        }), 200
+        body, status, mimetype = predict_batch_response(
+            request.get_data(),
+            content_type=request.mimetype,
+            accept=request.headers.get('Accept'),
+            **response_options(request.args, batch=True)
+        )
+    except Exception as e:
+        body, status = error_response('Batch prediction failed', e)
+        mimetype = batch_formats.JSON
+    if isinstance(body, bytes):
+        return Response(body, status=status, mimetype=mimetype)
+    return json_response(body, status, '/predict_batch')
+
+@app.route('/predict_wallet/<address>', methods=['GET'])
+def predict_wallet(address):
+    """
+    Predict for a wallet by address, from the features in the feature store.
     
+    Returns the /predict response plus "wallet"; 404 when the wallet has no
+    transactions in the window. Takes the same ?fields= and ?compact= options.
+    """
+    try:
+        body, status = predict_wallet_response(address, **response_options(request.args))
     except Exception as e:
-        return jsonify({
-            'error': 'Batch prediction failed',
-            'message': str(e),
-            'traceback': traceback.format_exc()
-        }), 500
+        body, status = error_response('Prediction failed', e)
+    return json_response(body, status, '/predict_wallet/<address>')
 
 @app.route('/features', methods=['GET'])
 def get_features():
     """Return the required feature names and descriptions."""
-    return jsonify({
-        'required_features': feature_names,
-        'descriptions': {
-            'tx_count_365d': 'Total number of transactions in the past 365 days',
-            'total_volume': 'Total transaction volume in USD',
-            'active_weeks': 'Number of weeks the user was active',
-            'avg_tx_value': 'Average value per transaction in USD',
-            'tx_per_active_week': 'Average transactions per active week'
-        },
-        'example': {
-            'tx_count_365d': 150,
-            'total_volume': 25.5,
-            'active_weeks': 20,
-            'avg_tx_value': 0.17,
-            'tx_per_active_week': 7.5
-        }
-    })
+    return jsonify(features_info())
+
+@app.route('/admin/profile', methods=['GET'])
+def admin_profile():
+    """
+    Sample this worker's CPU for ?seconds=N (default 10) in the background.
+    
+    Needs PROFILING_ENABLED and, when PROFILING_TOKEN is set, the
+    X-Profile-Token header. Returns 202 with the id to fetch from
+    /admin/profile/<id> once the run is over.
+    """
+    body, status = admin_profile_response(request.headers.get(PROFILE_TOKEN_HEADER), request.args)
+    return jsonify(body), status
+
+@app.route('/admin/profile/<profile_id>', methods=['GET'])
+def admin_profile_file(profile_id):
+    """Return a saved profile: collapsed stacks (text) or pstats (binary)."""
+    body, status, mimetype = admin_profile_result(
+        profile_id, request.headers.get(PROFILE_TOKEN_HEADER))
+    if isinstance(body, bytes):
+        return Response(body, status=status, mimetype=mimetype)
+    return jsonify(body), status
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, stage and prediction metrics in the Prometheus text format."""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
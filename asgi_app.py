@@ -0,0 +1,278 @@
+"""
+Ronin Trader Classification - ASGI API
+Author: Jo$h
+
+Async variant of the Flask API with the same endpoints and JSON contract
+(/, /health, /predict, /predict_batch, /predict_wallet/<address>,
+/features, /metrics, /admin/profile). Request bodies are read asynchronously, so slow uploads never
+tie up a worker, and parsing plus inference run in a bounded thread pool. When more than ASGI_MAX_PENDING
+requests are waiting for the pool, new ones get a 503 instead of queueing
+without limit.
+
+The model, validation and response building are shared with app.py.
+
+Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qsl
+
+import app as api
+from fast_json import dumps
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+
+class ServerBusy(Exception):
+    """Raised when the inference executor's queue is full."""
+
+
+class InferenceExecutor:
+    """
+    Thread pool with a cap on queued work, used for JSON parsing and inference.
+    """
+
+    def __init__(self, threads=4, max_pending=64):
+        """
+        Args:
+            threads (int): Threads running inference concurrently
+            max_pending (int): Requests allowed to wait or run before 503
+        """
+        self.threads = threads
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix='inference')
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the pool, or raise ServerBusy if it is saturated."""
+        # Only the event loop thread touches `pending`, so no lock is needed
+        if self.pending >= self.max_pending:
+            raise ServerBusy()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+executor = InferenceExecutor(
+    threads=int(os.getenv('ASGI_INFERENCE_THREADS', 4)),
+    max_pending=int(os.getenv('ASGI_MAX_PENDING', 64))
+)
+
+
+def _query(scope):
+    return dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+
+
+def _headers(scope):
+    return {name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])}
+
+
+def _parse_and_run(response_fn, endpoint, error, body, **options):
+    """Parse a JSON body and build the response; runs in the executor."""
+    try:
+        started = time.perf_counter()
+        data = json.loads(body)
+        api.metrics.stage(endpoint, 'parse', started)
+        return response_fn(data, **options)
+    except Exception as e:
+        return api.error_response(error, e)
+
+
+def _run_batch(body, headers, options):
+    """Decode, score and encode a /predict_batch request in the executor."""
+    try:
+        return api.predict_batch_response(
+            body,
+            content_type=headers.get('content-type', api.batch_formats.JSON).split(';')[0].strip(),
+            accept=headers.get('accept'),
+            **options
+        )
+    except Exception as e:
+        return api.error_response('Batch prediction failed', e)
+
+
+async def home(scope, body):
+    return api.api_info(), 200
+
+
+async def health(scope, body):
+    status = api.health_status()
+    status['inference_executor'] = {
+        'threads': executor.threads,
+        'pending': executor.pending,
+        'max_pending': executor.max_pending
+    }
+    return status, 200
+
+
+async def features(scope, body):
+    return api.features_info(), 200
+
+
+async def predict(scope, body):
+    options = api.response_options(_query(scope))
+    return await executor.run(partial(_parse_and_run, api.predict_response, '/predict',
+                                      'Prediction failed', body, **options))
+
+
+async def metrics(scope, body):
+    return api.metrics.render().encode(), 200, METRICS_CONTENT_TYPE
+
+
+async def admin_profile(scope, body):
+    return api.admin_profile_response(
+        _headers(scope).get(api.PROFILE_TOKEN_HEADER.lower()), _query(scope))
+
+
+async def admin_profile_file(scope, body):
+    profile_id = scope['path'][len('/admin/profile/'):].rstrip('/')
+    return api.admin_profile_result(profile_id,
+                                    _headers(scope).get(api.PROFILE_TOKEN_HEADER.lower()))
+
+
+async def predict_batch(scope, body):
+    headers = _headers(scope)
+    options = api.response_options(_query(scope), batch=True)
+    return await executor.run(_run_batch, body, headers, options)
+
+
+async def predict_wallet(scope, body):
+    address = scope['path'][len('/predict_wallet/'):].rstrip('/')
+    options = api.response_options(_query(scope))
+    return await executor.run(partial(_run_wallet, address, options))
+
+
+def _run_wallet(address, options):
+    """Look up and score a wallet in the executor (SQLite reads block)."""
+    try:
+        return api.predict_wallet_response(address, **options)
+    except Exception as e:
+        return api.error_response('Prediction failed', e)
+
+
+ROUTES = {
+    '/': ('GET', home),
+    '/health': ('GET', health),
+    '/predict': ('POST', predict),
+    '/predict_batch': ('POST', predict_batch),
+    '/features': ('GET', features),
+    '/metrics': ('GET', metrics),
+    '/admin/profile': ('GET', admin_profile),
+}
+
+# Routes with a path parameter, matched on the part before the parameter
+PREFIX_ROUTES = {
+    '/predict_wallet/<address>': ('GET', predict_wallet),
+    '/admin/profile/<profile_id>': ('GET', admin_profile_file),
+}
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def _send_json(send, body, status, content_type='application/json', endpoint=None,
+                     headers=None):
+    """Send a response; returns the status actually sent."""
+    if isinstance(body, bytes):
+        payload = body  # Arrow / raw batch responses are already encoded
+    else:
+        started = time.perf_counter()
+        try:
+            payload = dumps(body)
+        except Exception as e:
+            body, status = api.error_response('Response encoding failed', e)
+            payload, content_type = dumps(body), 'application/json'
+        if endpoint is not None:
+            api.metrics.stage(endpoint, 'serialize', started)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode()),
+            (b'content-length', str(len(payload)).encode())
+        ] + [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+    return status
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point."""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    started = api.metrics.start_request()
+    endpoint = scope['path'].rstrip('/') or '/'
+    route = ROUTES.get(endpoint)
+    if route is None:
+        endpoint, route = next(((rule, route) for rule, route in PREFIX_ROUTES.items()
+                                if scope['path'].startswith(rule.split('<')[0])),
+                               ('unmatched', None))
+    if route is None:
+        await _send_json(send, {'error': 'Not found'}, 404)
+        api.metrics.finish_request(endpoint, scope['method'], 404, started)
+        return
+
+    method, handler = route
+    if scope['method'] != method:
+        await _send_json(send, {'error': 'Method not allowed'}, 405)
+        api.metrics.finish_request(endpoint, scope['method'], 405, started)
+        return
+
+    body = await _read_body(receive)
+    if body is None:
+        # Client went away; 499 as in nginx's "client closed request"
+        api.metrics.finish_request(endpoint, method, 499, started)
+        return
+
+    # Work is spread over the event loop and executor threads, so request
+    # profiles sample every thread (concurrent requests show up too)
+    profile = None
+    if api.profiler is not None and endpoint in api.PROFILED_ENDPOINTS:
+        profile = api.profiler.start_request(_query(scope), _headers(scope), all_threads=True)
+
+    try:
+        response, status, *content_type = await handler(scope, body)
+    except ServerBusy:
+        response, status, content_type = {'error': 'Server busy, inference queue is full'}, 503, []
+
+    extra_headers = None
+    if profile is not None:
+        report, extra_headers = api.profiler.finish_request(profile)
+        if profile.inline:
+            response, content_type = report.encode(), ['text/plain']
+    status = await _send_json(send, response, status, *content_type, endpoint=endpoint,
+                              headers=extra_headers)
+    api.metrics.finish_request(endpoint, method, status, started)
@@ -0,0 +1,313 @@
+"""
+Ronin Trader Classification - Batch Request/Response Formats
+Author: Jo$h
+
+Codecs for /predict_batch beyond JSON lists of objects:
+
+- Columnar JSON: {"tx_count_365d": [...], "total_volume": [...], ...}
+- Apache Arrow IPC stream (Content-Type: application/vnd.apache.arrow.stream)
+- Raw little-endian float64, row-major, columns in model feature order
+  (Content-Type: application/octet-stream)
+
+Arrow and raw bodies are turned into the feature matrix directly, without
+creating Python objects per row. Responses can be encoded in the same
+formats; binary responses carry one row per input row, with nulls (Arrow)
+or NaN (raw) for rows that failed validation.
+"""
+
+import json
+
+import numpy as np
+
+
+JSON = 'application/json'
+ARROW = 'application/vnd.apache.arrow.stream'
+RAW = 'application/octet-stream'
+
+FORMATS = ('rows', 'columnar', 'arrow', 'raw')
+MIMETYPES = {'rows': JSON, 'columnar': JSON, 'arrow': ARROW, 'raw': RAW}
+
+# Columns of the raw float64 response, one row per input row
+RAW_COLUMNS = ('will_remain_active', 'confidence',
+               'probability_good_trader', 'probability_bad_trader')
+
+# Fields a prediction result can carry; ?fields= selects a subset
+RESULT_FIELDS = ('prediction', 'will_remain_active', 'confidence',
+                 'probability_good_trader', 'probability_bad_trader', 'input_features')
+
+# Largest feature value accepted: both engines score in float32, where
+# anything larger becomes infinity
+MAX_VALUE = float(np.finfo(np.float32).max)
+
+# Fields returned by ?compact=true
+COMPACT_FIELDS = ('will_remain_active', 'probability_good_trader')
+
+
+class BatchFormatError(ValueError):
+    """The request body cannot be decoded; reported to the client as a 400."""
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise BatchFormatError("Arrow support requires pyarrow on the server")
+    return pyarrow
+
+
+def is_columnar(data, feature_names):
+    """True if a parsed JSON body is columnar, i.e. feature name -> list."""
+    return (isinstance(data, dict) and 'traders' not in data
+            and any(isinstance(data.get(feat), list) for feat in feature_names))
+
+
+def decode_columnar_json(data, feature_names):
+    """
+    Build the feature matrix from columnar JSON.
+
+    Returns:
+        tuple: (X, errors) where rows holding non-numeric values are NaN in X
+        and described in errors
+    """
+    missing = [feat for feat in feature_names if not isinstance(data.get(feat), list)]
+    if missing:
+        raise BatchFormatError(f"Missing required columns: {missing}")
+
+    lengths = {len(data[feat]) for feat in feature_names}
+    if len(lengths) != 1:
+        raise BatchFormatError("All feature columns must have the same length")
+    n_rows = lengths.pop()
+    if n_rows == 0:
+        raise BatchFormatError("traders list is empty")
+
+    X = np.empty((n_rows, len(feature_names)), dtype=np.float64)
+    errors = {}
+    for j, feat in enumerate(feature_names):
+        try:
+            column = np.array(data[feat])
+        except ValueError:
+            # Ragged nested lists
+            column = None
+        if column is None or column.ndim != 1:
+            raise BatchFormatError(f'Column "{feat}" must be a flat list of values')
+        if column.dtype.kind in 'biuf':
+            X[:, j] = column
+            continue
+        # Slow path only for columns holding something other than numbers
+        for i, value in enumerate(data[feat]):
+            if isinstance(value, (int, float)):
+                try:
+                    X[i, j] = value
+                except OverflowError:
+                    # Ints beyond float64, reported as validate_trader does
+                    X[i, j] = np.nan
+                    errors.setdefault(i, {
+                        'index': i,
+                        'error': f'Feature "{feat}" is out of range',
+                        'received_value': str(value),
+                        'max_value': MAX_VALUE
+                    })
+            else:
+                X[i, j] = np.nan
+                errors.setdefault(i, {
+                    'index': i,
+                    'error': f'Feature "{feat}" must be a number',
+                    'received_type': type(value).__name__
+                })
+    return X, [errors[i] for i in sorted(errors)]
+
+
+def decode_arrow(body, feature_names):
+    """Build the feature matrix from an Arrow IPC stream."""
+    pa = _require_pyarrow()
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise BatchFormatError(f"Invalid Arrow stream: {e}")
+
+    missing = [feat for feat in feature_names if feat not in table.column_names]
+    if missing:
+        raise BatchFormatError(f"Missing required columns: {missing}")
+    if table.num_rows == 0:
+        raise BatchFormatError("traders list is empty")
+
+    X = np.empty((table.num_rows, len(feature_names)), dtype=np.float64)
+    for j, feat in enumerate(feature_names):
+        try:
+            # Nulls become NaN and are reported by validate_matrix
+            X[:, j] = table.column(feat).cast(pa.float64()).to_numpy()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            raise BatchFormatError(f'Column "{feat}" must be numeric')
+    return X
+
+
+def decode_raw(body, feature_names):
+    """View a raw little-endian float64 buffer as the feature matrix (no copy)."""
+    row_bytes = 8 * len(feature_names)
+    if not body:
+        raise BatchFormatError("traders list is empty")
+    if len(body) % row_bytes:
+        raise BatchFormatError(
+            f"Raw body must be a multiple of {row_bytes} bytes "
+            f"({len(feature_names)} float64 values per row)"
+        )
+    return np.frombuffer(body, dtype='<f8').reshape(-1, len(feature_names))
+
+
+def validate_matrix(X, feature_names, skip=()):
+    """
+    Find rows with non-finite, negative or float32-overflowing values.
+
+    Args:
+        X (np.ndarray): Feature matrix
+        feature_names (list): Column names, for error messages
+        skip (iterable): Row indices already reported as invalid
+
+    Returns:
+        list: One error dict per newly invalid row
+    """
+    # Both engines cast to float32, where values above MAX_VALUE overflow
+    with np.errstate(invalid='ignore'):
+        bad = ~np.isfinite(X) | (X < 0) | (np.abs(X) > MAX_VALUE)
+    errors = []
+    skip = set(skip)
+    for i in np.flatnonzero(bad.any(axis=1)).tolist():
+        if i in skip:
+            continue
+        j = int(np.argmax(bad[i]))
+        value = float(X[i, j])
+        feat = feature_names[j]
+        if np.isfinite(value) and abs(value) > MAX_VALUE:
+            errors.append({'index': i, 'error': f'Feature "{feat}" is out of range',
+                           'received_value': str(value), 'max_value': MAX_VALUE})
+        elif np.isfinite(value):
+            errors.append({'index': i, 'error': f'Feature "{feat}" cannot be negative',
+                           'received_value': value})
+        else:
+            errors.append({'index': i, 'error': f'Feature "{feat}" must be a finite number',
+                           'received_value': None if np.isnan(value) else str(value)})
+    return errors
+
+
+def parse_fields(fields=None, compact=False):
+    """
+    Resolve the ?fields= and ?compact= query parameters.
+
+    Args:
+        fields (str): Comma-separated field names, if given
+        compact (bool): Return COMPACT_FIELDS when fields is not given
+
+    Returns:
+        tuple: Field names to include in each result
+    """
+    if fields:
+        selected = tuple(name.strip() for name in fields.split(',') if name.strip())
+        unknown = [name for name in selected if name not in RESULT_FIELDS]
+        if unknown:
+            raise BatchFormatError(f"Unknown fields {unknown}. Choose from {RESULT_FIELDS}")
+        return selected
+    if compact:
+        return COMPACT_FIELDS
+    return RESULT_FIELDS
+
+
+def negotiate(requested, accept, layout):
+    """
+    Pick the response format.
+
+    Args:
+        requested (str): Explicit `format` query parameter, if any
+        accept (str): Accept header
+        layout (str): Format the request body arrived in
+
+    Returns:
+        str: One of FORMATS
+    """
+    if requested:
+        if requested not in FORMATS:
+            raise BatchFormatError(f"Unknown format '{requested}'. Choose from {FORMATS}")
+        return requested
+    accept = accept or ''
+    if ARROW in accept:
+        return 'arrow'
+    if RAW in accept:
+        return 'raw'
+    if JSON in accept and layout in ('arrow', 'raw'):
+        return 'columnar'
+    return layout
+
+
+def _nullable(values, valid):
+    """Python list with None where the row is invalid."""
+    if valid.all():
+        return values.tolist()
+    return [v if ok else None for v, ok in zip(values.tolist(), valid.tolist())]
+
+
+def _prediction_columns(result, fields):
+    """Requested prediction fields as arrays aligned with the input rows."""
+    good = result['labels'] == 1
+    probabilities = result['probabilities']
+    builders = {
+        'prediction': lambda: np.where(good, 'Good Trader', 'Bad Trader'),
+        'will_remain_active': lambda: good,
+        'confidence': lambda: probabilities.max(axis=1),
+        'probability_good_trader': lambda: probabilities[:, 1],
+        'probability_bad_trader': lambda: probabilities[:, 0],
+    }
+    return {name: builders[name]() for name in fields if name in builders}
+
+
+def encode_columnar(result, feature_names, fields=RESULT_FIELDS):
+    """Parallel arrays, one entry per input row (null for failed rows)."""
+    valid = result['valid']
+    predictions = {
+        name: _nullable(values, valid)
+        for name, values in _prediction_columns(result, fields).items()
+    }
+    if 'input_features' in fields:
+        predictions['input_features'] = {
+            feat: result['X'][:, j].tolist() for j, feat in enumerate(feature_names)
+        }
+    return {
+        'predictions': predictions,
+        'errors': result['errors'],
+        'summary': result['summary']
+    }
+
+
+def encode_arrow(result, feature_names, fields=RESULT_FIELDS):
+    """Arrow IPC stream; summary and errors are stored in schema metadata."""
+    pa = _require_pyarrow()
+    invalid = ~result['valid']
+
+    columns = {
+        name: pa.array(values, mask=invalid)
+        for name, values in _prediction_columns(result, fields).items()
+    }
+    if 'input_features' in fields:
+        for j, feat in enumerate(feature_names):
+            columns[feat] = pa.array(result['X'][:, j])
+
+    table = pa.table(columns).replace_schema_metadata({
+        'summary': json.dumps(result['summary']),
+        'errors': json.dumps(result['errors'])
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_raw(result):
+    """Little-endian float64 rows of RAW_COLUMNS, NaN for failed rows."""
+    probabilities = result['probabilities']
+    out = np.column_stack([
+        (result['labels'] == 1).astype(np.float64),
+        probabilities.max(axis=1),
+        probabilities[:, 1],
+        probabilities[:, 0],
+    ])
+    out[~result['valid']] = np.nan
+    return out.astype('<f8', copy=False).tobytes()
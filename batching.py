@@ -0,0 +1,171 @@
+"""
+Ronin Trader Classification - Micro-batching
+Author: Jo$h
+
+Coalesces concurrent single-row predictions into one model call. Request
+threads submit a feature row and block on a future; a background thread
+collects up to `max_batch_size` rows or waits at most `max_wait_us`
+microseconds, scores them as one matrix and fans the results back out.
+If that model call fails, each row is rescored on its own so only the
+request that caused the error fails.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Collects single predictions from many threads and scores them together.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_us=1000,
+                 queue_depth=1024):
+        """
+        Args:
+            score_fn (callable): Takes a (n, n_features) float64 matrix and
+                returns (labels, probabilities) for all rows
+            max_batch_size (int): Most rows scored in one model call
+            max_wait_us (int): Longest a request waits for others to join
+            queue_depth (int): Pending rows allowed before submit() rejects
+        """
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1_000_000
+        self.queue_depth = queue_depth
+
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self.batches = 0
+        self.rows = 0
+        # Batches that failed and were rescored row by row
+        self.split_batches = 0
+
+    def _ensure_worker(self):
+        """Start the worker thread, again after a fork (e.g. gunicorn --preload)."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Threads and queued items do not survive fork
+                self._queue = queue.Queue(maxsize=self.queue_depth)
+            self._thread = threading.Thread(target=self._run, name='micro-batcher',
+                                            daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def submit(self, row):
+        """
+        Queue one feature row for scoring.
+
+        Args:
+            row (array-like): Feature values in model order
+
+        Returns:
+            Future: Resolves to (label, probabilities) for the row
+
+        Raises:
+            queue.Full: If `queue_depth` rows are already waiting
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put_nowait((row, future))
+        return future
+
+    def _collect(self):
+        """Block for the first row, then gather more until size or time runs out."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            futures = [future for _, future in batch]
+            try:
+                features = np.array([row for row, _ in batch], dtype=np.float64)
+                labels, probabilities = self.score_fn(features)
+            except Exception as e:
+                if len(batch) == 1:
+                    futures[0].set_exception(e)
+                else:
+                    # One bad row must not fail the requests it was coalesced with
+                    self.split_batches += 1
+                    for item in batch:
+                        self._score_one(*item)
+                continue
+
+            self.batches += 1
+            self.rows += len(batch)
+            for future, label, probability in zip(futures, labels.tolist(),
+                                                  probabilities.tolist()):
+                future.set_result((label, probability))
+
+    def _score_one(self, row, future):
+        """Score a row on its own, after the batch it was in failed."""
+        try:
+            labels, probabilities = self.score_fn(np.array([row], dtype=np.float64))
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += 1
+        future.set_result((labels.tolist()[0], probabilities.tolist()[0]))
+
+    def stats(self):
+        """Return batching counters for health reporting."""
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'avg_batch_size': round(self.rows / self.batches, 2) if self.batches else 0.0,
+            'split_batches': self.split_batches,
+            'queue_size': self._queue.qsize(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_us': int(self.max_wait * 1_000_000),
+            'queue_depth': self.queue_depth
+        }
+
+
+def batcher_from_env(score_fn):
+    """
+    Build a MicroBatcher from environment variables, or None when disabled.
+
+    MICROBATCH_ENABLED      - 'true' to turn micro-batching on (default off)
+    MICROBATCH_MAX_SIZE     - rows per model call (default 64)
+    MICROBATCH_MAX_WAIT_US  - max wait for a batch to fill, in µs (default 1000)
+    MICROBATCH_QUEUE_DEPTH  - pending rows before returning 503 (default 1024)
+    """
+    if os.getenv('MICROBATCH_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    return MicroBatcher(
+        score_fn,
+        max_batch_size=int(os.getenv('MICROBATCH_MAX_SIZE', 64)),
+        max_wait_us=int(os.getenv('MICROBATCH_MAX_WAIT_US', 1000)),
+        queue_depth=int(os.getenv('MICROBATCH_QUEUE_DEPTH', 1024))
+    )
@@ -0,0 +1,132 @@
+"""
+Ronin Trader Classification - Feature Store Benchmark
+Author: Jo$h
+
+Builds a feature store for a synthetic population of wallets (1M by
+default) with a year of weekly activity. It then times:
+
+    load        ingesting the full year
+    update      one new week of transactions for a slice of wallets
+    recompute   features.py over the whole year, which the update replaces
+    expire      moving the window forward one week
+    get         single-wallet lookups (p50/p99)
+    get_many    10k-wallet lookups
+
+Usage:
+    python benchmarks/bench_feature_store.py
+    python benchmarks/bench_feature_store.py --wallets 100000 --tx-per-wallet 8 --output fs.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+from feature_store import FeatureStore
+from features import compute_features
+
+
+AS_OF = pd.Timestamp('2025-01-06', tz='UTC')
+
+
+def synthetic_transactions(wallets, n_tx, start, days, rng):
+    """n_tx transactions from random wallets, uniformly spread over `days`."""
+    seconds = int(start.timestamp()) + rng.integers(0, days * 86_400, n_tx)
+    return pd.DataFrame({
+        'wallet': wallets[rng.integers(0, len(wallets), n_tx)],
+        'timestamp': seconds,
+        'value': rng.lognormal(-3, 2, n_tx)
+    })
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--wallets', type=int, default=1_000_000)
+    parser.add_argument('--tx-per-wallet', type=float, default=4)
+    parser.add_argument('--active-share', type=float, default=0.1,
+                        help='Share of wallets transacting in the new week')
+    parser.add_argument('--lookups', type=int, default=20_000)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    wallets = np.array([f'0x{i:040x}' for i in range(args.wallets)], dtype=object)
+    history = synthetic_transactions(wallets, int(args.wallets * args.tx_per_wallet),
+                                     AS_OF - pd.Timedelta(days=365), 365, rng)
+    new_week = synthetic_transactions(wallets, int(args.wallets * args.active_share),
+                                      AS_OF, 7, rng)
+
+    print("=" * 80)
+    print(f"FEATURE STORE BENCHMARK - {args.wallets:,} wallets, "
+          f"{len(history):,} + {len(new_week):,} transactions")
+    print("=" * 80)
+
+    results = {'wallets': args.wallets, 'history_tx': len(history), 'new_tx': len(new_week)}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(os.path.join(tmp, 'store.sqlite'))
+
+        _, seconds = timed(lambda: store.update(history, as_of=AS_OF))
+        results['load_s'] = round(seconds, 2)
+        print(f"load       {seconds:>8.2f} s   {len(history) / seconds:>12,.0f} tx/s")
+
+        _, seconds = timed(lambda: store.update(new_week, as_of=AS_OF))
+        results['update_s'] = round(seconds, 3)
+        print(f"update     {seconds:>8.2f} s   {len(new_week) / seconds:>12,.0f} tx/s")
+
+        everything = pd.concat([history, new_week], ignore_index=True)
+        _, seconds = timed(lambda: compute_features(
+            everything, as_of=AS_OF + pd.Timedelta(days=7)))
+        results['recompute_s'] = round(seconds, 2)
+        print(f"recompute  {seconds:>8.2f} s   (features.py over the full year)")
+
+        stats, seconds = timed(lambda: store.expire(AS_OF + pd.Timedelta(days=7)))
+        results['expire_s'] = round(seconds, 3)
+        print(f"expire     {seconds:>8.2f} s   {stats['buckets_expired']:,} buckets")
+
+        sample = wallets[rng.integers(0, len(wallets), args.lookups)]
+        latencies = []
+        for wallet in sample:
+            started = time.perf_counter()
+            store.get(wallet)
+            latencies.append(time.perf_counter() - started)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+        results.update(get_p50_us=round(p50, 1), get_p99_us=round(p99, 1))
+        print(f"get        p50 {p50:>6.1f} us   p99 {p99:>6.1f} us")
+
+        frame, seconds = timed(lambda: store.get_many(sample[:10_000]))
+        results['get_many_10k_ms'] = round(seconds * 1000, 1)
+        print(f"get_many   {seconds * 1000:>8.1f} ms  ({len(frame):,} wallets)")
+
+        store_stats = store.stats()
+        results['buckets'] = store_stats['buckets']
+        results['store_mb'] = round(sum(
+            os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) / 2 ** 20, 1)
+        print(f"store      {store_stats['wallets']:,} wallets, {store_stats['buckets']:,} "
+              f"buckets, {results['store_mb']} MB")
+        store.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
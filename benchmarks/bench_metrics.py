@@ -0,0 +1,119 @@
+"""
+Ronin Trader Classification - Metrics Overhead Benchmark
+Author: Jo$h
+
+Measures what /metrics instrumentation costs a request, two ways:
+
+    hooks       the metric calls one /predict request makes, in a tight loop
+    end-to-end  /predict through the Flask test client with metrics on and
+                off, alternating rounds so drift affects both equally
+
+Run against the packed engine too (--engine packed): its ~0.2 ms
+inference is the worst case for relative overhead.
+
+Usage:
+    python benchmarks/bench_metrics.py
+    python benchmarks/bench_metrics.py --engine packed --requests 2000 --rounds 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import app as api
+from inference import build_engine
+from metrics import Metrics
+from registry import LoadedModel
+
+TRADER = {
+    'tx_count_365d': 150,
+    'total_volume': 25.5,
+    'active_weeks': 20,
+    'avg_tx_value': 0.17,
+    'tx_per_active_week': 7.5
+}
+
+
+def hook_cost(n):
+    """Seconds per request spent in the metric calls /predict makes."""
+    metrics = Metrics()
+    started = time.perf_counter()
+    for _ in range(n):
+        request_started = metrics.start_request()
+        t = metrics.stage('/predict', 'parse', request_started)
+        for stage in ('validate', 'array', 'inference', 'format', 'serialize'):
+            t = metrics.stage('/predict', stage, t)
+        metrics.inference(1)
+        metrics.predicted(1)
+        metrics.finish_request('/predict', 'POST', 200, request_started)
+    return (time.perf_counter() - started) / n
+
+
+def request_time(client, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        client.post('/predict', json=TRADER)
+    return (time.perf_counter() - started) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--engine', choices=['sklearn', 'packed'], default='sklearn')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per round')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    if args.engine == 'packed':
+        api.activate(LoadedModel(build_engine(api.model, 'packed'), api.feature_names))
+    if api.prediction_cache is not None:
+        api.prediction_cache = None  # every request must reach the model
+
+    client = api.app.test_client()
+    request_time(client, 50)  # warm up
+
+    on, off = [], []
+    for _ in range(args.rounds):
+        for enabled, times in ((True, on), (False, off)):
+            api.metrics.enabled = enabled
+            times.append(request_time(client, args.requests))
+    api.metrics.enabled = True
+
+    hooks = hook_cost(100_000)
+    on_us, off_us = np.median(on) * 1e6, np.median(off) * 1e6
+    results = {
+        'engine': args.engine,
+        'request_us_metrics_on': round(on_us, 1),
+        'request_us_metrics_off': round(off_us, 1),
+        'end_to_end_overhead_pct': round((on_us - off_us) / off_us * 100, 2),
+        'hook_us_per_request': round(hooks * 1e6, 2),
+        'hook_overhead_pct': round(hooks * 1e6 / off_us * 100, 2)
+    }
+
+    print("=" * 80)
+    print(f"METRICS OVERHEAD - /predict, {args.engine} engine, "
+          f"{args.rounds} x {args.requests} requests")
+    print("=" * 80)
+    print(f"request, metrics off   {off_us:>9.1f} us")
+    print(f"request, metrics on    {on_us:>9.1f} us   ({results['end_to_end_overhead_pct']:+.2f}%)")
+    print(f"metric calls alone     {results['hook_us_per_request']:>9.2f} us   "
+          f"({results['hook_overhead_pct']:.2f}% of a request)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Ronin Trader Classification - Parallel Scoring Benchmark
+Author: Jo$h
+
+Measures rows/sec of multi-process batch scoring at several worker counts.
+The bundled dataset is replicated up to the requested row count (10M by
+default) and scored with every worker count; results are checked to be
+identical to the single-worker run.
+
+Usage:
+    python benchmarks/bench_parallel.py
+    python benchmarks/bench_parallel.py --rows 1000000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference import PackedForest
+from parallel import default_workers, ensure_model_dir, predict_proba_parallel
+
+
+def build_matrix(rows, feature_names):
+    """Replicate the bundled dataset's feature matrix up to `rows` rows."""
+    df = pd.read_csv(os.path.join(ROOT, 'data', 'ronin_traders_dataset.csv'))
+    base = df[feature_names].to_numpy(dtype=np.float64)
+    reps = -(-rows // len(base))
+    return np.tile(base, (reps, 1))[:rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--shard-size', type=int, default=100_000)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'models', 'best_model_random_forest.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(ROOT, 'models', 'feature_names.pkl'), 'rb') as f:
+        feature_names = pickle.load(f)
+
+    forest = PackedForest.from_sklearn(model)
+    ensure_model_dir(forest)
+    X = build_matrix(args.rows, feature_names)
+
+    print("=" * 80)
+    print(f"PARALLEL SCORING BENCHMARK - {args.rows:,} rows, "
+          f"{default_workers()} CPUs available")
+    print("=" * 80)
+    print(f"{'workers':>8} {'seconds':>10} {'rows/sec':>14} {'speedup':>8}")
+
+    results = []
+    reference = None
+    for n_workers in args.workers:
+        started = time.perf_counter()
+        proba = predict_proba_parallel(forest, X, n_workers=n_workers,
+                                       shard_size=args.shard_size)
+        elapsed = time.perf_counter() - started
+
+        if reference is None:
+            reference = proba
+        elif not np.array_equal(proba, reference):
+            raise AssertionError(f"{n_workers} workers gave different results")
+
+        rate = args.rows / elapsed
+        speedup = rate / results[0]['rows_per_sec'] if results else 1.0
+        results.append({'workers': n_workers, 'seconds': round(elapsed, 3),
+                        'rows_per_sec': round(rate, 1), 'speedup': round(speedup, 2)})
+        print(f"{n_workers:>8} {elapsed:>10.2f} {rate:>14,.0f} {speedup:>7.2f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'cpus': default_workers(),
+                       'results': results}, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
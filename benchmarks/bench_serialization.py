@@ -0,0 +1,100 @@
+"""
+Ronin Trader Classification - Response Serialization Benchmark
+Author: Jo$h
+
+Measures how long /predict_batch responses take to serialize and how big
+they are, for batches of 1, 1k and 100k rows. Each response mode (full
+per-row objects, a ?fields= subset, ?compact=true parallel arrays) is
+built once by the app and then encoded with the standard library json
+module (Flask's default) and with orjson, when installed.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --rows 1 1000 100000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+import app as api
+import fast_json
+
+
+MODES = {
+    'full': {},
+    'fields': {'fields': 'prediction,probability_good_trader'},
+    'compact': {'compact': True},
+}
+
+
+def stdlib_dumps(obj):
+    """What Flask's default provider does for jsonify."""
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True).encode()
+
+
+def encoders():
+    found = {'json': stdlib_dumps}
+    if fast_json.orjson is not None:
+        found['orjson'] = fast_json.dumps
+    return found
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 1000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print("=" * 80)
+    print(f"SERIALIZATION BENCHMARK - encoders: {', '.join(encoders())}")
+    print("=" * 80)
+    print(f"{'rows':>8} {'mode':>8} {'encoder':>8} {'ms':>10} {'bytes':>12} {'bytes/row':>10}")
+
+    results = []
+    for n_rows in args.rows:
+        X = rng.uniform(0, 100, size=(n_rows, len(api.feature_names)))
+        traders = [dict(zip(api.feature_names, row)) for row in X.tolist()]
+        request = json.dumps({'traders': traders}).encode()
+
+        for mode, options in MODES.items():
+            body, status, _ = api.predict_batch_response(request, **options)
+            assert status == 200, body
+
+            for name, encode in encoders().items():
+                payload = encode(body)
+                seconds = best_time(lambda: encode(body), args.repeat)
+                results.append({'rows': n_rows, 'mode': mode, 'encoder': name,
+                                'ms': round(seconds * 1000, 3), 'bytes': len(payload)})
+                print(f"{n_rows:>8,} {mode:>8} {name:>8} {seconds * 1000:>10.2f} "
+                      f"{len(payload):>12,} {len(payload) / n_rows:>10.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Ronin Trader Classification - Flask vs ASGI Load Test
+Author: Jo$h
+
+Starts the Flask app under gunicorn (the Dockerfile setup) and the ASGI app
+under uvicorn, then drives each with 1, 50 and 500 concurrent clients for a
+fixed duration. Reports throughput, latency percentiles and error/503 counts.
+
+Usage:
+    python benchmarks/bench_servers.py
+    python benchmarks/bench_servers.py --clients 1 50 500 --duration 10 --endpoint predict_batch
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test import http_request
+
+TRADER = {
+    "tx_count_365d": 150,
+    "total_volume": 25.5,
+    "active_weeks": 20,
+    "avg_tx_value": 0.17,
+    "tx_per_active_week": 7.5
+}
+
+SERVERS = {
+    'flask': ['gunicorn', '--config', 'gunicorn.conf.py', 'app:app'],
+    'asgi': ['uvicorn', 'asgi_app:app', '--host', '127.0.0.1', '--log-level', 'warning'],
+}
+
+
+async def _client(host, port, path, body, deadline, latencies, statuses):
+    connection = [None]
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(
+                http_request(host, port, 'POST', path, body, connection), timeout=30)
+        except (OSError, asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            status = 'error'
+            if connection[0] is not None:
+                connection[0][1].close()
+            connection[0] = None
+        latencies.append(time.perf_counter() - started)
+        statuses.append(status)
+    if connection[0] is not None:
+        connection[0][1].close()
+
+
+async def run_load(host, port, path, body, clients, duration):
+    """Run `clients` closed-loop clients for `duration` seconds."""
+    latencies, statuses = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, path, body, deadline, latencies, statuses)
+        for _ in range(clients)
+    ])
+    elapsed = time.perf_counter() - started
+
+    ok = sum(1 for s in statuses if s == 200)
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'clients': clients,
+        'requests': len(statuses),
+        'ok': ok,
+        'busy_503': sum(1 for s in statuses if s == 503),
+        'errors': sum(1 for s in statuses if s not in (200, 503)),
+        'rps': round(ok / elapsed, 1),
+        'p50_ms': round(float(np.percentile(lat_ms, 50)), 2),
+        'p99_ms': round(float(np.percentile(lat_ms, 99)), 2),
+    }
+
+
+def start_server(name, port):
+    env = dict(os.environ, PORT=str(port))
+    command = SERVERS[name] + (['--port', str(port)] if name == 'asgi' else [])
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{name} server did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 50, 500])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--endpoint', choices=['predict', 'predict_batch'], default='predict')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    if args.endpoint == 'predict':
+        body = json.dumps(TRADER).encode()
+    else:
+        body = json.dumps({'traders': [TRADER] * args.batch_size}).encode()
+    path = f'/{args.endpoint}'
+
+    print("=" * 80)
+    print(f"LOAD TEST - POST {path}, {args.duration:.0f}s per level")
+    print("=" * 80)
+    print(f"{'server':>7} {'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'503s':>6} {'errors':>7}")
+
+    results = []
+    for offset, name in enumerate(args.servers):
+        port = 5100 + offset
+        process = start_server(name, port)
+        try:
+            for clients in args.clients:
+                result = asyncio.run(run_load('127.0.0.1', port, path, body,
+                                              clients, args.duration))
+                result['server'] = name
+                results.append(result)
+                print(f"{name:>7} {clients:>8} {result['rps']:>10,.1f} "
+                      f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                      f"{result['busy_503']:>6} {result['errors']:>7}")
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
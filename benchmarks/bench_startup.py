@@ -0,0 +1,159 @@
+"""
+Ronin Trader Classification - Start-up Benchmark
+Author: Jo$h
+
+Measures how long a fresh process takes to give its first prediction, the
+cost autoscaled pods and cron jobs pay on every start:
+
+    predictor   from predict import RoninTraderPredictor; predict_single
+    api         import app; first POST /predict through the test client
+
+each with the native export (engine auto) and with the pickle (sklearn).
+Every run is a new interpreter. Reported per run: spawn-to-first-
+prediction wall time, and inside the process the import, model load and
+first prediction times plus whether pandas and sklearn were imported.
+The model is copied to a temporary directory and exported there first
+(`python inference.py export`), the step a deploy runs once.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --target-ms 300 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from inference import export_native
+
+TRADER = {
+    'tx_count_365d': 150,
+    'total_volume': 25.5,
+    'active_weeks': 20,
+    'avg_tx_value': 0.17,
+    'tx_per_active_week': 7.5
+}
+
+# Runs in the child; prints one JSON line once the first prediction is back
+PREAMBLE = """
+import time
+started = time.perf_counter()
+import contextlib, io, json, os, sys
+sys.path.insert(0, {root!r})
+"""
+SCENARIOS = {
+    'predictor': """
+with contextlib.redirect_stdout(io.StringIO()):
+    from predict import RoninTraderPredictor
+    imported = time.perf_counter()
+    predictor = RoninTraderPredictor(os.environ['MODEL_PATH'], os.environ['FEATURES_PATH'],
+                                     engine=os.environ['INFERENCE_ENGINE'])
+    loaded = time.perf_counter()
+    predictor.predict_single({trader!r})
+""",
+    'api': """
+with contextlib.redirect_stdout(io.StringIO()):
+    import flask, numpy
+    imported = time.perf_counter()
+    import app
+    loaded = time.perf_counter()
+    assert app.app.test_client().post('/predict', json={trader!r}).status_code == 200
+""",
+}
+REPORT = """
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'load_ms': (loaded - imported) * 1000,
+                  'predict_ms': (done - loaded) * 1000, 'in_process_ms': (done - started) * 1000,
+                  'pandas': 'pandas' in sys.modules, 'sklearn': 'sklearn' in sys.modules}), flush=True)
+"""
+
+
+def run_once(scenario, env):
+    """One fresh interpreter; returns its timings plus the spawn-to-prediction wall time."""
+    code = (PREAMBLE.format(root=ROOT) + SCENARIOS[scenario].format(trader=TRADER)
+            + REPORT)
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, env=env, cwd=ROOT, text=True)
+    line = process.stdout.readline()
+    wall_ms = (time.perf_counter() - started) * 1000
+    process.wait()
+    if process.returncode != 0 or not line:
+        raise RuntimeError(f"{scenario} run failed (exit {process.returncode})")
+    result = json.loads(line)
+    result['wall_ms'] = wall_ms
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per scenario')
+    parser.add_argument('--engines', nargs='+', default=['auto', 'sklearn'],
+                        choices=['auto', 'sklearn', 'packed'])
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS),
+                        choices=list(SCENARIOS))
+    parser.add_argument('--target-ms', type=float, default=300.0,
+                        help='Spawn-to-first-prediction target (median)')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"START-UP - fresh process to first prediction, {args.runs} runs each")
+    print("=" * 80)
+    print(f"{'scenario':<20} {'wall ms':>9} {'import':>8} {'load':>8} {'predict':>8}  "
+          f"{'pandas':>6} {'sklearn':>7}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        shutil.copy('models/best_model_random_forest.pkl', model_path)
+        # Nothing optional switched on: no registry, store, metrics or warm-up overrides
+        env = {key: value for key, value in os.environ.items()
+               if key not in ('MODEL_REGISTRY_DIR', 'PACKED_MODEL_DIR', 'FEATURE_STORE_PATH',
+                              'CHALLENGER_MODELS')}
+        env.update(MODEL_PATH=model_path, FEATURES_PATH=os.path.abspath('models/feature_names.pkl'),
+                   FEATURE_STORE_PATH=os.path.join(tmp, 'no-store.sqlite'))
+
+        # Serving never writes the export, so make it up front as a deploy would
+        export_native(model_path)
+
+        for scenario in args.scenarios:
+            for engine in args.engines:
+                env['INFERENCE_ENGINE'] = engine
+                runs = [run_once(scenario, env) for _ in range(args.runs)]
+                row = {'scenario': scenario, 'engine': engine, 'runs': args.runs}
+                for key in ('wall_ms', 'import_ms', 'load_ms', 'predict_ms', 'in_process_ms'):
+                    row[key] = round(float(np.median([run[key] for run in runs])), 1)
+                row['pandas'] = any(run['pandas'] for run in runs)
+                row['sklearn'] = any(run['sklearn'] for run in runs)
+                row['meets_target'] = row['wall_ms'] <= args.target_ms
+                results.append(row)
+                print(f"{scenario + '/' + engine:<20} {row['wall_ms']:>9.0f} "
+                      f"{row['import_ms']:>8.0f} {row['load_ms']:>8.0f} "
+                      f"{row['predict_ms']:>8.1f}  {str(row['pandas']):>6} "
+                      f"{str(row['sklearn']):>7}")
+
+    print(f"\nMedians; wall = process spawn to first prediction (target {args.target_ms:g} ms)")
+    for row in results:
+        mark = '✅' if row['meets_target'] else '❌'
+        print(f"{mark} {row['scenario']}/{row['engine']}: {row['wall_ms']:.0f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'target_ms': args.target_ms, 'results': results}, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
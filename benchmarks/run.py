@@ -0,0 +1,462 @@
+"""
+Ronin Trader Classification - Benchmark Suite
+Author: Jo$h
+
+One command that measures the project's performance end to end and
+compares it with a stored baseline:
+
+    predictor   RoninTraderPredictor.predict_single calls/s, predict_batch
+                rows/s at each --sizes, per engine (sklearn, packed)
+    api         Flask test-client latency (p50/p95/p99) for every endpoint
+    load        model load time (pickle, packed conversion, packed mmap)
+                and cold `import app` time
+    training    fit time and test ROC-AUC per notebook model at each
+                --train-sizes
+
+Inputs are synthetic: rows of data/ronin_traders_dataset.csv resampled
+with jitter up to any size (10M rows with --sizes ... 10000000). The
+derived features stay consistent and the label is kept. Each section runs
+in its own process, so `peak_rss_mib` is that section's peak.
+
+Results go to a JSON file with a flat `metrics` dict. Names ending in
+_per_s are higher-is-better; _ms, _s and _mib are lower-is-better (p99
+and ROC-AUC are reported only). With a baseline, each metric is compared
+and the run exits with status 1 when any metric got worse by more than
+--tolerance.
+
+Usage:
+    python benchmarks/run.py --quick                          # CI-sized run
+    python benchmarks/run.py --sizes 1000 1000000 10000000    # up to 10M rows
+    python benchmarks/run.py --quick --save-baseline          # update benchmarks/baseline.json
+    python benchmarks/run.py --sections api load --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+warnings.filterwarnings('ignore')
+
+
+DATASET_PATH = 'data/ronin_traders_dataset.csv'
+MODEL_PATH = 'models/best_model_random_forest.pkl'
+FEATURES_PATH = 'models/feature_names.pkl'
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+SECTIONS = ('predictor', 'api', 'load', 'training')
+
+DEFAULTS = {
+    'sizes': [1_000, 100_000, 1_000_000],
+    'train_sizes': [5_000, 50_000],
+    'engines': ['sklearn', 'packed'],
+    'single_calls': 1_000,
+    'api_requests': 300,
+    'repeat': 3,
+}
+QUICK = {
+    'sizes': [1_000, 100_000],
+    'train_sizes': [5_000],
+    'single_calls': 300,
+    'api_requests': 100,
+    'repeat': 3,
+}
+
+HIGHER_IS_BETTER = ('_per_s',)
+LOWER_IS_BETTER = ('_ms', '_s', '_mib')
+# Smallest absolute change that can count as a regression, so jitter in
+# sub-millisecond timings does not fail a run
+NOISE_FLOOR = {'_ms': 0.5, '_s': 0.05, '_mib': 5}
+# p99 over a few hundred requests is one or two of them: reported, not compared
+NOT_COMPARED = ('.p99_ms', '.roc_auc')
+
+
+def synthetic_dataset(n_rows, seed=0, source=DATASET_PATH, chunk_rows=1_000_000):
+    """
+    The dataset resampled to n_rows with jitter.
+
+    Transaction counts, active weeks and volumes are perturbed, then
+    avg_tx_value and tx_per_active_week are recomputed from them, so rows
+    stay internally consistent. The target of the source row is kept.
+    Rows are generated chunk_rows at a time into preallocated columns,
+    which keeps the temporaries of a 10M-row run small.
+
+    Returns:
+        pd.DataFrame: FEATURE_COLUMNS plus target_variable (categorical)
+    """
+    base = pd.read_csv(source)
+    labels = pd.Categorical(base['target_variable'])
+    base_tx = base['tx_count_365d'].to_numpy()
+    base_weeks = base['active_weeks'].to_numpy()
+    base_volume = base['total_volume'].to_numpy()
+    rng = np.random.default_rng(seed)
+
+    tx = np.empty(n_rows, dtype=np.int64)
+    weeks = np.empty(n_rows, dtype=np.int64)
+    volume, avg, per_week = (np.empty(n_rows) for _ in range(3))
+    codes = np.empty(n_rows, dtype=labels.codes.dtype)
+    for start in range(0, n_rows, chunk_rows):
+        part = slice(start, min(start + chunk_rows, n_rows))
+        rows = rng.integers(0, len(base), part.stop - start)
+        tx[part] = np.maximum(1, np.rint(base_tx[rows] * rng.lognormal(0, 0.1, len(rows))))
+        weeks[part] = np.clip(base_weeks[rows] + rng.integers(-1, 2, len(rows)),
+                              1, np.minimum(52, tx[part]))
+        volume[part] = base_volume[rows] * rng.lognormal(0, 0.1, len(rows))
+        avg[part] = volume[part] / tx[part]
+        per_week[part] = tx[part] / weeks[part]
+        codes[part] = labels.codes[rows]
+    return pd.DataFrame({
+        'tx_count_365d': tx,
+        'total_volume': volume,
+        'active_weeks': weeks,
+        'avg_tx_value': avg,
+        'tx_per_active_week': per_week,
+        # Categorical: 10M label strings would cost more than all the features
+        'target_variable': pd.Categorical.from_codes(codes, labels.categories)
+    }, copy=False)
+
+
+def percentiles_ms(seconds):
+    p50, p95, p99 = np.percentile(seconds, [50, 95, 99]) * 1000
+    return {'p50_ms': round(p50, 4), 'p95_ms': round(p95, 4), 'p99_ms': round(p99, 4)}
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_predictor(config):
+    from predict import RoninTraderPredictor
+
+    results = {}
+    traders = synthetic_dataset(1_000, seed=1).drop(columns='target_variable')
+    records = traders.to_dict('records')
+    for engine in config['engines']:
+        predictor = RoninTraderPredictor(MODEL_PATH, FEATURES_PATH, engine=engine)
+        predictor.cache = None  # every call must reach the model
+
+        latencies = []
+        for i in range(config['single_calls']):
+            started = time.perf_counter()
+            predictor.predict_single(records[i % len(records)])
+            latencies.append(time.perf_counter() - started)
+        results[f'single.{engine}.calls_per_s'] = round(len(latencies) / sum(latencies), 1)
+        results.update({f'single.{engine}.{name}': value
+                        for name, value in percentiles_ms(latencies).items()})
+
+        for n_rows in config['sizes']:
+            data = synthetic_dataset(n_rows, seed=2).drop(columns='target_variable')
+            repeat = config['repeat'] if n_rows <= 100_000 else 1
+            seconds = best_of(lambda: predictor.predict_batch(data, copy=False), repeat)
+            results[f'batch_{n_rows}.{engine}.rows_per_s'] = round(n_rows / seconds, 1)
+            results[f'batch_{n_rows}.{engine}.wall_s'] = round(seconds, 4)
+            del data
+    return results
+
+
+def bench_api(config):
+    import app as api
+
+    api.prediction_cache = None  # every request must reach the model
+    client = api.app.test_client()
+    traders = synthetic_dataset(1_000, seed=3).drop(columns='target_variable')
+    records = traders.to_dict('records')
+    columnar = {name: traders[name].tolist() for name in traders.columns}
+    cases = {
+        'home': ('GET', '/', None),
+        'health': ('GET', '/health', None),
+        'features': ('GET', '/features', None),
+        'metrics': ('GET', '/metrics', None),
+        'predict': ('POST', '/predict', lambda i: records[i % len(records)]),
+        'predict_batch_100': ('POST', '/predict_batch',
+                              lambda i: {'traders': records[:100]}),
+        'predict_batch_columnar_1000': ('POST', '/predict_batch', lambda i: columnar),
+    }
+
+    results = {}
+    for name, (method, path, payload) in cases.items():
+        n_requests = config['api_requests']
+        if name.startswith('predict_batch'):
+            n_requests = max(30, n_requests // 3)
+        latencies = []
+        for i in range(n_requests + 5):
+            body = payload(i) if payload is not None else None
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {response.status_code}")
+            if i >= 5:  # first requests warm up
+                latencies.append(elapsed)
+        results[f'{name}.requests_per_s'] = round(len(latencies) / sum(latencies), 1)
+        results.update({f'{name}.{stat}': value
+                        for stat, value in percentiles_ms(latencies).items()})
+    return results
+
+
+def bench_load(config):
+    from inference import PackedForest, build_engine
+
+    repeat = max(10, config['repeat'])  # milliseconds each: best of many is cheap
+
+    def load_pickle():
+        with open(MODEL_PATH, 'rb') as f:
+            return pickle.load(f)
+
+    model = load_pickle()
+    results = {'pickle.load_ms': round(best_of(load_pickle, repeat) * 1000, 2),
+               'packed.convert_ms': round(best_of(lambda: build_engine(model, 'packed'),
+                                                  repeat) * 1000, 2)}
+    with tempfile.TemporaryDirectory() as tmp:
+        build_engine(model, 'packed').save(tmp)
+        results['packed.mmap_load_ms'] = round(
+            best_of(lambda: PackedForest.load(tmp, mmap_mode='r'), repeat) * 1000, 3)
+
+    # A fresh interpreter each time: what a worker pays at start-up
+    imports = []
+    for _ in range(config['repeat']):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import app'], check=True,
+                       capture_output=True, cwd=ROOT)
+        imports.append(time.perf_counter() - started)
+    results['import_app.cold_s'] = round(min(imports), 3)
+    return results
+
+
+def bench_training(config):
+    from sklearn.metrics import roc_auc_score
+    from sklearn.preprocessing import StandardScaler
+
+    from features import FEATURE_COLUMNS
+    from train import CANDIDATES, TARGET_MAPPING, available_models, build_model, split_dataset
+
+    results = {}
+    for n_rows in config['train_sizes']:
+        data = synthetic_dataset(n_rows, seed=4)
+        X_train, X_test, y_train, y_test = split_dataset(
+            data[FEATURE_COLUMNS], data['target_variable'].map(TARGET_MAPPING))
+        for name in available_models():
+            X_fit, X_eval = X_train, X_test
+            if CANDIDATES[name][2]:
+                scaler = StandardScaler().fit(X_train)
+                X_fit, X_eval = scaler.transform(X_train), scaler.transform(X_test)
+            model = build_model(name)
+            started = time.perf_counter()
+            model.fit(X_fit, y_train)
+            seconds = time.perf_counter() - started
+            key = f"{name.lower().replace(' ', '_')}.rows_{n_rows}"
+            results[f'{key}.fit_s'] = round(seconds, 3)
+            results[f'{key}.roc_auc'] = round(
+                roc_auc_score(y_test, model.predict_proba(X_eval)[:, 1]), 4)
+    return results
+
+
+BENCHMARKS = {
+    'predictor': bench_predictor,
+    'api': bench_api,
+    'load': bench_load,
+    'training': bench_training,
+}
+
+
+def run_child(section, config, output):
+    """Run one section in this process and write its metrics to `output`."""
+    import resource
+
+    started = time.perf_counter()
+    results = BENCHMARKS[section](config)
+    results['section_wall_s'] = round(time.perf_counter() - started, 3)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results['peak_rss_mib'] = round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    with open(output, 'w') as f:
+        json.dump(results, f)
+
+
+def run_section(section, config):
+    """Run a section in a fresh interpreter; returns its metrics."""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        output = f.name
+    try:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', section,
+                        '--child-config', json.dumps(config), '--child-output', output],
+                       check=True, stdout=subprocess.DEVNULL, cwd=ROOT)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def environment():
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=ROOT).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if not compared."""
+    if metric.endswith(NOT_COMPARED):
+        return 0
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(metrics, baseline, tolerance=0.2):
+    """
+    Compare metrics with a baseline's.
+
+    A metric regresses when it got worse by more than `tolerance` and,
+    for timings and memory, by more than its NOISE_FLOOR.
+
+    Args:
+        metrics (dict): Flat metrics of this run
+        baseline (dict): Flat metrics of the baseline run
+        tolerance (float): Relative change allowed before a regression
+
+    Returns:
+        list: (metric, baseline value, current value, relative change, status)
+        rows; status is 'ok', 'regression', 'improved', 'new' or 'missing'
+    """
+    rows = []
+    for metric in sorted(set(metrics) | set(baseline)):
+        sign = direction(metric)
+        if sign == 0:
+            continue
+        old, new = baseline.get(metric), metrics.get(metric)
+        if old is None or new is None:
+            rows.append((metric, old, new, None, 'new' if old is None else 'missing'))
+            continue
+        change = (new - old) / old if old else 0.0
+        floor = next((v for suffix, v in NOISE_FLOOR.items()
+                      if sign < 0 and metric.endswith(suffix)), 0)
+        if sign * change < -tolerance and abs(new - old) > floor:
+            status = 'regression'
+        elif sign * change > tolerance:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append((metric, old, new, change, status))
+    return rows
+
+
+def print_comparison(rows, show_all=False):
+    print(f"\n{'metric':<58} {'baseline':>12} {'current':>12} {'change':>9}  status")
+    for metric, old, new, change, status in rows:
+        if status == 'ok' and not show_all:
+            continue
+        change_text = f"{change:+.1%}" if change is not None else '-'
+        print(f"{metric:<58} {old if old is not None else '-':>12} "
+              f"{new if new is not None else '-':>12} {change_text:>9}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes, for CI')
+    parser.add_argument('--sizes', type=int, nargs='+', help='predict_batch row counts')
+    parser.add_argument('--train-sizes', type=int, nargs='+', help='Training set row counts')
+    parser.add_argument('--engines', nargs='+', choices=['sklearn', 'packed'])
+    parser.add_argument('--output', default='benchmarks/results.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline results to compare with (skipped if missing)')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative change allowed before a metric counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Also write this run to --baseline')
+    parser.add_argument('--show-all', action='store_true', help='List unchanged metrics too')
+    parser.add_argument('--child', choices=SECTIONS, help=argparse.SUPPRESS)
+    parser.add_argument('--child-config', help=argparse.SUPPRESS)
+    parser.add_argument('--child-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, json.loads(args.child_config), args.child_output)
+        return
+
+    config = dict(DEFAULTS, **(QUICK if args.quick else {}))
+    for name in ('sizes', 'train_sizes', 'engines'):
+        if getattr(args, name):
+            config[name] = getattr(args, name)
+
+    print("=" * 80)
+    print("BENCHMARK SUITE - " + ', '.join(args.sections))
+    print("=" * 80)
+    metrics, sections = {}, {}
+    for section in args.sections:
+        print(f"\n{section}...", flush=True)
+        results = run_section(section, config)
+        sections[section] = results
+        for name, value in results.items():
+            metrics[f'{section}.{name}'] = value
+            print(f"   {name:<52} {value}")
+
+    report = {'environment': environment(), 'config': config, 'metrics': metrics}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ('cpu_count', 'machine', 'python'):
+            if baseline['environment'].get(key) != report['environment'][key]:
+                print(f"⚠️  Baseline {key} differs ({baseline['environment'].get(key)} vs "
+                      f"{report['environment'][key]}); timings may not be comparable")
+        # Only the sections of this run are compared
+        compared = {name: value for name, value in baseline['metrics'].items()
+                    if name.split('.', 1)[0] in args.sections}
+        rows = compare(metrics, compared, args.tolerance)
+        print_comparison(rows, args.show_all)
+        regressions = [row for row in rows if row[4] == 'regression']
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than "
+                  f"{args.tolerance:.0%} against {args.baseline}")
+        else:
+            print(f"\n✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
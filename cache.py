@@ -0,0 +1,213 @@
+"""
+Ronin Trader Classification - Prediction Cache
+Author: Jo$h
+
+Bounded LRU cache of model outputs keyed on (optionally quantized) feature
+vectors. Used by both the Flask API and RoninTraderPredictor so wallets that
+are re-scored with identical features skip the forest entirely. The cache
+clears itself when the model file on disk changes.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of (label, probabilities) per feature vector.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, ttl=None,
+                 quantize=None, model_path=None, check_interval=1.0):
+        """
+        Args:
+            max_entries (int): Entry limit, None for no entry limit
+            max_bytes (int): Approximate memory limit, None for no byte limit
+            ttl (float): Seconds before an entry expires, None to never expire
+            quantize (int): Significant digits kept per feature in the key,
+                None to key on exact values
+            model_path (str): Model file watched for changes
+            check_interval (float): Seconds between model file checks
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.quantize = quantize
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        self.model_path = None
+        self._model_signature = None
+        self._next_check = 0.0
+        if model_path:
+            self.watch(model_path)
+
+    def key(self, values):
+        """Build the cache key for a feature vector in model order."""
+        if self.quantize is None:
+            return tuple(float(v) for v in values)
+        return tuple(float(f'{v:.{self.quantize}g}') for v in values)
+
+    def watch(self, model_path):
+        """Invalidate the cache whenever `model_path` changes on disk."""
+        self.model_path = model_path
+        self._model_signature = self._signature()
+        self._next_check = time.monotonic() + self.check_interval
+
+    def _signature(self):
+        try:
+            st = os.stat(self.model_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _check_model(self):
+        """Clear the cache if the watched model file changed (rate limited)."""
+        now = time.monotonic()
+        if self.model_path is None or now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        signature = self._signature()
+        if signature != self._model_signature:
+            self._model_signature = signature
+            self._clear()
+            self.invalidations += 1
+
+    def get(self, values):
+        """
+        Look up a feature vector.
+
+        Returns:
+            The cached (label, probabilities), or None on a miss
+        """
+        key = self.key(values)
+        with self._lock:
+            self._check_model()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, values, value):
+        """Store the model output for a feature vector, evicting LRU entries."""
+        key = self.key(values)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        size = _entry_size(key, value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires)
+            self._sizes[key] = size
+            self.bytes += size
+
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.bytes -= self._sizes.pop(key)
+
+    def _clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.bytes = 0
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters for health reporting."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'quantize': self.quantize
+            }
+
+
+def _entry_size(key, value):
+    """Approximate memory held by one cache entry."""
+    size = sys.getsizeof(key) + sum(sys.getsizeof(k) for k in key)
+    label, probability = value
+    size += sys.getsizeof(value) + sys.getsizeof(label) + sys.getsizeof(probability)
+    size += sum(sys.getsizeof(p) for p in probability)
+    return size
+
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(model_path):
+    """
+    Return the process-wide cache for a model, configured from environment
+    variables, or None when caching is disabled. There is one cache per
+    model file, so the Flask app and a RoninTraderPredictor serving the same
+    model in one process share it, and a predictor for another model never
+    sees its results.
+
+    PREDICTION_CACHE_SIZE      - max entries, 0 disables the cache (default 0)
+    PREDICTION_CACHE_MAX_BYTES - approximate byte limit (default unlimited)
+    PREDICTION_CACHE_TTL       - entry lifetime in seconds (default none)
+    PREDICTION_CACHE_QUANTIZE  - significant digits in the key (default exact)
+    """
+    max_entries = int(os.getenv('PREDICTION_CACHE_SIZE', 0))
+    if max_entries <= 0:
+        return None
+
+    key = os.path.realpath(model_path) if model_path else None
+    with _shared_lock:
+        if key not in _shared_caches:
+            max_bytes = os.getenv('PREDICTION_CACHE_MAX_BYTES')
+            ttl = os.getenv('PREDICTION_CACHE_TTL')
+            quantize = os.getenv('PREDICTION_CACHE_QUANTIZE')
+            _shared_caches[key] = PredictionCache(
+                max_entries=max_entries,
+                max_bytes=int(max_bytes) if max_bytes else None,
+                ttl=float(ttl) if ttl else None,
+                quantize=int(quantize) if quantize else None,
+                model_path=model_path
+            )
+        return _shared_caches[key]
@@ -0,0 +1,396 @@
+"""
+Ronin Trader Classification - Compressed Forest Variants
+Author: Jo$h
+
+Builds smaller, faster variants of the packed Random Forest without
+retraining. Variants can keep only the first N trees, stop every tree at a
+maximum depth (internal nodes already carry class probabilities), and prune
+subtrees whose children barely move the prediction. They can also store
+thresholds as float32. The float32 thresholds are rounded down, so
+comparisons against float32 inputs do not change.
+
+The report measures ROC-AUC on the notebook's test split and p50/p99
+single-row latency. It also measures 10k-row batch latency, artifact size
+and load time for each variant, and marks the ones on the ROC-AUC vs
+latency Pareto front. The chosen variant is exported in the PackedForest
+directory format that the API serves (PACKED_MODEL_DIR), with the feature
+order and its test ROC-AUC in the manifest, like `inference.py export`.
+
+Usage:
+    python compression.py report
+    python compression.py export --max-auc-drop 0.001 --output models/packed_forest
+    python compression.py export --trees 50 --depth 10 --prune 0.01 --float32
+"""
+
+import argparse
+import itertools
+import os
+import pickle
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from inference import PackedForest
+
+
+def _reachable(children, roots, stop):
+    """
+    Walk every tree from its root without descending below `stop` nodes.
+
+    Returns:
+        tuple: (reachable mask, depth per node; -1 where unreachable)
+    """
+    n_nodes = len(children) // 2
+    depth = np.full(n_nodes, -1, dtype=np.intp)
+    frontier = np.asarray(roots, dtype=np.intp)
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        frontier = frontier[~stop[frontier]]
+        kids = np.concatenate([children[2 * frontier], children[2 * frontier + 1]])
+        frontier = np.unique(kids[depth[kids] == -1])
+        level += 1
+    return depth >= 0, depth
+
+
+def compress(forest, n_trees=None, max_depth=None, prune_tol=None, float32=False):
+    """
+    Derive a reduced variant of a packed forest.
+
+    Args:
+        forest (PackedForest): Source forest (not modified)
+        n_trees (int): Keep only the first n_trees trees
+        max_depth (int): Turn nodes at this depth into leaves
+        prune_tol (float): Collapse a node into a leaf when both children
+            are leaves whose probabilities differ from it by at most this
+        float32 (bool): Store thresholds as float32 (lossless, see float32_thresholds)
+
+    Returns:
+        PackedForest: Compacted forest holding only the reachable nodes
+    """
+    children = np.asarray(forest.children, dtype=np.intp)
+    roots = np.asarray(forest.roots, dtype=np.intp)[:n_trees]
+    value = np.asarray(forest.value)
+    n_nodes = len(children) // 2
+    nodes = np.arange(n_nodes)
+    left, right = children[0::2], children[1::2]
+    leaf = left == nodes
+
+    if max_depth is not None:
+        _, depth = _reachable(children, roots, leaf)
+        leaf = leaf | (depth == max_depth)
+
+    if prune_tol is not None:
+        # Collapse bottom-up until no node qualifies any more
+        while True:
+            collapse = (~leaf & leaf[left] & leaf[right]
+                        & (np.abs(value[left] - value).max(axis=1) <= prune_tol)
+                        & (np.abs(value[right] - value).max(axis=1) <= prune_tol))
+            if not collapse.any():
+                break
+            leaf = leaf | collapse
+
+    keep, depth = _reachable(children, roots, leaf)
+    old = np.flatnonzero(keep)
+    new_index = np.full(n_nodes, -1, dtype=np.intp)
+    new_index[old] = np.arange(len(old))
+
+    pairs = children.reshape(-1, 2)[old]
+    pairs = np.where(leaf[old][:, np.newaxis], old[:, np.newaxis], pairs)
+    new_children = new_index[pairs].ravel()
+    feature = np.where(leaf[old], 0, np.asarray(forest.feature)[old])
+    threshold = np.where(leaf[old], 0.0, np.asarray(forest.threshold, dtype=np.float64)[old])
+    new_roots = new_index[roots]
+
+    if float32:
+        # Index arrays stay intp: narrower ones are converted on every gather
+        threshold = float32_thresholds(threshold)
+
+    compressed = PackedForest(
+        feature=feature,
+        threshold=threshold,
+        children=new_children,
+        value=value[old],
+        roots=new_roots,
+        classes=forest.classes_,
+        max_depth=int(depth[keep].max()),
+        chunk_size=forest.chunk_size
+    )
+    if hasattr(forest, 'n_features_in_'):
+        compressed.n_features_in_ = forest.n_features_in_
+    compressed.compression = {
+        'n_trees': len(roots), 'max_depth': max_depth,
+        'prune_tol': prune_tol, 'float32': float32,
+        'nodes': len(old), 'source_nodes': n_nodes
+    }
+    return compressed
+
+
+def float32_thresholds(threshold):
+    """
+    Round float64 thresholds down to float32.
+
+    For a float32 input x, `x > t` has the same result for t and for the
+    largest float32 not above t, so predictions are unchanged.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def measure_latency(model, X, n_single=500, batch_rows=10_000, repeats=5):
+    """
+    Single-row and batch predict_proba latency.
+
+    Returns:
+        dict: p50_ms and p99_ms per single row, batch_10k_ms for batch_rows
+    """
+    X = np.asarray(X, dtype=np.float64)
+    timings = np.empty(n_single)
+    for i in range(n_single):
+        row = X[i % len(X)].reshape(1, -1)
+        started = time.perf_counter()
+        model.predict_proba(row)
+        timings[i] = time.perf_counter() - started
+
+    batch = np.tile(X, (-(-batch_rows // len(X)), 1))[:batch_rows]
+    batch_timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_proba(batch)
+        batch_timings.append(time.perf_counter() - started)
+
+    return {
+        'p50_ms': float(np.percentile(timings, 50) * 1e3),
+        'p99_ms': float(np.percentile(timings, 99) * 1e3),
+        'batch_10k_ms': float(np.median(batch_timings) * 1e3)
+    }
+
+
+def measure_artifact(save, load):
+    """
+    Save a model to a temporary location and time loading it back.
+
+    Args:
+        save (callable): save(path) writes the artifact
+        load (callable): load(path) reads it back
+
+    Returns:
+        dict: size_mb and load_ms
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'artifact')
+        save(path)
+        size = directory_size(path) if os.path.isdir(path) else os.path.getsize(path)
+        started = time.perf_counter()
+        load(path)
+        load_ms = (time.perf_counter() - started) * 1e3
+    return {'size_mb': size / 2 ** 20, 'load_ms': load_ms}
+
+
+def pickle_artifact(model):
+    """measure_artifact callables for a pickled model."""
+    def save(path):
+        with open(path, 'wb') as f:
+            pickle.dump(model, f)
+
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    return save, load
+
+
+def packed_artifact(forest):
+    """measure_artifact callables for a packed forest directory (memory-mapped load)."""
+    return forest.save, lambda path: PackedForest.load(path, mmap_mode='r')
+
+
+def profile_model(model, X_test, y_test, artifact):
+    """
+    Quality and cost of one model.
+
+    Args:
+        model: Object with predict_proba
+        X_test, y_test: Held-out evaluation data
+        artifact (tuple): (save, load) callables for measure_artifact
+
+    Returns:
+        dict: roc_auc plus latency, size and load time
+    """
+    X_test = np.asarray(X_test, dtype=np.float64)
+    return {
+        'roc_auc': float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])),
+        **measure_latency(model, X_test),
+        **measure_artifact(*artifact)
+    }
+
+
+def pareto_front(report, quality='roc_auc', cost='p50_ms'):
+    """
+    Mark rows not beaten on both quality (higher is better) and cost (lower is better).
+
+    Returns:
+        pd.Series: Boolean mask aligned with report
+    """
+    q = report[quality].to_numpy()
+    c = report[cost].to_numpy()
+    dominated = [
+        bool(np.any((q >= q[i]) & (c <= c[i]) & ((q > q[i]) | (c < c[i]))))
+        for i in range(len(report))
+    ]
+    return ~pd.Series(dominated, index=report.index)
+
+
+DEFAULT_GRID = {
+    'n_trees': [None, 50, 25, 10],
+    'max_depth': [None, 12, 10, 8],
+    'prune_tol': [None, 0.02],
+}
+
+
+def variant_report(model, X_test, y_test, grid=None, verbose=True):
+    """
+    Profile the sklearn model, the exact packed forest and every compressed variant.
+
+    Args:
+        model: Fitted RandomForestClassifier
+        X_test, y_test: Held-out evaluation data
+        grid (dict): Values for compress()'s n_trees, max_depth and prune_tol
+            (all variants use float32 thresholds, which is lossless)
+
+    Returns:
+        pd.DataFrame: One row per variant with a `pareto` column
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    grid = grid or DEFAULT_GRID
+    exact = PackedForest.from_sklearn(model)
+
+    candidates = [('sklearn (pickle)', {}, model, pickle_artifact(model)),
+                  ('packed (exact)', {}, exact, packed_artifact(exact))]
+    for n_trees, max_depth, prune_tol in itertools.product(
+            grid['n_trees'], grid['max_depth'], grid['prune_tol']):
+        spec = {'n_trees': n_trees, 'max_depth': max_depth, 'prune_tol': prune_tol,
+                'float32': True}
+        variant = compress(exact, **spec)
+        name = ', '.join(f'{k}={v}' for k, v in spec.items() if v is not None and k != 'float32')
+        candidates.append((f'packed f32 ({name or "all trees"})', spec, variant,
+                           packed_artifact(variant)))
+
+    rows = []
+    for name, spec, candidate, artifact in candidates:
+        row = {'variant': name, **{k: spec.get(k) for k in ('n_trees', 'max_depth', 'prune_tol')},
+               'float32': spec.get('float32', False),
+               'nodes': len(candidate.feature) if isinstance(candidate, PackedForest) else None,
+               **profile_model(candidate, X_test, y_test, artifact)}
+        rows.append(row)
+        log(f"   {name:<48} AUC {row['roc_auc']:.4f}  p50 {row['p50_ms']:.3f} ms  "
+            f"10k {row['batch_10k_ms']:.1f} ms  {row['size_mb']:.2f} MB")
+
+    report = pd.DataFrame(rows)
+    baseline = report.iloc[0]
+    report['auc_drop'] = baseline['roc_auc'] - report['roc_auc']
+    report['speedup_p50'] = baseline['p50_ms'] / report['p50_ms']
+    report['pareto'] = pareto_front(report)
+    return report
+
+
+def choose_variant(report, max_auc_drop):
+    """
+    Fastest packed variant (by p50) within max_auc_drop of the sklearn model.
+
+    Returns:
+        pd.Series: The chosen report row
+    """
+    packed = report[report['variant'] != 'sklearn (pickle)']
+    eligible = packed[packed['auc_drop'] <= max_auc_drop]
+    if eligible.empty:
+        raise ValueError(f"No variant within an ROC-AUC drop of {max_auc_drop}")
+    return eligible.sort_values(['p50_ms', 'auc_drop']).iloc[0]
+
+
+def _spec(row):
+    """compress() keyword arguments from a report row."""
+    spec = {}
+    for key in ('n_trees', 'max_depth'):
+        if pd.notna(row[key]):
+            spec[key] = int(row[key])
+    if pd.notna(row['prune_tol']):
+        spec['prune_tol'] = float(row['prune_tol'])
+    spec['float32'] = bool(row['float32'])
+    return spec
+
+
+def main():
+    """
+    Command line entry point.
+
+    python compression.py report [--output models/compression_report.csv]
+    python compression.py export --max-auc-drop 0.001 --output models/packed_forest
+    """
+    from train import load_dataset, split_dataset
+
+    parser = argparse.ArgumentParser(description="Compressed forest variants")
+    parser.add_argument('command', choices=['report', 'export'])
+    parser.add_argument('--model', default='models/best_model_random_forest.pkl')
+    parser.add_argument('--features', default='models/feature_names.pkl')
+    parser.add_argument('--data', default='data/ronin_traders_dataset.csv')
+    parser.add_argument('--output', help="Report CSV (report) or forest directory (export)")
+    parser.add_argument('--max-auc-drop', type=float,
+                        help='Export the fastest variant within this ROC-AUC drop')
+    parser.add_argument('--trees', type=int)
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--prune', type=float)
+    parser.add_argument('--float32', action='store_true')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=UserWarning)
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+    _, X_test, _, y_test = split_dataset(*load_dataset(args.data))
+
+    if args.command == 'report' or args.max_auc_drop is not None:
+        print("=" * 80)
+        print(f"COMPRESSED FOREST REPORT - {args.model}")
+        print("=" * 80)
+        report = variant_report(model, X_test, y_test)
+        front = report[report['pareto']].sort_values('p50_ms')
+        print("\nPareto front (ROC-AUC vs p50 latency):")
+        print(front[['variant', 'roc_auc', 'auc_drop', 'p50_ms', 'p99_ms', 'batch_10k_ms',
+                     'size_mb', 'load_ms', 'speedup_p50']].to_string(index=False))
+        if args.command == 'report':
+            output = args.output or 'models/compression_report.csv'
+            report.to_csv(output, index=False)
+            print(f"\n✅ Report saved to {output}")
+            return
+        chosen = choose_variant(report, args.max_auc_drop)
+        print(f"\n🏆 Chosen: {chosen['variant']} (ROC-AUC drop {chosen['auc_drop']:.4f}, "
+              f"{chosen['speedup_p50']:.1f}x faster p50)")
+        spec = _spec(chosen)
+        metrics = {'ROC-AUC': chosen['roc_auc']}
+    else:
+        spec = {'n_trees': args.trees, 'max_depth': args.depth,
+                'prune_tol': args.prune, 'float32': args.float32}
+        metrics = None
+
+    with open(args.features, 'rb') as f:
+        feature_names = pickle.load(f)
+    output = args.output or 'models/packed_forest'
+    forest = compress(PackedForest.from_sklearn(model), **spec)
+    forest.save(output, feature_names=feature_names, metrics=metrics,
+                model_name='Random Forest (compressed)')
+    print(f"✅ Compressed forest ({forest.n_estimators} trees, {len(forest.feature):,} nodes) "
+          f"saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
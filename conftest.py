@@ -0,0 +1,125 @@
+"""
+Shared test fixtures
+Author: Jo$h
+
+Paths, sample inputs and helpers used by more than one test module. pytest
+loads this file before collecting the tests; the modules import from it
+directly, which also works when a test script is run on its own.
+"""
+
+import asyncio
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+MODEL_PATH = "models/best_model_random_forest.pkl"
+FEATURES_PATH = "models/feature_names.pkl"
+DATASET_PATH = "data/ronin_traders_dataset.csv"
+
+TRADER = {
+    'tx_count_365d': 150,
+    'total_volume': 25.5,
+    'active_weeks': 20,
+    'avg_tx_value': 0.17,
+    'tx_per_active_week': 7.5
+}
+
+
+def load_fixtures():
+    """Load the sklearn model, feature names and the dataset feature matrix."""
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    with open(FEATURES_PATH, 'rb') as f:
+        feature_names = pickle.load(f)
+    df = pd.read_csv(DATASET_PATH)
+    return model, feature_names, df[feature_names].to_numpy(dtype=np.float64)
+
+
+def small_tree(directory):
+    """A quickly trained model that scores differently from the forest."""
+    from sklearn.tree import DecisionTreeClassifier
+    from features import FEATURE_COLUMNS
+
+    dataset = pd.read_csv(DATASET_PATH).head(2000)
+    tree = DecisionTreeClassifier(max_depth=2, random_state=0).fit(
+        dataset[FEATURE_COLUMNS], dataset['target_variable'].map({'Good Trader': 1,
+                                                                   'Bad Trader': 0}))
+    path = os.path.join(directory, 'tree.pkl')
+    with open(path, 'wb') as f:
+        pickle.dump(tree, f)
+    return path
+
+
+def call(method, path, payload=None, app=None):
+    """Send one request through the ASGI app and return (status, json)."""
+    if app is None:
+        import asgi_app
+        app = asgi_app.app
+    body = json.dumps(payload).encode() if payload is not None else b''
+    # Deliver the body in two pieces, like a slow client would
+    messages = [
+        {'type': 'http.request', 'body': body[:10], 'more_body': True},
+        {'type': 'http.request', 'body': body[10:], 'more_body': False},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': []}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+# The window [2024-01-07, 2025-01-06) starts on a Sunday, so it touches 53 weeks
+AS_OF = pd.Timestamp('2025-01-06', tz='UTC')
+WINDOW_START = int(AS_OF.timestamp()) - 365 * 86_400
+
+
+def synthetic_log(dataset, seed=0):
+    """Transactions reproducing each wallet's tx count, volume and active weeks."""
+    rng = np.random.default_rng(seed)
+    n_tx = dataset['tx_count_365d'].to_numpy()
+    n_weeks = dataset['active_weeks'].to_numpy()
+    volume = dataset['total_volume'].to_numpy()
+    n_wallets = len(dataset)
+    assert (n_weeks <= 53).all() and (n_weeks <= n_tx).all()
+
+    # Pick each wallet's active weeks (0 = the lone Sunday, 1..52 = full weeks)
+    order = np.argsort(rng.random((n_wallets, 53)), axis=1)
+    chosen = order[np.arange(53) < n_weeks[:, None]]
+    first = np.concatenate([[0], np.cumsum(n_weeks)[:-1]])
+
+    # One transaction in every chosen week, the rest spread over the same weeks
+    extra_wallet = np.repeat(np.arange(n_wallets), n_tx - n_weeks)
+    extra_week = chosen[first[extra_wallet] +
+                        (rng.random(len(extra_wallet)) * n_weeks[extra_wallet]).astype(int)]
+    wallet = np.concatenate([np.repeat(np.arange(n_wallets), n_weeks), extra_wallet])
+    week = np.concatenate([chosen, extra_week])
+
+    day = np.where(week == 0, 0, 7 * week - 6 + rng.integers(0, 7, len(week)))
+    seconds = WINDOW_START + day * 86_400 + rng.integers(0, 86_400, len(week))
+
+    weight = rng.random(len(wallet)) + 0.1
+    value = volume[wallet] * weight / np.bincount(wallet, weight)[wallet]
+
+    log = pd.DataFrame({
+        'wallet': dataset['wallet'].to_numpy()[wallet],
+        'timestamp': pd.to_datetime(seconds, unit='s', utc=True),
+        'value': value
+    })
+    # Transactions just outside the window must be ignored
+    noise = pd.DataFrame({
+        'wallet': dataset['wallet'].to_numpy()[:100],
+        'timestamp': pd.to_datetime(np.where(np.arange(100) % 2, WINDOW_START - 1,
+                                             int(AS_OF.timestamp())), unit='s', utc=True),
+        'value': 1e6
+    })
+    log = pd.concat([log, noise], ignore_index=True)
+    return log.iloc[rng.permutation(len(log))].reset_index(drop=True)
+
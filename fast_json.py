@@ -0,0 +1,97 @@
+"""
+Ronin Trader Classification - Fast JSON Encoding
+Author: Jo$h
+
+Encodes API responses with orjson when it is installed and falls back to the
+standard library otherwise. Both produce the same compact, key-sorted JSON,
+so clients cannot tell which one served them. That includes non-finite
+floats (e.g. the echoed inputs of rows that failed validation): orjson
+writes them as null, and the stdlib fallback is made to do the same rather
+than emit NaN/Infinity, which are not valid JSON. Integers beyond 64 bits
+(valid JSON, but more than orjson encodes) are handed to the stdlib
+encoder, as are any other objects orjson rejects.
+"""
+
+import json
+import math
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _finite(obj):
+    """Copy of obj with NaN and infinities replaced by None, as orjson writes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _numpy_default(default):
+    """stdlib `default` that also converts NumPy arrays and scalars, as orjson does."""
+    def convert(obj):
+        if hasattr(obj, 'tolist'):
+            return _finite(obj.tolist())
+        if default is None:
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+        return default(obj)
+    return convert
+
+
+def dumps(obj, default=None):
+    """
+    Serialize obj to compact, key-sorted JSON.
+
+    Args:
+        obj: JSON-serializable object (NumPy arrays allowed)
+        default (callable): Fallback for objects the encoder does not know
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default,
+                                option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # e.g. an echoed integer input beyond 64 bits
+            pass
+    default = _numpy_default(default)
+    try:
+        text = json.dumps(obj, default=default, separators=(',', ':'), sort_keys=True,
+                          allow_nan=False)
+    except ValueError:
+        # Only re-walk the object when it actually holds NaN or infinity
+        text = json.dumps(_finite(obj), default=default, separators=(',', ':'),
+                          sort_keys=True)
+    return text.encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes responses with orjson when available."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            try:
+                return super().dumps(obj, allow_nan=False, **kwargs)
+            except ValueError:
+                return super().dumps(_finite(obj), **kwargs)
+        return dumps(obj, default=self.default).decode()
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed debug output still goes through the stdlib encoder
+        if orjson is None or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, default=self.default),
+                                        mimetype=self.mimetype)
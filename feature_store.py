@@ -0,0 +1,464 @@
+"""
+Ronin Trader Classification - Wallet Feature Store
+Author: Jo$h
+
+Keeps the five model features current per wallet without recomputing a
+year of history. A SQLite file holds:
+
+    wallets   wallet -> id, tx_count, volume, active_weeks   running totals
+    buckets   (week, wallet id) -> tx_count, volume          one row per active week
+
+New transactions are reduced to weekly buckets with a vectorized group-by,
+bulk-loaded into a staging table and merged with set-based SQL that adds
+them to the buckets and to each wallet's totals. A lookup is therefore one
+indexed read, and the derived features are computed from that row.
+Buckets whose week ended more than 365 days ago are deleted and subtracted
+from their wallets' totals, by update() or by a background thread when
+serving, never inside a lookup. The oldest week is counted whole, so the
+window can reach up to six days further back than the exact one in features.py.
+
+Usage:
+    python feature_store.py update --input transactions.parquet
+    python feature_store.py get 0x15397c6d8ec5c41781636a3512a0f0d096d76512
+    python feature_store.py expire
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import (FEATURE_COLUMNS, SECONDS_PER_DAY, WINDOW_DAYS, _epoch_seconds, _utc,
+                      week_index)
+from streaming import iter_chunks
+
+
+DEFAULT_PATH = 'models/feature_store.sqlite'
+WALLET_PATTERN = re.compile(r'0x[0-9a-f]{40}')
+# SQLite page cache per connection; the default 2 MB thrashes on large stores
+CACHE_MB = int(os.getenv('FEATURE_STORE_CACHE_MB', 256))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    id INTEGER PRIMARY KEY,
+    wallet TEXT NOT NULL UNIQUE,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    volume REAL NOT NULL DEFAULT 0,
+    active_weeks INTEGER NOT NULL DEFAULT 0
+);
+
+-- Keyed by week first: new activity lands at the end of the tree and
+-- expiry is a range delete
+CREATE TABLE IF NOT EXISTS buckets (
+    week INTEGER NOT NULL,
+    wallet_id INTEGER NOT NULL,
+    tx_count INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (week, wallet_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+"""
+
+# Per connection: each chunk's addresses and weekly buckets are bulk-loaded
+# here first
+STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS staged_wallets (
+    code INTEGER PRIMARY KEY,
+    wallet TEXT NOT NULL,
+    id INTEGER
+);
+CREATE TEMP TABLE IF NOT EXISTS staged (
+    week INTEGER NOT NULL,
+    wallet_id INTEGER NOT NULL,
+    tx_count INTEGER NOT NULL,
+    volume REAL NOT NULL
+);
+CREATE TEMP TABLE IF NOT EXISTS expired (
+    wallet_id INTEGER PRIMARY KEY,
+    tx_count INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    weeks INTEGER NOT NULL
+);
+"""
+
+# Gives every staged address a wallet id, adding new wallets
+RESOLVE_WALLETS = [
+    "INSERT OR IGNORE INTO wallets (wallet) SELECT wallet FROM staged_wallets ORDER BY code",
+    "UPDATE staged_wallets SET id = (SELECT id FROM wallets WHERE wallet = staged_wallets.wallet)",
+]
+
+# Merges `staged` into the store. Totals are updated before the buckets,
+# while `buckets` still shows which of the staged weeks are new.
+MERGE_STAGED = [
+    """
+    UPDATE wallets SET tx_count = wallets.tx_count + delta.tx_count,
+                       volume = wallets.volume + delta.volume,
+                       active_weeks = wallets.active_weeks + delta.new_weeks
+    FROM (SELECT staged.wallet_id, SUM(staged.tx_count) AS tx_count,
+                 SUM(staged.volume) AS volume, SUM(buckets.week IS NULL) AS new_weeks
+          FROM staged LEFT JOIN buckets
+               ON buckets.week = staged.week AND buckets.wallet_id = staged.wallet_id
+          GROUP BY staged.wallet_id) AS delta
+    WHERE wallets.id = delta.wallet_id
+    """,
+    """
+    INSERT INTO buckets (week, wallet_id, tx_count, volume)
+    SELECT week, wallet_id, tx_count, volume FROM staged WHERE true
+    ON CONFLICT (week, wallet_id) DO UPDATE SET tx_count = tx_count + excluded.tx_count,
+                                                volume = volume + excluded.volume
+    """,
+    "DELETE FROM staged",
+    "DELETE FROM staged_wallets",
+]
+
+# Removes buckets before :cutoff and takes them out of the wallet totals
+EXPIRE = [
+    "DELETE FROM expired",
+    """
+    INSERT INTO expired
+    SELECT wallet_id, SUM(tx_count), SUM(volume), COUNT(*) FROM buckets
+    WHERE week < :cutoff GROUP BY wallet_id
+    """,
+    "DELETE FROM buckets WHERE week < :cutoff",
+    """
+    UPDATE wallets SET tx_count = wallets.tx_count - expired.tx_count,
+                       volume = MAX(wallets.volume - expired.volume, 0.0),
+                       active_weeks = wallets.active_weeks - expired.weeks
+    FROM expired WHERE wallets.id = expired.wallet_id
+    """,
+]
+
+
+def normalize_wallet(address):
+    """Lower-case 0x form; Ronin's 'ronin:' prefix is accepted too."""
+    address = str(address).strip().lower()
+    if address.startswith('ronin:'):
+        address = '0x' + address[len('ronin:'):]
+    return address
+
+
+def is_wallet_address(address):
+    """True for a 20-byte hex address (after normalize_wallet)."""
+    return WALLET_PATTERN.fullmatch(address) is not None
+
+
+def oldest_week(as_of, window_days=WINDOW_DAYS):
+    """First week still (partly) inside the window ending at as_of."""
+    return int(week_index(int(_utc(as_of).timestamp()) - window_days * SECONDS_PER_DAY))
+
+
+def derive_features(tx_count, volume, active_weeks):
+    """The five model features from a wallet's running totals."""
+    return {
+        'tx_count_365d': tx_count,
+        'total_volume': volume,
+        'active_weeks': active_weeks,
+        'avg_tx_value': volume / tx_count,
+        'tx_per_active_week': tx_count / active_weeks
+    }
+
+
+class FeatureStore:
+    """
+    Persistent per-wallet feature store backed by SQLite.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, window_days=WINDOW_DAYS, expire_interval=None):
+        """
+        Args:
+            path (str): SQLite file (created if missing)
+            window_days (int): Feature window in days
+            expire_interval (float): Seconds between background checks for a
+                new week to expire against the wall clock (for serving);
+                None leaves expiry to update() and expire()
+        """
+        self.path = path
+        self.window_days = window_days
+        self.expire_interval = expire_interval
+        self._local = threading.local()
+        self._expire_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._expired_week = self._meta('expired_week')
+        self._stop = threading.Event()
+        self._thread = None
+        if expire_interval is not None:
+            self._thread = threading.Thread(target=self._run_expiry, name='feature-store-expiry',
+                                            daemon=True)
+            self._thread.start()
+
+    def _conn(self):
+        """One connection per thread; WAL lets readers run during updates."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA mmap_size=1073741824')
+            conn.execute(f'PRAGMA cache_size=-{CACHE_MB * 1024}')
+            conn.executescript(SCHEMA + STAGING)
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key, default=None):
+        row = self._conn().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @property
+    def watermark(self):
+        """Unix seconds of the newest transaction ingested, or None."""
+        return self._meta('watermark')
+
+    def update(self, transactions, as_of=None, chunksize=1_000_000,
+               wallet_col='wallet', time_col='timestamp', value_col='value'):
+        """
+        Add new transactions and expire buckets that left the window.
+
+        Transactions in already-expired weeks are ignored. Ingesting the
+        same transactions twice counts them twice.
+
+        Args:
+            transactions: Path to a .csv/.parquet log, or a DataFrame
+            as_of: End of the window used for expiry (default: the newest
+                transaction seen so far)
+            chunksize (int): Transactions per chunk / transaction
+            wallet_col, time_col, value_col (str): Column names in the log
+
+        Returns:
+            dict: Transactions read, used and buckets written, plus expiry stats
+        """
+        if isinstance(transactions, pd.DataFrame):
+            chunks = (transactions.iloc[i:i + chunksize]
+                      for i in range(0, len(transactions), chunksize))
+        else:
+            chunks = iter_chunks(transactions, chunksize)
+
+        conn = self._conn()
+        watermark = self.watermark
+        stats = {'rows_read': 0, 'rows_used': 0, 'buckets_written': 0}
+        for chunk in chunks:
+            stats['rows_read'] += len(chunk)
+            seconds = _epoch_seconds(chunk[time_col])
+            weeks = week_index(seconds)
+            if self._expired_week is None:
+                keep = np.ones(len(weeks), dtype=bool)
+            else:
+                keep = weeks >= self._expired_week
+            if not keep.any():
+                continue
+
+            # Normalize each distinct address once, not once per transaction
+            codes, uniques = pd.factorize(chunk[wallet_col].to_numpy()[keep])
+            addresses = pd.Series([normalize_wallet(u) for u in uniques])
+            # Addresses that only differ in case share one code; sorted codes
+            # make the wallet index inserts and lookups below sequential
+            wallet_codes, addresses = pd.factorize(addresses, sort=True)
+            frame = pd.DataFrame({
+                'wallet': wallet_codes[codes],
+                'week': weeks[keep],
+                'value': chunk[value_col].to_numpy(dtype=np.float64)[keep]
+            })
+            buckets = frame.groupby(['week', 'wallet'])['value'].agg(['size', 'sum'])
+            buckets = buckets.reset_index()
+            latest = int(seconds[keep].max())
+            watermark = latest if watermark is None else max(watermark, latest)
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany('INSERT INTO staged_wallets (code, wallet) VALUES (?, ?)',
+                                 enumerate(addresses.tolist()))
+                for statement in RESOLVE_WALLETS:
+                    conn.execute(statement)
+                ids = np.array(conn.execute(
+                    'SELECT id FROM staged_wallets ORDER BY code').fetchall())[:, 0]
+                conn.executemany('INSERT INTO staged VALUES (?, ?, ?, ?)', zip(
+                    buckets['week'].tolist(), ids[buckets['wallet'].to_numpy()].tolist(),
+                    buckets['size'].tolist(), buckets['sum'].tolist()))
+                for statement in MERGE_STAGED:
+                    conn.execute(statement)
+                self._set_meta(conn, 'watermark', watermark)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            stats['rows_used'] += len(frame)
+            stats['buckets_written'] += len(buckets)
+
+        if watermark is not None:
+            stats.update(self.expire(as_of if as_of is not None else watermark))
+        return stats
+
+    def expire(self, as_of=None):
+        """
+        Drop buckets that ended more than window_days before as_of.
+
+        Args:
+            as_of: End of the window (default: now, UTC)
+
+        Returns:
+            dict: Buckets expired and wallets updated or removed
+        """
+        cutoff = oldest_week(as_of if as_of is not None else pd.Timestamp.now(tz='UTC'),
+                             self.window_days)
+        conn = self._conn()
+        with self._expire_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for statement in EXPIRE:
+                    conn.execute(statement, {'cutoff': cutoff})
+                expired = conn.execute('SELECT COALESCE(SUM(weeks), 0), COUNT(*) '
+                                       'FROM expired').fetchone()
+                removed = conn.execute(
+                    'DELETE FROM wallets WHERE active_weeks = 0 '
+                    'AND id IN (SELECT wallet_id FROM expired)').rowcount
+                if self._expired_week is None or cutoff > self._expired_week:
+                    self._set_meta(conn, 'expired_week', cutoff)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            self._expired_week = max(cutoff, self._expired_week or cutoff)
+        return {'buckets_expired': expired[0], 'wallets_updated': expired[1] - removed,
+                'wallets_removed': removed}
+
+    def expire_if_due(self):
+        """
+        Expire against the wall clock if a new week has started since the
+        last expiry.
+
+        Returns:
+            dict: expire() stats, or None if nothing was due
+        """
+        cutoff = oldest_week(pd.Timestamp.now(tz='UTC'), self.window_days)
+        if self._expired_week is None or cutoff > self._expired_week:
+            return self.expire()
+        return None
+
+    def _run_expiry(self):
+        # Lookups stay read-only; the week rollover is handled here instead
+        while True:
+            try:
+                self.expire_if_due()
+            except sqlite3.Error as e:
+                print(f"⚠️  Feature store expiry failed: {e}")
+            if self._stop.wait(self.expire_interval):
+                break
+        self._close_conn()
+
+    def get(self, wallet):
+        """
+        Features for one wallet.
+
+        Returns:
+            dict: FEATURE_COLUMNS -> value, or None for a wallet with no
+            transactions in the window
+        """
+        row = self._conn().execute(
+            'SELECT tx_count, volume, active_weeks FROM wallets WHERE wallet = ?',
+            (normalize_wallet(wallet),)).fetchone()
+        return None if row is None else derive_features(*row)
+
+    def get_many(self, wallets):
+        """
+        Features for many wallets.
+
+        Returns:
+            pd.DataFrame: FEATURE_COLUMNS indexed by wallet (normalized);
+            unknown wallets are left out
+        """
+        # Sorted keys walk the wallet index in order
+        keys = sorted({normalize_wallet(wallet) for wallet in wallets})
+        rows = []
+        conn = self._conn()
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows += conn.execute(
+                'SELECT wallet, tx_count, volume, active_weeks FROM wallets '
+                f'WHERE wallet IN ({",".join("?" * len(batch))})', batch).fetchall()
+        frame = pd.DataFrame(rows, columns=['wallet', 'tx_count', 'volume', 'active_weeks'])
+        features = pd.DataFrame(derive_features(frame['tx_count'], frame['volume'],
+                                                frame['active_weeks']))
+        features.index = pd.Index(frame['wallet'], name='wallet')
+        return features[FEATURE_COLUMNS]
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            'path': self.path,
+            'wallets': conn.execute('SELECT COUNT(*) FROM wallets').fetchone()[0],
+            'buckets': conn.execute('SELECT COUNT(*) FROM buckets').fetchone()[0],
+            'watermark': self.watermark,
+            'oldest_week': self._expired_week
+        }
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._close_conn()
+
+    def _close_conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def store_from_env():
+    """The serving store at FEATURE_STORE_PATH, or None if it does not exist."""
+    path = os.getenv('FEATURE_STORE_PATH', DEFAULT_PATH)
+    if not os.path.exists(path):
+        return None
+    return FeatureStore(path,
+                        expire_interval=float(os.getenv('FEATURE_STORE_EXPIRE_INTERVAL', 300)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-wallet rolling feature store")
+    parser.add_argument('--store', default=os.getenv('FEATURE_STORE_PATH', DEFAULT_PATH))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update = subparsers.add_parser('update', help='Ingest a transaction log')
+    update.add_argument('--input', required=True, help='Transaction log (.csv or .parquet)')
+    update.add_argument('--as-of', help='Window end for expiry (default: newest transaction)')
+    update.add_argument('--chunksize', type=int, default=1_000_000)
+    update.add_argument('--wallet-col', default='wallet')
+    update.add_argument('--time-col', default='timestamp')
+    update.add_argument('--value-col', default='value')
+
+    get = subparsers.add_parser('get', help='Print the features of wallets')
+    get.add_argument('wallets', nargs='+')
+
+    expire = subparsers.add_parser('expire', help='Drop buckets older than the window')
+    expire.add_argument('--as-of', help='Window end (default: now, UTC)')
+    args = parser.parse_args()
+
+    store = FeatureStore(args.store)
+    started = time.perf_counter()
+    if args.command == 'update':
+        stats = store.update(args.input, args.as_of, args.chunksize,
+                             args.wallet_col, args.time_col, args.value_col)
+        print(f"✅ {stats['rows_used']:,} transactions -> {stats['buckets_written']:,} bucket "
+              f"updates, {stats['buckets_expired']:,} expired "
+              f"in {time.perf_counter() - started:.1f}s")
+    elif args.command == 'expire':
+        stats = store.expire(args.as_of)
+        print(f"✅ {stats['buckets_expired']:,} buckets expired, "
+              f"{stats['wallets_removed']:,} wallets removed")
+    else:
+        for wallet in args.wallets:
+            print(json.dumps({'wallet': normalize_wallet(wallet), 'features': store.get(wallet)}))
+    print(f"✅ Store: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Ronin Trader Classification - Feature Engineering
+Author: Jo$h
+
+Computes the five model features from raw per-transaction records (wallet,
+timestamp, value) instead of waiting for the precomputed Dune export:
+
+    tx_count_365d       transactions in the window
+    total_volume        sum of transaction values in the window
+    active_weeks        distinct weeks with at least one transaction
+    avg_tx_value        total_volume / tx_count_365d
+    tx_per_active_week  tx_count_365d / active_weeks
+
+The window is [as_of - 365 days, as_of). Weeks start on Monday (UTC), as
+date_trunc('week', ...) does in the Dune query. The log is read once, chunk
+by chunk. Each chunk is reduced with a vectorized group-by to per-wallet
+counts and sums plus its distinct (wallet, week) pairs, and the partials are
+merged as they pile up. Memory therefore follows the number of wallets, not
+the number of transactions.
+
+Usage:
+    python features.py --input transactions.parquet --output features.parquet --as-of 2025-01-01
+    python features.py --input transactions.csv --output scored.csv --score
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from streaming import file_format, iter_chunks
+
+
+FEATURE_COLUMNS = ['tx_count_365d', 'total_volume', 'active_weeks',
+                   'avg_tx_value', 'tx_per_active_week']
+WINDOW_DAYS = 365
+SECONDS_PER_DAY = 86_400
+# 1970-01-01 was a Thursday; the first Monday is 4 days later
+EPOCH_MONDAY_OFFSET_DAYS = 4
+
+
+def _utc(value):
+    """A tz-aware UTC Timestamp from a datetime, string or Unix seconds."""
+    if isinstance(value, (int, float, np.number)):
+        return pd.Timestamp(value, unit='s', tz='UTC')
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+
+def _epoch_seconds(column):
+    """Unix seconds (int64) from a column of datetimes, strings or numbers."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64).astype(np.int64)
+    timestamps = pd.to_datetime(column, utc=True)
+    return timestamps.dt.tz_convert(None).to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+def week_index(seconds):
+    """Monday-start week number since the epoch for Unix seconds."""
+    return (seconds // SECONDS_PER_DAY - EPOCH_MONDAY_OFFSET_DAYS) // 7
+
+
+class FeatureAccumulator:
+    """
+    Incrementally aggregates transaction chunks into per-wallet features.
+    """
+
+    def __init__(self, as_of=None, window_days=WINDOW_DAYS, wallet_col='wallet',
+                 time_col='timestamp', value_col='value', compact_every=16):
+        """
+        Args:
+            as_of: End of the window, exclusive (default: now, UTC)
+            window_days (int): Window length in days
+            wallet_col, time_col, value_col (str): Column names in the log
+            compact_every (int): Chunks between merges of the partial results
+        """
+        self.as_of = _utc(as_of if as_of is not None else pd.Timestamp.now(tz='UTC'))
+        self.window_days = window_days
+        self.wallet_col = wallet_col
+        self.time_col = time_col
+        self.value_col = value_col
+        self.compact_every = compact_every
+
+        self._end = int(self.as_of.timestamp())
+        self._start = self._end - window_days * SECONDS_PER_DAY
+        self._totals = []
+        self._weeks = []
+        self.rows_read = 0
+        self.rows_used = 0
+
+    def update(self, chunk):
+        """Fold one DataFrame of transactions into the running aggregates."""
+        self.rows_read += len(chunk)
+        seconds = _epoch_seconds(chunk[self.time_col])
+        in_window = (seconds >= self._start) & (seconds < self._end)
+        if not in_window.any():
+            return
+
+        frame = pd.DataFrame({
+            'wallet': chunk[self.wallet_col].to_numpy()[in_window],
+            'week': week_index(seconds[in_window]),
+            'value': chunk[self.value_col].to_numpy(dtype=np.float64)[in_window]
+        })
+        self.rows_used += len(frame)
+        self._totals.append(frame.groupby('wallet', sort=False)['value'].agg(['size', 'sum']))
+        self._weeks.append(frame[['wallet', 'week']].drop_duplicates())
+        if len(self._totals) >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        if len(self._totals) > 1:
+            self._totals = [pd.concat(self._totals).groupby(level=0, sort=False).sum()]
+            self._weeks = [pd.concat(self._weeks, ignore_index=True).drop_duplicates()]
+
+    def result(self):
+        """
+        Returns:
+            pd.DataFrame: One row per wallet (index 'wallet'), FEATURE_COLUMNS in order
+        """
+        if not self._totals:
+            return pd.DataFrame(columns=FEATURE_COLUMNS, index=pd.Index([], name='wallet'))
+        self._compact()
+        totals = self._totals[0]
+        active_weeks = self._weeks[0].groupby('wallet', sort=False).size()
+
+        tx_count = totals['size'].astype(np.int64)
+        total_volume = totals['sum']
+        active_weeks = active_weeks.reindex(totals.index).astype(np.int64)
+        features = pd.DataFrame({
+            'tx_count_365d': tx_count,
+            'total_volume': total_volume,
+            'active_weeks': active_weeks,
+            'avg_tx_value': total_volume / tx_count,
+            'tx_per_active_week': tx_count / active_weeks
+        })
+        features.index.name = 'wallet'
+        return features[FEATURE_COLUMNS]
+
+
+def compute_features(transactions, as_of=None, window_days=WINDOW_DAYS, chunksize=1_000_000,
+                     wallet_col='wallet', time_col='timestamp', value_col='value'):
+    """
+    Compute model features from a transaction log.
+
+    Args:
+        transactions: Path to a .csv/.parquet log, or a DataFrame
+        as_of: End of the window, exclusive (default: now, UTC)
+        window_days (int): Window length in days
+        chunksize (int): Transactions read per chunk
+        wallet_col, time_col, value_col (str): Column names in the log
+
+    Returns:
+        pd.DataFrame: Features indexed by wallet
+    """
+    accumulator = FeatureAccumulator(as_of, window_days, wallet_col, time_col, value_col)
+    if isinstance(transactions, pd.DataFrame):
+        chunks = (transactions.iloc[i:i + chunksize]
+                  for i in range(0, len(transactions), chunksize))
+    else:
+        chunks = iter_chunks(transactions, chunksize)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute trader features from raw transactions")
+    parser.add_argument('--input', required=True, help='Transaction log (.csv or .parquet)')
+    parser.add_argument('--output', required=True, help='Features (.csv or .parquet)')
+    parser.add_argument('--as-of', help='End of the 365-day window (default: now, UTC)')
+    parser.add_argument('--window-days', type=int, default=WINDOW_DAYS)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--wallet-col', default='wallet')
+    parser.add_argument('--time-col', default='timestamp')
+    parser.add_argument('--value-col', default='value')
+    parser.add_argument('--score', action='store_true',
+                        help='Add predictions from RoninTraderPredictor')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    features = compute_features(args.input, args.as_of, args.window_days, args.chunksize,
+                                args.wallet_col, args.time_col, args.value_col)
+    if args.score:
+        from predict import RoninTraderPredictor
+        features = RoninTraderPredictor().predict_batch(features, copy=False)
+
+    features = features.reset_index()
+    if file_format(args.output) == 'csv':
+        features.to_csv(args.output, index=False)
+    else:
+        features.to_parquet(args.output, index=False)
+    print(f"✅ Features for {len(features):,} wallets written to {args.output} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Ronin Trader Classification - Concurrent Fetch Client
+Author: Jo$h
+
+Downloads many query results at once over one pooled requests.Session.
+A thread pool runs the downloads and a semaphore per host caps how many hit
+the same server at a time. 429 and 5xx responses to idempotent requests are
+retried with exponential backoff and jitter; a POST is sent once, since a
+retry could make the server run it twice. Retry-After is honoured, and a 429 pauses
+every request to that host, not just the one that got it. Each shard is
+streamed to disk, and its length and SHA-256 are checked against
+Content-Length (unless the body was compressed in transit) and an expected
+checksum (from the job or an X-Checksum-SHA256 header). The shards are then
+merged into one CSV or Parquet file.
+
+Usage:
+    python fetch_client.py --queries 6221750 6221751 --output data/merged.parquet
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from ingest import DEFAULT_BASE_URL, _ParquetAppender, results_url
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CHECKSUM_HEADER = 'X-Checksum-SHA256'
+
+# Methods that are safe to send again after a failure
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class ChecksumError(IOError):
+    """A downloaded body does not match its expected length or checksum."""
+
+
+class FetchError(IOError):
+    """A request still failed after every retry."""
+
+
+# Network failures and bad bodies are retried like a 5xx
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout,
+                requests.exceptions.ChunkedEncodingError, ChecksumError)
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (seconds or an HTTP date); None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class FetchClient:
+    """
+    Pooled, rate-limit aware HTTP client for fetching many results concurrently.
+    """
+
+    def __init__(self, max_concurrency=8, per_host_limit=4, max_retries=5,
+                 backoff_base=0.5, backoff_max=30.0, timeout=60, headers=None,
+                 chunk_bytes=1 << 20):
+        """
+        Args:
+            max_concurrency (int): Downloads running at once overall
+            per_host_limit (int): Requests in flight to any one host
+            max_retries (int): Retries per request after the first attempt
+            backoff_base (float): First backoff in seconds, doubled per retry
+            backoff_max (float): Longest single backoff in seconds
+            timeout (float): Connect/read timeout per request in seconds
+            headers (dict): Headers sent with every request (e.g. API key)
+            chunk_bytes (int): Bytes read from the socket at a time
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.chunk_bytes = chunk_bytes
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency,
+                              pool_maxsize=max(max_concurrency, per_host_limit))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(headers or {})
+
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._host_paused_until = {}
+        self.retries = 0
+        self.rate_limited = 0
+
+    def _slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _wait_for_host(self, host):
+        with self._lock:
+            pause = self._host_paused_until.get(host, 0.0) - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        if response is not None:
+            retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        # Full jitter keeps concurrent retries from arriving in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _attempt(self, method, url, handle, **kwargs):
+        """One request while holding the host's slot; handle(response) reads the body."""
+        host = urlparse(url).netloc
+        self._wait_for_host(host)
+        with self._slot(host):
+            with self.session.request(method, url, timeout=self.timeout, **kwargs) as response:
+                if response.status_code in RETRY_STATUSES:
+                    return response, False, None
+                response.raise_for_status()
+                return response, True, handle(response)
+
+    def request(self, method, url, handle=None, **kwargs):
+        """
+        Send a request, with retries for idempotent methods.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute URL
+            handle (callable): handle(response) consumes the (streamed) body;
+                its ChecksumError triggers a retry. Default: response.content
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            The value returned by handle
+        """
+        handle = handle or (lambda response: response.content)
+        host = urlparse(url).netloc
+        last_error = None
+        # A retried POST could run twice on the server (e.g. a second query execution)
+        attempts = self.max_retries + 1 if method.upper() in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(attempts):
+            if attempt:
+                with self._lock:
+                    self.retries += 1
+            try:
+                response, done, result = self._attempt(method, url, handle, **kwargs)
+            except RETRY_ERRORS as e:
+                last_error = e
+                if attempt + 1 < attempts:
+                    time.sleep(self._backoff(attempt + 1))
+                continue
+
+            if done:
+                return result
+
+            last_error = FetchError(f"{response.status_code} from {url}")
+            delay = self._backoff(attempt + 1, response)
+            if response.status_code == 429:
+                # Everyone talking to this host backs off, not just this request
+                with self._lock:
+                    self.rate_limited += 1
+                    self._host_paused_until[host] = max(
+                        self._host_paused_until.get(host, 0.0), time.monotonic() + delay)
+            if attempt + 1 < attempts:
+                time.sleep(delay)
+
+        raise FetchError(f"{method} {url} failed after {attempts} attempt(s): {last_error}")
+
+    def download(self, job, directory):
+        """
+        Stream one job's response to <directory>/<name>, verifying it.
+
+        Args:
+            job (dict): name, url, and optionally params, headers and sha256
+            directory (str): Where the shard is written
+
+        Returns:
+            dict: name, path, bytes and sha256 of the verified shard
+        """
+        path = os.path.join(directory, job['name'])
+
+        def save(response):
+            digest = hashlib.sha256()
+            written = 0
+            with open(path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+
+            # Content-Length counts the encoded body; iter_content yields it decoded
+            expected_length = response.headers.get('Content-Length')
+            encoded = response.headers.get('Content-Encoding', 'identity') != 'identity'
+            if expected_length is not None and not encoded and int(expected_length) != written:
+                raise ChecksumError(f"{job['name']}: got {written} of {expected_length} bytes")
+            expected = job.get('sha256') or response.headers.get(CHECKSUM_HEADER)
+            if expected and expected.lower() != digest.hexdigest():
+                raise ChecksumError(f"{job['name']}: SHA-256 mismatch")
+            return {'name': job['name'], 'path': path, 'bytes': written,
+                    'sha256': digest.hexdigest()}
+
+        return self.request('GET', job['url'], handle=save, params=job.get('params'),
+                            headers=job.get('headers'), stream=True)
+
+    def fetch_all(self, jobs, directory):
+        """
+        Download every job concurrently.
+
+        Returns:
+            list: download() results in job order
+        """
+        os.makedirs(directory, exist_ok=True)
+        with ThreadPoolExecutor(self.max_concurrency, thread_name_prefix='fetch') as executor:
+            return list(executor.map(lambda job: self.download(job, directory), jobs))
+
+    def stats(self):
+        return {'retries': self.retries, 'rate_limited': self.rate_limited,
+                'hosts': sorted(self._host_slots)}
+
+    def close(self):
+        self.session.close()
+
+
+def merge_shards(paths, output):
+    """
+    Concatenate CSV shards (each with a header row) into one file.
+
+    The output format follows the extension: .parquet is written with the
+    same streaming converter as ingest.py, anything else as CSV.
+
+    Returns:
+        int: Rows written for Parquet output, bytes for CSV
+    """
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tmp = f'{output}.tmp'
+    if output.endswith('.parquet'):
+        appender = _ParquetAppender(tmp)
+        try:
+            for path in paths:
+                appender.append_csv(path)
+        finally:
+            appender.close()
+        os.replace(tmp, output)
+        return appender.rows
+
+    with open(tmp, 'wb') as out:
+        for i, path in enumerate(paths):
+            with open(path, 'rb') as shard:
+                if i:
+                    shard.readline()  # header already written by the first shard
+                shutil.copyfileobj(shard, out)
+        size = out.tell()
+    os.replace(tmp, output)
+    return size
+
+
+def dune_jobs(query_ids, base_url=DEFAULT_BASE_URL, params=None):
+    """
+    Jobs for the CSV results of several Dune queries.
+
+    Args:
+        query_ids (list): Dune query IDs
+        params (dict): Extra query string parameters sent with every job
+    """
+    return [{'name': f'query-{query_id}.csv', 'url': results_url(base_url, query_id),
+             'params': params} for query_id in query_ids]
+
+
+def fetch_and_merge(jobs, output, client=None):
+    """
+    Download jobs concurrently into a scratch directory and merge them.
+
+    Returns:
+        dict: shards (download results), output path, merged size and client stats
+    """
+    client = client or FetchClient()
+    directory = os.path.dirname(output) or '.'
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=directory, prefix='.shards-') as scratch:
+        shards = client.fetch_all(jobs, scratch)
+        merged = merge_shards([shard['path'] for shard in shards], output)
+    return {'shards': shards, 'output': output, 'merged': merged, 'stats': client.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch several Dune query results concurrently")
+    parser.add_argument('--queries', nargs='+', required=True, help='Dune query IDs')
+    parser.add_argument('--output', default='data/merged.parquet')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--retries', type=int, default=5)
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_key = os.getenv("DEFI_JOSH_DUNE_QUERY_API_KEY")
+    base_url = os.getenv('DUNE_API_BASE_URL', DEFAULT_BASE_URL)
+    client = FetchClient(max_concurrency=args.concurrency, per_host_limit=args.per_host,
+                         max_retries=args.retries, headers={"X-DUNE-API-KEY": api_key})
+
+    started = time.perf_counter()
+    result = fetch_and_merge(dune_jobs(args.queries, base_url), args.output, client)
+    total = sum(shard['bytes'] for shard in result['shards'])
+    print(f"✅ {len(result['shards'])} results ({total / 2 ** 20:.2f} MB) merged into "
+          f"{args.output} in {time.perf_counter() - started:.1f}s "
+          f"({result['stats']['retries']} retries, "
+          f"{result['stats']['rate_limited']} rate limited)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Ronin Trader Classification - gunicorn configuration
+Author: Jo$h
+
+Loads the app (and model) once in the master with preload_app, then forks
+workers that share it. With PACKED_MODEL_DIR set, the forest's node arrays
+are memory-mapped read-only, so workers share the same page-cache pages and
+adding workers costs almost no extra model memory. Each worker logs its
+private vs shared memory at startup.
+"""
+
+import gc
+import os
+
+from memstats import format_memory, memory_usage
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+timeout = 60
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far into a permanent GC generation so the
+    # collector never touches (and copies) those pages in the workers
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Master memory after preload: {format_memory(memory_usage())}")
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} memory: {format_memory(memory_usage())}")
@@ -0,0 +1,592 @@
+"""
+Ronin Trader Classification - Packed Forest Inference Engine
+Author: Jo$h
+
+Array-backed inference for the trained Random Forest. All trees are flattened
+into packed NumPy arrays at load time and evaluated for a whole batch with
+vectorized code, skipping sklearn's per-call input validation and per-tree
+joblib dispatch. Probabilities are bit-identical to predict_proba.
+
+The packed arrays are also the model's native, pickle-free format:
+
+    models/best_model_random_forest/
+        forest.json       manifest: format version, feature order, class
+                          mapping, training metrics, and each array's
+                          dtype, shape and SHA-256
+        feature.npy       \
+        threshold.npy      |  node arrays (plain numeric .npy, loaded with
+        children.npy       |  allow_pickle=False)
+        value.npy          |
+        roots.npy         /
+
+Loading runs no code from the files, does not depend on the sklearn
+version that trained the model, and memory-maps the arrays read-only.
+load_engine() maps a forest's export instead of unpickling it, which skips
+importing sklearn altogether. Exports are written by an explicit step
+(`python inference.py export`), never as a side effect of serving.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+ENGINES = ('auto', 'sklearn', 'packed')
+
+# Node arrays written by PackedForest.save, one .npy file each
+ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+# Manifest written by PackedForest.save, last, so its presence marks a complete export
+FOREST_FILE = 'forest.json'
+FORMAT = 'ronin-forest'
+FORMAT_VERSION = 1
+
+# Target encoding used in the notebook and train.py
+CLASS_LABELS = {0: 'Bad Trader', 1: 'Good Trader'}
+
+
+class ModelFormatError(ValueError):
+    """A forest directory is incomplete, corrupt or from an unknown format version."""
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, read in 1 MiB blocks (export and registry checksums)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _plain(value):
+    """JSON-safe copy of a manifest value (NumPy scalars become Python ones)."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class PackedForest:
+    """
+    A Random Forest classifier flattened into contiguous node arrays.
+
+    Every tree's nodes live in the same arrays, addressed by a global node
+    index. Children are interleaved in `children` as [left, right] pairs and
+    leaves point back at themselves, so walking all trees for a batch is just
+    `max_depth` rounds of gather/compare.
+
+    Exposes the parts of the sklearn classifier API the app and predictor
+    use: `classes_`, `n_features_in_`, `predict_proba` and `predict`.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes,
+                 max_depth, chunk_size=4096):
+        """
+        Args:
+            feature (np.ndarray): Split feature per node (0 for leaves)
+            threshold (np.ndarray): Split threshold per node (float64, or
+                float32 rounded down as written by compression.py)
+            children (np.ndarray): Interleaved [left, right] child indices
+            value (np.ndarray): Normalized class probabilities per node
+            roots (np.ndarray): Global index of each tree's root node
+            classes (np.ndarray): Class labels, as in `classes_`
+            max_depth (int): Deepest tree depth across the forest
+            chunk_size (int): Rows evaluated at once, bounds scratch memory
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.chunk_size = chunk_size
+        self.n_classes_ = len(classes)
+        self.n_estimators = len(roots)
+        # Directory the arrays were loaded from, if any (see save/load)
+        self.path = None
+        # How the forest was reduced, if it is a compression.py variant
+        self.compression = None
+        # Feature order, if known (stored in the manifest by save)
+        self.feature_names = None
+        # forest.json of the directory the forest was loaded from
+        self.manifest = None
+
+    @classmethod
+    def from_sklearn(cls, forest, **kwargs):
+        """
+        Flatten a fitted sklearn RandomForestClassifier.
+
+        Args:
+            forest: Fitted RandomForestClassifier (single output)
+
+        Returns:
+            PackedForest: Engine producing identical probabilities
+        """
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes, dtype=np.intp) + offset
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, nodes, tree.children_left + offset)
+            right = np.where(is_leaf, nodes, tree.children_right + offset)
+            pair = np.empty(2 * n_nodes, dtype=np.intp)
+            pair[0::2] = left
+            pair[1::2] = right
+
+            # Same normalization DecisionTreeClassifier.predict_proba applies
+            value = tree.value[:, 0, :forest.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(pair)
+            values.append(value)
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        packed = cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            classes=forest.classes_,
+            max_depth=max_depth,
+            **kwargs
+        )
+        packed.n_features_in_ = forest.n_features_in_
+        return packed
+
+    def save(self, directory, feature_names=None, metrics=None, model_name=None, source=None):
+        """
+        Write the node arrays as .npy files plus the forest.json manifest.
+
+        The .npy files can be memory-mapped by PackedForest.load, so several
+        processes reading the same directory share one copy in the page cache.
+        The new export is staged under a temporary name, so readers never
+        see a half-written one. It then replaces an existing export by two
+        renames: the old directory is moved aside, the new one moved in, and
+        only then is the old one deleted. A crash at any point leaves a
+        complete export (at worst the old one, still under its `.old` name),
+        and processes that already mapped the old arrays keep them.
+
+        Args:
+            directory (str): Output directory (replaced if it exists)
+            feature_names (list): Feature order the model was trained on
+                (default: self.feature_names)
+            metrics (dict): Training/evaluation metrics stored in the manifest
+            model_name (str): Display name, e.g. 'Random Forest'
+            source (str): Pickle this forest was exported from; its
+                fingerprint lets load_engine serve the export in its place
+                while the pickle is unchanged
+
+        Returns:
+            dict: The manifest written to forest.json
+
+        Raises:
+            ModelFormatError: If feature_names does not match the forest
+        """
+        feature_names = feature_names if feature_names is not None else self.feature_names
+        n_features = getattr(self, 'n_features_in_', None)
+        if feature_names is not None and n_features is not None and len(feature_names) != n_features:
+            raise ModelFormatError(f"{len(feature_names)} feature names for a forest "
+                                   f"with {n_features} features")
+
+        staging = f'{directory.rstrip(os.sep)}.tmp{os.getpid()}'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        arrays = {}
+        for name in ARRAYS:
+            path = os.path.join(staging, f'{name}.npy')
+            array = np.ascontiguousarray(getattr(self, name))
+            np.save(path, array)
+            arrays[name] = {'file': f'{name}.npy', 'dtype': array.dtype.str,
+                            'shape': list(array.shape), 'sha256': file_sha256(path)}
+
+        classes = [_plain(label) for label in self.classes_]
+        manifest = {
+            'format': FORMAT,
+            'format_version': FORMAT_VERSION,
+            'model_name': model_name,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'feature_names': list(feature_names) if feature_names is not None else None,
+            # Column i of predict_proba is classes[i]
+            'classes': classes,
+            'class_labels': {str(label): CLASS_LABELS.get(label, str(label)) for label in classes},
+            'n_estimators': self.n_estimators,
+            'max_depth': self.max_depth,
+            'n_features_in': n_features,
+            'compression': self.compression,
+            'metrics': {key: _plain(value) for key, value in (metrics or {}).items()},
+            'arrays': arrays,
+            'source': source_fingerprint(source) if source else None
+        }
+        with open(os.path.join(staging, FOREST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        old = f'{directory.rstrip(os.sep)}.old{os.getpid()}'
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(directory):
+            os.replace(directory, old)
+        os.replace(staging, directory)
+        shutil.rmtree(old, ignore_errors=True)
+        return manifest
+
+    @staticmethod
+    def read_manifest(directory):
+        """
+        Read and check a forest directory's forest.json.
+
+        Raises:
+            ModelFormatError: If it is missing, malformed or incomplete, or
+                from an older or newer format version
+        """
+        try:
+            with open(os.path.join(directory, FOREST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ModelFormatError(f"Cannot read {FOREST_FILE} in {directory}: {e}")
+        if not isinstance(manifest, dict):
+            raise ModelFormatError(f"{FOREST_FILE} in {directory} is not a JSON object")
+        version = manifest.get('format_version')
+        if manifest.get('format') != FORMAT or not isinstance(version, int):
+            raise ModelFormatError(f"{directory} is not a {FORMAT} v{FORMAT_VERSION} export; "
+                                   "re-export it with `python inference.py export`")
+        if version > FORMAT_VERSION:
+            raise ModelFormatError(f"{directory} uses format version {version}, "
+                                   f"this code reads up to {FORMAT_VERSION}")
+
+        missing = [key for key in ('arrays', 'classes', 'max_depth') if key not in manifest]
+        if missing:
+            raise ModelFormatError(f"{FOREST_FILE} in {directory} is missing {missing}")
+        arrays = manifest['arrays']
+        for name in ARRAYS:
+            spec = arrays.get(name) if isinstance(arrays, dict) else None
+            if (not isinstance(spec, dict)
+                    or not {'file', 'dtype', 'shape', 'sha256'} <= set(spec)
+                    or spec['file'] != os.path.basename(str(spec['file']))):
+                raise ModelFormatError(f"{FOREST_FILE} in {directory} does not describe "
+                                       f"{name}.npy")
+        return manifest
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r', verify=True, **kwargs):
+        """
+        Load a forest written by save().
+
+        Array dtypes, shapes and node indices are always checked against the
+        manifest, so a damaged export fails here and not per request.
+
+        Args:
+            directory (str): Directory written by save()
+            mmap_mode (str): np.load mmap mode; 'r' maps the arrays read-only
+                instead of reading them into private memory, None reads them
+            verify (bool): Check the SHA-256 of every array file first (reads
+                each file once; skip it when the files were just verified or
+                written by this process)
+
+        Returns:
+            PackedForest: Engine backed by the (mapped) arrays
+
+        Raises:
+            ModelFormatError: If the directory fails any check
+        """
+        manifest = cls.read_manifest(directory)
+        arrays = {}
+        for name in ARRAYS:
+            spec = manifest['arrays'][name]
+            path = os.path.join(directory, spec['file'])
+            if not os.path.isfile(path):
+                raise ModelFormatError(f"{directory}: missing {spec['file']}")
+            if verify and file_sha256(path) != spec['sha256']:
+                raise ModelFormatError(f"{directory}: checksum mismatch for {spec['file']}")
+            try:
+                arrays[name] = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+            except ValueError as e:
+                raise ModelFormatError(f"Cannot load {path}: {e}")
+            if arrays[name].dtype.str != spec['dtype'] or list(arrays[name].shape) != spec['shape']:
+                raise ModelFormatError(f"{spec['file']} is {arrays[name].dtype.str} "
+                                       f"{list(arrays[name].shape)}, manifest says "
+                                       f"{spec['dtype']} {spec['shape']}")
+
+        packed = cls(classes=np.array(manifest['classes']), max_depth=manifest['max_depth'],
+                     **arrays, **kwargs)
+        if manifest.get('n_features_in') is not None:
+            packed.n_features_in_ = manifest['n_features_in']
+        packed._check_nodes()
+        packed.compression = manifest.get('compression')
+        packed.feature_names = manifest.get('feature_names')
+        packed.manifest = manifest
+        packed.path = directory
+        return packed
+
+    def _check_nodes(self):
+        """Array lengths and index ranges, so a bad export cannot index out of bounds."""
+        n_nodes = len(self.feature)
+        if (len(self.children) != 2 * n_nodes or len(self.threshold) != n_nodes
+                or len(self.value) != n_nodes or self.value.shape[1:] != (self.n_classes_,)):
+            raise ModelFormatError("Node arrays have inconsistent lengths")
+        n_features = getattr(self, 'n_features_in_', None)
+        checks = [('children', self.children, n_nodes), ('roots', self.roots, n_nodes)]
+        if n_features is not None:
+            checks.append(('feature', self.feature, n_features))
+        for name, array, limit in checks:
+            if len(array) and (array.min() < 0 or array.max() >= limit):
+                raise ModelFormatError(f"{name}.npy has indices outside [0, {limit})")
+
+    def _validate(self, X):
+        """Convert input to a float32 matrix the way sklearn's trees do."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2D array, got {X.ndim}D input")
+        n_features = getattr(self, 'n_features_in_', None)
+        if n_features is not None and X.shape[1] != n_features:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model expects {n_features}"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        return X
+
+    def _predict_chunk(self, X):
+        """Walk every tree for one chunk of rows and average the leaf values."""
+        n_samples, n_features = X.shape
+        flat = X.ravel()
+        row_offset = np.arange(n_samples, dtype=np.intp) * n_features
+
+        node = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            x = flat[row_offset + self.feature[node]]
+            # float32 inputs are compared against float64 thresholds, as in sklearn
+            go_right = x > self.threshold[node]
+            node = self.children[2 * node + go_right]
+
+        leaf_values = self.value[node]
+        # Accumulate tree by tree, in order, to match sklearn's summation exactly
+        proba = np.zeros((n_samples, self.n_classes_), dtype=np.float64)
+        for tree_values in leaf_values:
+            proba += tree_values
+        proba /= self.n_estimators
+        return proba
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities.
+
+        Args:
+            X (array-like): (n_samples, n_features) feature matrix
+
+        Returns:
+            np.ndarray: (n_samples, n_classes) probabilities
+        """
+        X = self._validate(X)
+        if X.shape[0] <= self.chunk_size:
+            return self._predict_chunk(X)
+
+        proba = np.empty((X.shape[0], self.n_classes_), dtype=np.float64)
+        for start in range(0, X.shape[0], self.chunk_size):
+            stop = start + self.chunk_size
+            proba[start:stop] = self._predict_chunk(X[start:stop])
+        return proba
+
+    def predict(self, X):
+        """
+        Predict class labels.
+
+        Args:
+            X (array-like): (n_samples, n_features) feature matrix
+
+        Returns:
+            np.ndarray: Predicted class label per row
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def _is_forest(model):
+    from sklearn.ensemble import RandomForestClassifier
+
+    return isinstance(model, RandomForestClassifier)
+
+
+def build_engine(model, engine='sklearn'):
+    """
+    Wrap a fitted model in the requested inference engine.
+
+    Args:
+        model: Fitted sklearn RandomForestClassifier (or a PackedForest,
+            which is returned as is)
+        engine (str): 'sklearn' to use the model as-is, 'packed' for
+            PackedForest, 'auto' to pack Random Forests and use any other
+            model as-is
+
+    Returns:
+        An object exposing classes_, predict and predict_proba
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inference engine '{engine}'. Choose from {ENGINES}")
+    if isinstance(model, PackedForest) or engine == 'sklearn':
+        return model
+    if engine == 'auto' and not _is_forest(model):
+        return model
+    return PackedForest.from_sklearn(model)
+
+
+def native_path(model_path):
+    """Where the native export of a pickle lives: models/x.pkl -> models/x/."""
+    return os.path.splitext(model_path)[0]
+
+
+def source_fingerprint(model_path):
+    """Name, size and mtime of a pickle, to tell whether an export is current."""
+    stat = os.stat(model_path)
+    return {'file': os.path.basename(model_path), 'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns}
+
+
+def find_export(model_path, packed_dir=None):
+    """
+    The export to serve in place of a pickle, or None to use the pickle.
+
+    Args:
+        model_path (str): Pickled model
+        packed_dir (str): Export location (default: native_path(model_path))
+
+    Returns:
+        str: packed_dir if it was exported from this exact file (same name,
+        size and mtime), else None; a missing or stale export means None
+    """
+    packed_dir = packed_dir or native_path(model_path)
+    try:
+        with open(os.path.join(packed_dir, FOREST_FILE)) as f:
+            source = json.load(f).get('source')
+        current = source == source_fingerprint(model_path)
+    except (OSError, ValueError):
+        current = False
+    return packed_dir if current else None
+
+
+def load_engine(model_path, engine='auto', packed_dir=None):
+    """
+    Load a model for inference, from its native export when possible.
+
+    model_path may be a forest directory written by PackedForest.save,
+    which is checked and memory-mapped. For a pickle with engine='auto',
+    a current export (see find_export) is mapped instead: no unpickling,
+    and sklearn is never imported. Otherwise the pickle is loaded and
+    wrapped by build_engine, so an explicit 'sklearn' or 'packed' engine
+    always gets the engine it asked for. Nothing is written, so this works
+    on read-only images and concurrent workers never race on the export.
+
+    Args:
+        model_path (str): Pickled model or forest directory
+        engine (str): 'auto', 'sklearn' or 'packed' (see build_engine)
+        packed_dir (str): Native export location (default: native_path(model_path))
+
+    Returns:
+        An object exposing classes_, predict and predict_proba
+
+    Raises:
+        ValueError: For engine='sklearn' with a forest directory, which
+            has no sklearn model to serve
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inference engine '{engine}'. Choose from {ENGINES}")
+    if os.path.isdir(model_path):
+        if engine == 'sklearn':
+            raise ValueError(f"{model_path} is a packed forest export; "
+                             "engine 'sklearn' needs the pickled model")
+        return PackedForest.load(model_path, mmap_mode='r')
+    if engine == 'auto':
+        directory = find_export(model_path, packed_dir)
+        if directory:
+            return PackedForest.load(directory, mmap_mode='r')
+
+    with open(model_path, 'rb') as f:
+        return build_engine(pickle.load(f), engine)
+
+
+def export_native(model_path, output=None, feature_names=None, metrics=None,
+                  model_name=None):
+    """
+    Write the native export of a pickled forest, for load_engine to map.
+
+    Args:
+        model_path (str): Pickled RandomForestClassifier
+        output (str): Export directory (default: native_path(model_path))
+        feature_names (list): Feature order the model was trained on
+        metrics (dict): Training/evaluation metrics for the manifest
+        model_name (str): Display name, e.g. 'Random Forest'
+
+    Returns:
+        PackedForest: The exported forest
+
+    Raises:
+        ModelFormatError: If the pickle is not a Random Forest
+    """
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    if not _is_forest(model):
+        raise ModelFormatError(f"Only Random Forests can be exported, got "
+                               f"{type(model).__name__}; keep serving this model from its pickle")
+    forest = PackedForest.from_sklearn(model)
+    forest.save(output or native_path(model_path), feature_names=feature_names,
+                metrics=metrics, model_name=model_name, source=model_path)
+    return forest
+
+
+def main():
+    """
+    Command line entry point.
+
+    python inference.py export --model models/best_model_random_forest.pkl \
+        --features models/feature_names.pkl --results models/model_comparison_results.csv
+        (writes models/best_model_random_forest/; --output to change)
+    python inference.py verify models/best_model_random_forest
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Packed forest tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export', help='Write a pickled forest as packed .npy arrays')
+    export.add_argument('--model', default='models/best_model_random_forest.pkl')
+    export.add_argument('--features', default='models/feature_names.pkl')
+    export.add_argument('--output', help='Output directory (default: model path without .pkl)')
+    export.add_argument('--results', help='model_comparison_results.csv to take metrics from')
+    export.add_argument('--name', default='Random Forest', help='Model name in the results')
+    verify = subparsers.add_parser('verify', help='Check a forest directory')
+    verify.add_argument('directory')
+    args = parser.parse_args()
+
+    if args.command == 'verify':
+        forest = PackedForest.load(args.directory)
+        print(f"✅ {args.directory}: {forest.manifest['model_name']}, "
+              f"{forest.n_estimators} trees, features {forest.feature_names}, checksums OK")
+        return
+
+    with open(args.features, 'rb') as f:
+        feature_names = pickle.load(f)
+    metrics = None
+    if args.results:
+        from registry import metrics_from_results
+
+        metrics = metrics_from_results(args.results, args.name)
+    output = args.output or native_path(args.model)
+    forest = export_native(args.model, output, feature_names=feature_names, metrics=metrics,
+                           model_name=args.name)
+    print(f"✅ Packed forest ({forest.n_estimators} trees, {len(forest.feature):,} nodes) "
+          f"saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
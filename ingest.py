@@ -0,0 +1,261 @@
+"""
+Ronin Trader Classification - Dataset Ingestion
+Author: Jo$h
+
+Downloads the Dune query result behind the training dataset and stores it as
+compressed Parquet with a schema manifest. The response is streamed to disk
+in chunks and converted block by block, so the full result never sits in
+memory. With a page size it is also fetched in limit/offset pages.
+
+A refresh is skipped when upstream has nothing new. The stored ETag is sent
+as If-None-Match, and the download stops at the first page if the result's
+execution ID matches the one in the manifest.
+
+Usage:
+    python ingest.py
+    python ingest.py --output-dir data --page-size 100000 --keep-csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import requests
+from dotenv import load_dotenv
+
+
+QUERY_ID = "6221750"    # Data source: https://dune.com/queries/6221750
+DATASET_NAME = "ronin_traders_dataset"
+DEFAULT_BASE_URL = "https://api.dune.com/api/v1"
+
+# Response headers Dune sets on result pages
+EXECUTION_ID_HEADER = 'x-dune-execution-id'
+NEXT_OFFSET_HEADER = 'x-dune-next-offset'
+
+PARQUET_COMPRESSION = 'zstd'
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet ingestion requires pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def results_url(base_url, query_id):
+    return f"{base_url.rstrip('/')}/query/{query_id}/results/csv"
+
+
+def manifest_path(output_dir, name=DATASET_NAME):
+    return os.path.join(output_dir, f'{name}.manifest.json')
+
+
+def read_manifest(output_dir, name=DATASET_NAME):
+    """The manifest of the last successful ingest, or None."""
+    try:
+        with open(manifest_path(output_dir, name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stream_to_file(response, path, chunk_bytes):
+    """Write a streamed response body to path; returns bytes written."""
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=chunk_bytes):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+class _ParquetAppender:
+    """Converts CSV pages into one Parquet file, one record batch at a time."""
+
+    def __init__(self, path):
+        self.pa = _require_pyarrow()
+        self.path = path
+        self.schema = None
+        self.writer = None
+        self.rows = 0
+
+    def append_csv(self, csv_path):
+        pa = self.pa
+        convert = (pa.csv.ConvertOptions(column_types=self.schema)
+                   if self.schema is not None else None)
+        reader = pa.csv.open_csv(csv_path, convert_options=convert)
+        if self.writer is None:
+            # Types are inferred from the first page and reused for the rest
+            self.schema = reader.schema
+            self.writer = pa.parquet.ParquetWriter(self.path, self.schema,
+                                                   compression=PARQUET_COMPRESSION)
+        for batch in reader:
+            try:
+                batch = batch.cast(self.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(
+                    f"Page schema does not match the first page ({e}); "
+                    f"use a larger page size so type inference sees more rows"
+                )
+            self.writer.write_batch(batch)
+            self.rows += batch.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def fetch_dataset(output_dir='data', query_id=QUERY_ID, api_key=None, base_url=None,
+                  name=DATASET_NAME, page_size=None, chunk_bytes=1 << 20, force=False,
+                  keep_csv=False, session=None, timeout=60):
+    """
+    Refresh the local copy of the Dune query result.
+
+    Args:
+        output_dir (str): Directory for <name>.parquet and its manifest
+        query_id (str): Dune query ID
+        api_key (str): Dune API key (default: DEFI_JOSH_DUNE_QUERY_API_KEY)
+        base_url (str): API base URL (default: DUNE_API_BASE_URL or Dune's)
+        name (str): File name stem of the outputs
+        page_size (int): Rows per limit/offset request (None: one request)
+        chunk_bytes (int): Bytes read from the socket at a time
+        force (bool): Download even if upstream looks unchanged
+        keep_csv (bool): Also write <name>.csv next to the Parquet file
+        session (requests.Session): Session to reuse (default: a new one)
+        timeout (float): Seconds to wait for each response
+
+    Returns:
+        dict: The manifest, with 'skipped' True when nothing was downloaded
+    """
+    load_dotenv()
+    api_key = api_key or os.getenv("DEFI_JOSH_DUNE_QUERY_API_KEY")
+    base_url = base_url or os.getenv('DUNE_API_BASE_URL', DEFAULT_BASE_URL)
+    url = results_url(base_url, query_id)
+    session = session or requests.Session()
+    os.makedirs(output_dir, exist_ok=True)
+
+    parquet_path = os.path.join(output_dir, f'{name}.parquet')
+    csv_path = os.path.join(output_dir, f'{name}.csv')
+    previous = read_manifest(output_dir, name)
+    have_local = previous is not None and os.path.exists(parquet_path) and not force
+
+    headers = {"X-DUNE-API-KEY": api_key} if api_key else {}
+    started = time.perf_counter()
+    offset, pages, downloaded = 0, 0, 0
+    execution_id = etag = None
+
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=f'.{name}.') as scratch:
+        appender = _ParquetAppender(os.path.join(scratch, f'{name}.parquet'))
+        csv_out = open(os.path.join(scratch, f'{name}.csv'), 'wb') if keep_csv else None
+        try:
+            while True:
+                params = {'limit': page_size, 'offset': offset} if page_size else {}
+                page_headers = dict(headers)
+                if pages == 0 and have_local and previous.get('etag'):
+                    page_headers['If-None-Match'] = previous['etag']
+
+                with session.get(url, headers=page_headers, params=params,
+                                 stream=True, timeout=timeout) as response:
+                    if response.status_code == 304:
+                        return {**previous, 'skipped': True}
+                    response.raise_for_status()
+
+                    if pages == 0:
+                        execution_id = response.headers.get(EXECUTION_ID_HEADER)
+                        etag = response.headers.get('ETag')
+                        if (have_local and execution_id
+                                and execution_id == previous.get('execution_id')):
+                            return {**previous, 'skipped': True}
+
+                    page_path = os.path.join(scratch, f'page-{pages:05d}.csv')
+                    downloaded += _stream_to_file(response, page_path, chunk_bytes)
+                    next_offset = response.headers.get(NEXT_OFFSET_HEADER)
+
+                appender.append_csv(page_path)
+                if csv_out is not None:
+                    with open(page_path, 'rb') as page:
+                        if pages > 0:
+                            page.readline()  # every page repeats the header
+                        shutil.copyfileobj(page, csv_out)
+                os.remove(page_path)
+                pages += 1
+
+                if not page_size or next_offset is None:
+                    break
+                offset = int(next_offset)
+        finally:
+            appender.close()
+            if csv_out is not None:
+                csv_out.close()
+
+        if appender.writer is None:
+            raise ValueError(f"No data returned by {url}")
+
+        # Publish atomically: data files first, the manifest last
+        os.replace(appender.path, parquet_path)
+        if keep_csv:
+            os.replace(csv_out.name, csv_path)
+
+    manifest = {
+        'query_id': str(query_id),
+        'source': url,
+        'execution_id': execution_id,
+        'etag': etag,
+        'fetched_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'rows': appender.rows,
+        'columns': [{'name': field.name, 'type': str(field.type)}
+                    for field in appender.schema],
+        'parquet': os.path.basename(parquet_path),
+        'compression': PARQUET_COMPRESSION,
+        'parquet_bytes': os.path.getsize(parquet_path),
+        'sha256': _file_sha256(parquet_path),
+        'csv': os.path.basename(csv_path) if keep_csv else None,
+        'downloaded_bytes': downloaded,
+        'pages': pages,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+    tmp = manifest_path(output_dir, name) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path(output_dir, name))
+    return {**manifest, 'skipped': False}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the Dune dataset as Parquet")
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--query-id', default=QUERY_ID)
+    parser.add_argument('--page-size', type=int, help='Rows per limit/offset request')
+    parser.add_argument('--force', action='store_true', help='Download even if unchanged')
+    parser.add_argument('--keep-csv', action='store_true', help='Also write the CSV')
+    args = parser.parse_args()
+
+    manifest = fetch_dataset(args.output_dir, args.query_id, page_size=args.page_size,
+                             force=args.force, keep_csv=args.keep_csv)
+    if manifest['skipped']:
+        print(f"✅ Dataset unchanged (execution {manifest['execution_id']}), "
+              f"kept {manifest['parquet']}")
+    else:
+        print(f"✅ {manifest['rows']:,} rows in {manifest['pages']} page(s) saved to "
+              f"{os.path.join(args.output_dir, manifest['parquet'])} "
+              f"({manifest['parquet_bytes'] / 2 ** 20:.2f} MB, {manifest['compression']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,526 @@
+"""
+Ronin Trader Classification - Load Test
+Author: Jo$h
+
+Drives a running API with the payloads from test_api.py to find out how
+much traffic it sustains, e.g. to size WEB_CONCURRENCY in the Dockerfile's
+gunicorn setup.
+
+Two load models:
+
+    closed  --concurrency N clients, each sending its next request when
+            the previous one answers (optionally after --think-time).
+            Throughput adapts to the server; use it to find the ceiling.
+    open    requests arrive at --rate per second (Poisson by default)
+            whether or not earlier ones have answered, like real traffic.
+            Latency is measured from the scheduled send time, so a server
+            that falls behind shows it (no coordinated omission).
+
+--mix sets the traffic: e.g. predict=0.8,predict_batch=0.2 (see SCENARIOS).
+The report has throughput, p50/p95/p99/p999 latency, error rate and
+status counts overall, per scenario and per --interval of the run.
+
+--sweep runs open-loop steps at increasing rates until the latency SLO
+(--slo-ms at --slo-percentile) or --max-error-rate is missed, then
+bisects to the highest rate that still meets it.
+
+The client is one asyncio process with raw keep-alive HTTP/1.1, so it
+stays cheap per request; run it from another machine than the server to
+keep the two from competing for CPU.
+
+Usage:
+    python load_test.py --concurrency 50 --duration 30
+    python load_test.py --model open --rate 200 --mix predict=0.9,predict_batch=0.1
+    python load_test.py --sweep --slo-ms 50 --rate 50 --duration 15 --output sweep.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from test_api import (BAD_TRADER, BASE_URL, BATCH, GOOD_TRADER, INCOMPLETE_TRADER,
+                      NEGATIVE_TRADER, PARTIAL_BATCH)
+
+# name -> (method, path, payloads cycled through, expected status)
+SCENARIOS = {
+    'predict': ('POST', '/predict', [GOOD_TRADER, BAD_TRADER], 200),
+    'predict_batch': ('POST', '/predict_batch', [BATCH], 200),
+    'predict_batch_partial': ('POST', '/predict_batch', [PARTIAL_BATCH], 200),
+    'invalid': ('POST', '/predict', [INCOMPLETE_TRADER, NEGATIVE_TRADER], 400),
+    'health': ('GET', '/health', [None], 200),
+    'features': ('GET', '/features', [None], 200),
+}
+PERCENTILES = {'p50_ms': 50, 'p95_ms': 95, 'p99_ms': 99, 'p999_ms': 99.9}
+# Outcomes without a response time; timeouts count as their full wait
+UNANSWERED = ('dropped', 'connection_error')
+
+
+def parse_mix(text):
+    """
+    'predict=0.8,predict_batch=0.2' -> {'predict': 0.8, 'predict_batch': 0.2}.
+
+    Weights are normalized to sum to 1; a bare name has weight 1.
+    """
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'. Choose from {list(SCENARIOS)}")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] < 0:
+            raise ValueError(f"Weight of '{name}' must not be negative")
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+def build_requests(mix, batch_size=None):
+    """
+    Encoded requests per scenario, with each scenario's weight.
+
+    Args:
+        mix (dict): Scenario weights from parse_mix()
+        batch_size (int): Traders per predict_batch request (default: the
+            test_api.py batch as is)
+
+    Returns:
+        list: (scenario, weight, [(method, path, body bytes)], expected status)
+    """
+    plan = []
+    for name, weight in mix.items():
+        method, path, payloads, expected = SCENARIOS[name]
+        if name == 'predict_batch' and batch_size:
+            traders = BATCH['traders']
+            payloads = [{'traders': [traders[i % len(traders)] for i in range(batch_size)]}]
+        encoded = [(method, path, json.dumps(p).encode() if p is not None else b'')
+                   for p in payloads]
+        plan.append((name, weight, encoded, expected))
+    return plan
+
+
+async def http_request(host, port, method, path, body, connection):
+    """
+    Send one request over a kept-alive connection; reconnects when needed.
+
+    Args:
+        connection (list): One-item holder of the (reader, writer) pair,
+            None until the first request
+
+    Returns:
+        int: HTTP status
+    """
+    if connection[0] is None:
+        connection[0] = await asyncio.open_connection(host, port)
+    reader, writer = connection[0]
+    head = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+    if body:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    writer.write((head + "\r\n").encode() + body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection")
+    status = int(status_line.split()[1])
+    length, close = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+        elif name.lower() == 'connection' and value.strip().lower() == 'close':
+            close = True
+    await reader.readexactly(length)
+
+    if close:
+        writer.close()
+        connection[0] = None
+    return status
+
+
+class LoadRun:
+    """Sends requests from a plan and records each outcome."""
+
+    def __init__(self, url, plan, timeout=30.0, seed=0):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.plan = plan
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self._weights = [weight for _, weight, _, _ in plan]
+        self._sent = Counter()
+        self._idle = []
+        # (start offset, latency seconds, scenario, outcome), offsets from start
+        self.records = []
+        self.started = None
+
+    def next_request(self):
+        name, _, requests, expected = self.random.choices(self.plan, self._weights)[0]
+        request = requests[self._sent[name] % len(requests)]
+        self._sent[name] += 1
+        return name, request, expected
+
+    async def send(self, scheduled=None):
+        """
+        Send one request on an idle connection (or a new one).
+
+        Args:
+            scheduled (float): perf_counter time the request was due; latency
+                is measured from it (default: now)
+        """
+        name, (method, path, body), expected = self.next_request()
+        connection = [self._idle.pop() if self._idle else None]
+        started = time.perf_counter() if scheduled is None else scheduled
+        try:
+            status = await asyncio.wait_for(
+                http_request(self.host, self.port, method, self.prefix + path, body, connection),
+                timeout=self.timeout)
+            outcome = 'ok' if status == expected else f'http_{status}'
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            outcome = 'connection_error'
+        if connection[0] is not None:
+            if outcome == 'ok' or outcome.startswith('http_'):
+                self._idle.append(connection[0])
+            else:
+                connection[0][1].close()
+        self.records.append((started - self.started, time.perf_counter() - started,
+                             name, outcome))
+
+    def record_dropped(self, scheduled):
+        """An open-loop arrival that found every allowed connection busy."""
+        name = self.random.choices(self.plan, self._weights)[0][0]
+        self.records.append((scheduled - self.started, 0.0, name, 'dropped'))
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
+
+
+async def closed_loop(run, concurrency, duration, think_time=0.0):
+    """`concurrency` clients sending back to back for `duration` seconds."""
+    run.started = time.perf_counter()
+    deadline = run.started + duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            await run.send()
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    run.close()
+
+
+async def open_loop(run, rate, duration, max_in_flight=1000, arrivals='poisson'):
+    """
+    Requests arriving at `rate` per second for `duration` seconds.
+
+    Arrivals are scheduled ahead of time; when the loop falls behind it sends
+    every overdue request at once rather than skipping them. Arrivals while
+    `max_in_flight` requests are outstanding are recorded as dropped.
+    """
+    run.started = time.perf_counter()
+    deadline = run.started + duration
+    pending = set()
+    scheduled = run.started
+    while True:
+        scheduled += run.random.expovariate(rate) if arrivals == 'poisson' else 1.0 / rate
+        if scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(pending) >= max_in_flight:
+            run.record_dropped(scheduled)
+            continue
+        task = asyncio.create_task(run.send(scheduled))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.wait(pending)
+    run.close()
+
+
+def latency_stats(latencies):
+    if not latencies:
+        return {name: None for name in PERCENTILES}
+    values = np.percentile(np.asarray(latencies) * 1000, list(PERCENTILES.values()))
+    return {name: round(float(v), 2) for name, v in zip(PERCENTILES, values)}
+
+
+def summarize(records, duration, warmup=0.0):
+    """
+    Totals of a run, leaving out requests started during the warm-up.
+
+    Returns:
+        dict: requests, ok, errors, error_rate, throughput_rps (answered as
+        expected, per second), offered_rps, latency percentiles of requests
+        that got an answer or timed out, outcome counts and per-scenario
+        figures
+    """
+    measured = [r for r in records if r[0] >= warmup]
+    seconds = max(duration - warmup, 1e-9)
+    outcomes = Counter(r[3] for r in measured)
+    ok = outcomes['ok']
+    answered = [r[1] for r in measured if r[3] not in UNANSWERED]
+    summary = {
+        'requests': len(measured),
+        'ok': ok,
+        'errors': len(measured) - ok,
+        'error_rate': round((len(measured) - ok) / len(measured), 4) if measured else 0.0,
+        'throughput_rps': round(ok / seconds, 1),
+        'offered_rps': round(len(measured) / seconds, 1),
+        **latency_stats(answered),
+        'outcomes': dict(outcomes),
+        'scenarios': {}
+    }
+    for name in sorted({r[2] for r in measured}):
+        rows = [r for r in measured if r[2] == name]
+        errors = sum(1 for r in rows if r[3] != 'ok')
+        summary['scenarios'][name] = {
+            'requests': len(rows),
+            'error_rate': round(errors / len(rows), 4),
+            **latency_stats([r[1] for r in rows if r[3] not in UNANSWERED])
+        }
+    return summary
+
+
+def timeline(records, duration, interval=1.0):
+    """Per-interval throughput, latency and errors, by request start time."""
+    buckets = []
+    n_buckets = max(1, round(duration / interval))
+    for i in range(n_buckets):
+        # The last bucket takes the remainder of the run
+        start, end = i * interval, duration if i == n_buckets - 1 else (i + 1) * interval
+        rows = [r for r in records if start <= r[0] < end]
+        ok = [r for r in rows if r[3] == 'ok']
+        stats = latency_stats([r[1] for r in rows if r[3] not in UNANSWERED])
+        buckets.append({
+            't': round(start, 3),
+            'requests': len(rows),
+            'throughput_rps': round(len(ok) / (end - start), 1),
+            'error_rate': round((len(rows) - len(ok)) / len(rows), 4) if rows else 0.0,
+            'p50_ms': stats['p50_ms'],
+            'p99_ms': stats['p99_ms']
+        })
+    return buckets
+
+
+def run_load(url, plan, model='closed', concurrency=10, rate=100.0, duration=10.0,
+             warmup=1.0, interval=1.0, think_time=0.0, max_in_flight=1000,
+             arrivals='poisson', timeout=30.0, seed=0):
+    """
+    Run one load test.
+
+    Args:
+        url (str): API base URL
+        plan (list): Requests from build_requests()
+        model (str): 'closed' (fixed concurrency) or 'open' (fixed rate)
+        duration (float): Seconds of load, including `warmup`
+        warmup (float): Leading seconds left out of the summary
+
+    Returns:
+        dict: The settings, summary() and timeline() of the run
+    """
+    run = LoadRun(url, plan, timeout=timeout, seed=seed)
+    if model == 'closed':
+        asyncio.run(closed_loop(run, concurrency, duration, think_time))
+    else:
+        asyncio.run(open_loop(run, rate, duration, max_in_flight, arrivals))
+    elapsed = time.perf_counter() - run.started
+    return {
+        'model': model,
+        'concurrency': concurrency if model == 'closed' else None,
+        'rate': rate if model == 'open' else None,
+        'duration': round(elapsed, 3),
+        'warmup': warmup,
+        'summary': summarize(run.records, elapsed, warmup),
+        'timeline': timeline(run.records, elapsed, interval)
+    }
+
+
+def meets_slo(summary, slo_ms, percentile='p99_ms', max_error_rate=0.01):
+    """
+    Whether an open-loop step met the SLO.
+
+    The step passes when the latency percentile is within slo_ms and the
+    error rate (dropped arrivals included) within max_error_rate. A server
+    that cannot keep up with the rate fails on latency: open-loop latency
+    is measured from when each request was due.
+
+    Returns:
+        tuple: (passed, reason it failed or None)
+    """
+    latency = summary[percentile]
+    if latency is None or latency > slo_ms:
+        return False, f"{percentile} {latency} ms > {slo_ms} ms"
+    if summary['error_rate'] > max_error_rate:
+        return False, f"error rate {summary['error_rate']:.2%} > {max_error_rate:.2%}"
+    return True, None
+
+
+def find_max_rps(measure, start_rate, slo_ms, percentile='p99_ms', max_error_rate=0.01,
+                 growth=1.5, precision=0.05, max_rate=100_000):
+    """
+    Highest request rate that meets the SLO.
+
+    Grows the rate by `growth` from start_rate until a step fails (or
+    shrinks it until one passes), then bisects between the last passing
+    and first failing rate until they are within `precision` of each other.
+
+    Args:
+        measure (callable): rate -> summary() of an open-loop step at that rate
+        start_rate (float): First rate tried
+
+    Returns:
+        dict: max_rps (None if even the lowest rate failed), and every step
+        with its rate, pass/fail, reason and summary
+    """
+    steps = []
+
+    def step(rate):
+        summary = measure(rate)
+        passed, reason = meets_slo(summary, slo_ms, percentile, max_error_rate)
+        steps.append({'rate': round(rate, 2), 'passed': passed, 'reason': reason,
+                      'summary': summary})
+        return passed
+
+    passed_rate, failed_rate = None, None
+    rate = start_rate
+    if step(rate):
+        passed_rate = rate
+        while failed_rate is None and rate * growth <= max_rate:
+            rate *= growth
+            if step(rate):
+                passed_rate = rate
+            else:
+                failed_rate = rate
+    else:
+        failed_rate = rate
+        while passed_rate is None and rate / growth >= 1:
+            rate /= growth
+            if step(rate):
+                passed_rate = rate
+            else:
+                failed_rate = rate
+
+    while (passed_rate is not None and failed_rate is not None
+           and (failed_rate - passed_rate) / passed_rate > precision):
+        rate = (passed_rate + failed_rate) / 2
+        if step(rate):
+            passed_rate = rate
+        else:
+            failed_rate = rate
+
+    return {
+        'max_rps': round(passed_rate, 1) if passed_rate is not None else None,
+        'slo': {'percentile': percentile, 'ms': slo_ms, 'max_error_rate': max_error_rate},
+        'steps': steps
+    }
+
+
+def print_run(result):
+    summary = result['summary']
+    print(f"\n{'t (s)':>7} {'req/s':>9} {'errors':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for bucket in result['timeline']:
+        print(f"{bucket['t']:>7.1f} {bucket['throughput_rps']:>9.1f} "
+              f"{bucket['error_rate']:>8.2%} {bucket['p50_ms'] or 0:>9.2f} "
+              f"{bucket['p99_ms'] or 0:>9.2f}")
+    print(f"\nRequests:    {summary['requests']:,} ({summary['offered_rps']:,.1f}/s offered, "
+          f"after {result['warmup']:g}s warm-up)")
+    print(f"Throughput:  {summary['throughput_rps']:,.1f} req/s")
+    print("Latency:     " + '  '.join(f"{name[:-3]} {summary[name]} ms" for name in PERCENTILES))
+    print(f"Errors:      {summary['error_rate']:.2%}  {summary['outcomes']}")
+    for name, scenario in summary['scenarios'].items():
+        print(f"  {name:<22} {scenario['requests']:>8,} req  p50 {scenario['p50_ms']} ms  "
+              f"p99 {scenario['p99_ms']} ms  errors {scenario['error_rate']:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--url', default=BASE_URL, help=f'API base URL (default {BASE_URL})')
+    parser.add_argument('--model', choices=['closed', 'open'], default='closed')
+    parser.add_argument('--concurrency', type=int, default=10, help='Closed-loop clients')
+    parser.add_argument('--rate', type=float, default=100.0,
+                        help='Open-loop requests per second (--sweep: first rate tried)')
+    parser.add_argument('--arrivals', choices=['poisson', 'uniform'], default='poisson')
+    parser.add_argument('--max-in-flight', type=int, default=1000,
+                        help='Open-loop cap on outstanding requests; arrivals beyond it are dropped')
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help='Closed-loop pause between a response and the next request (s)')
+    parser.add_argument('--mix', default='predict', help='e.g. predict=0.8,predict_batch=0.2')
+    parser.add_argument('--batch-size', type=int, help='Traders per predict_batch request')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run or step')
+    parser.add_argument('--warmup', type=float, default=1.0,
+                        help='Leading seconds left out of the summary')
+    parser.add_argument('--interval', type=float, default=1.0, help='Timeline resolution (s)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sweep', action='store_true',
+                        help='Find the highest open-loop rate that meets the SLO')
+    parser.add_argument('--slo-ms', type=float, default=100.0)
+    parser.add_argument('--slo-percentile', choices=list(PERCENTILES), default='p99_ms')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--growth', type=float, default=1.5, help='Sweep rate multiplier')
+    parser.add_argument('--precision', type=float, default=0.05,
+                        help='Sweep stops when pass/fail rates are this close')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    try:
+        plan = build_requests(parse_mix(args.mix), args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("=" * 80)
+    print(f"LOAD TEST - {args.url}, mix {args.mix}")
+    print("=" * 80)
+
+    if args.sweep:
+        def measure(rate):
+            result = run_load(args.url, plan, 'open', rate=rate, duration=args.duration,
+                              warmup=args.warmup, interval=args.interval,
+                              max_in_flight=args.max_in_flight, arrivals=args.arrivals,
+                              timeout=args.timeout, seed=args.seed)
+            summary = result['summary']
+            print(f"rate {rate:>9.1f}/s -> {summary['throughput_rps']:>9.1f} req/s  "
+                  f"{args.slo_percentile[:-3]} {summary[args.slo_percentile]} ms  "
+                  f"errors {summary['error_rate']:.2%}", flush=True)
+            return summary
+
+        print(f"SLO: {args.slo_percentile[:-3]} <= {args.slo_ms:g} ms, "
+              f"errors <= {args.max_error_rate:.2%}, {args.duration:g}s per step\n")
+        results = find_max_rps(measure, args.rate, args.slo_ms, args.slo_percentile,
+                               args.max_error_rate, args.growth, args.precision)
+        if results['max_rps'] is None:
+            print("\n❌ No rate tried met the SLO")
+        else:
+            print(f"\n✅ Max sustainable rate: {results['max_rps']:,.1f} req/s")
+    else:
+        results = run_load(args.url, plan, args.model, args.concurrency, args.rate,
+                           args.duration, args.warmup, args.interval, args.think_time,
+                           args.max_in_flight, args.arrivals, args.timeout, args.seed)
+        print_run(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Ronin Trader Classification - Process Memory Statistics
+Author: Jo$h
+
+Reports how much of a process's memory is private versus shared with other
+processes (e.g. gunicorn workers sharing a preloaded or memory-mapped model).
+Reads /proc/self/smaps_rollup on Linux and falls back to peak RSS elsewhere.
+"""
+
+import resource
+import sys
+
+SMAPS_ROLLUP = '/proc/self/smaps_rollup'
+
+
+def memory_usage():
+    """
+    Return this process's memory breakdown in MiB.
+
+    Returns:
+        dict: rss, pss, shared and private MiB (Linux), or peak_rss only
+    """
+    try:
+        with open(SMAPS_ROLLUP) as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1])
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak_mib = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+        return {'peak_rss_mib': round(peak_mib, 1)}
+
+    def mib(*names):
+        return round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+
+    return {
+        'rss_mib': mib('Rss'),
+        'pss_mib': mib('Pss'),
+        'shared_mib': mib('Shared_Clean', 'Shared_Dirty'),
+        'private_mib': mib('Private_Clean', 'Private_Dirty')
+    }
+
+
+def format_memory(usage):
+    """One-line summary of memory_usage() for startup logs."""
+    return ', '.join(f"{key.replace('_mib', '')}={value} MiB" for key, value in usage.items())
@@ -0,0 +1,247 @@
+"""
+Ronin Trader Classification - Metrics
+Author: Jo$h
+
+In-process counters, gauges and histograms for the API, served at
+/metrics in the Prometheus text format (version 0.0.4). There are no
+dependencies. Each observation is a bisect plus a few additions under a
+lock, about a microsecond, so metrics stay on in production
+(METRICS_ENABLED=false turns them off).
+
+Request time is broken down by stage:
+
+    parse       JSON / Arrow / raw body decoding
+    validate    feature checks
+    array       building the float64 feature matrix
+    inference   model call (or cache / micro-batcher wait)
+    format      building the response body (and Arrow / raw encoding)
+    serialize   JSON encoding
+    lookup      feature store read (/predict_wallet)
+
+Metrics are per process. With several gunicorn workers each scrape sees
+the worker that served it; every series carries a `pid` label so workers
+can be told apart and summed in PromQL.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+
+# Seconds; spans cached hits (~10 µs) to large batches (seconds)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, labels, value) for labels, value in items]
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    type = 'gauge'
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Bucketed observations per label combination."""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        series = self._series.get(labels)
+        if series is None:
+            # Count per bucket (the last one is +Inf), then the sum
+            series = self._series.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, labels=()):
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, series[:-1], series[-1])
+                     for labels, series in list(self._series.items())]
+        samples = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for edge, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((self.name + '_bucket', labels + (_format_value(edge),),
+                                cumulative))
+            samples.append((self.name + '_sum', labels, total))
+            samples.append((self.name + '_count', labels, cumulative))
+        return samples
+
+
+class Metrics:
+    """
+    The API's metrics and the hooks app.py and asgi_app.py call.
+    """
+
+    def __init__(self, enabled=True, prefix='ronin'):
+        self.enabled = enabled
+        self.started = time.time()
+        self.requests = Counter(f'{prefix}_requests_total',
+                                'Requests by endpoint, method and status',
+                                ('endpoint', 'method', 'status'))
+        self.errors = Counter(f'{prefix}_request_errors_total',
+                              'Failed requests by endpoint and kind (client = 4xx, server = 5xx)',
+                              ('endpoint', 'kind'))
+        self.latency = Histogram(f'{prefix}_request_duration_seconds',
+                                 'Request latency by endpoint', ('endpoint',))
+        self.stages = Histogram(f'{prefix}_stage_duration_seconds',
+                                'Time per request stage', ('endpoint', 'stage'))
+        self.in_flight = Gauge(f'{prefix}_requests_in_flight', 'Requests being served')
+        self.batch_rows = Histogram(f'{prefix}_inference_batch_rows',
+                                    'Rows per model call', buckets=BATCH_SIZE_BUCKETS)
+        self.request_rows = Histogram(f'{prefix}_request_rows',
+                                      'Traders per request', ('endpoint',),
+                                      buckets=BATCH_SIZE_BUCKETS)
+        self.predictions = Counter(f'{prefix}_predictions_total',
+                                   'Predictions served by class', ('prediction',))
+        self.good_ratio = Gauge(f'{prefix}_good_trader_ratio',
+                                'Share of predictions that were Good Trader')
+        self._instruments = [self.requests, self.errors, self.latency, self.stages,
+                             self.in_flight, self.batch_rows, self.request_rows,
+                             self.predictions, self.good_ratio]
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def start_request(self):
+        """Call when a request arrives; returns its start time."""
+        if self.enabled:
+            with self._in_flight_lock:
+                self._in_flight += 1
+        return time.perf_counter()
+
+    def finish_request(self, endpoint, method, status, started):
+        """Call once the response is ready."""
+        if not self.enabled:
+            return
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self.latency.observe(time.perf_counter() - started, (endpoint,))
+        self.requests.inc((endpoint, method, str(status)))
+        if status >= 400:
+            self.errors.inc((endpoint, 'client' if status < 500 else 'server'))
+
+    def stage(self, endpoint, name, started):
+        """
+        Record a stage that began at `started` (a perf_counter value).
+
+        Returns:
+            float: The current perf_counter, i.e. the start of the next stage
+        """
+        now = time.perf_counter()
+        if self.enabled:
+            self.stages.observe(now - started, (endpoint, name))
+        return now
+
+    def inference(self, n_rows):
+        """Record the size of one model call."""
+        if self.enabled:
+            self.batch_rows.observe(n_rows)
+
+    def batch_size(self, endpoint, n_rows):
+        """Record the number of traders in one batch request."""
+        if self.enabled:
+            self.request_rows.observe(n_rows, (endpoint,))
+
+    def predicted(self, good, total=1):
+        """Record the classes served for one request."""
+        if not self.enabled:
+            return
+        if good:
+            self.predictions.inc(('good',), good)
+        if total - good:
+            self.predictions.inc(('bad',), total - good)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        self.in_flight.set(self._in_flight)
+        good = self.predictions.value(('good',))
+        served = good + self.predictions.value(('bad',))
+        if served:
+            self.good_ratio.set(good / served)
+
+        # Looked up here, not at import: gunicorn --preload forks after import
+        pid = str(os.getpid())
+        lines = []
+        for instrument in self._instruments:
+            lines.append(f'# HELP {instrument.name} {instrument.help}')
+            lines.append(f'# TYPE {instrument.name} {instrument.type}')
+            names = ('pid',) + instrument.labelnames
+            if instrument.type == 'histogram':
+                names += ('le',)
+            for name, labels, value in instrument.samples():
+                sample_names = names if name.endswith('_bucket') else names[:len(labels) + 1]
+                lines.append(f'{name}{_format_labels(sample_names, (pid,) + labels)} '
+                             f'{_format_value(value)}')
+        lines.append('# HELP process_start_time_seconds Start time of the process')
+        lines.append('# TYPE process_start_time_seconds gauge')
+        lines.append(f'process_start_time_seconds{{pid="{pid}"}} {self.started:.3f}')
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_from_env():
+    """The API's Metrics; METRICS_ENABLED=false records nothing."""
+    return Metrics(enabled=os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes'))
@@ -0,0 +1,144 @@
+"""
+Ronin Trader Classification - Parallel Batch Scoring
+Author: Jo$h
+
+Scores large inputs across a process pool. Workers memory-map the packed
+forest's .npy arrays (see PackedForest.save) instead of each unpickling a
+private model copy, so every worker reads the same pages from the OS page
+cache. In-memory matrices are handed to workers through memory-mapped
+scratch files rather than pickled shard by shard, and results are written
+back in place, so the output keeps the input's row order.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inference import PackedForest
+
+
+# The forest each worker process maps at start-up
+_forest = None
+
+
+def _init_worker(model_dir):
+    global _forest
+    # The parent loaded or wrote this directory; no need to re-hash it per worker
+    _forest = PackedForest.load(model_dir, mmap_mode='r', verify=False)
+
+
+def _score_slice(args):
+    """Score rows [start, stop) of the shared input into the shared output."""
+    input_path, output_path, start, stop = args
+    X = np.load(input_path, mmap_mode='r')
+    out = np.load(output_path, mmap_mode='r+')
+    out[start:stop] = _forest.predict_proba(X[start:stop])
+    out.flush()
+    return stop - start
+
+
+def _score_matrix(X):
+    return _forest.predict_proba(X)
+
+
+def ensure_model_dir(forest):
+    """
+    Return a directory holding the forest's arrays, saving them to a
+    temporary directory (removed at exit) if the forest was built in memory.
+    """
+    if forest.path:
+        return forest.path
+    directory = tempfile.mkdtemp(prefix='packed_forest_')
+    atexit.register(shutil.rmtree, directory, True)
+    forest.save(directory)
+    forest.path = directory
+    return directory
+
+
+def default_workers():
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _pool(forest, n_workers):
+    return ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(ensure_model_dir(forest),)
+    )
+
+
+def predict_proba_parallel(forest, X, n_workers=None, shard_size=100_000):
+    """
+    Predict probabilities for a large matrix across a process pool.
+
+    Args:
+        forest (PackedForest): Model to score with
+        X (array-like): (n_samples, n_features) feature matrix
+        n_workers (int): Worker processes (default: available CPUs)
+        shard_size (int): Rows per task handed to a worker
+
+    Returns:
+        np.ndarray: (n_samples, n_classes) probabilities, in input order
+    """
+    n_workers = n_workers or default_workers()
+    X = np.asarray(X, dtype=np.float64)
+    n_samples = X.shape[0]
+
+    with tempfile.TemporaryDirectory(prefix='parallel_scoring_') as scratch:
+        input_path = os.path.join(scratch, 'X.npy')
+        output_path = os.path.join(scratch, 'proba.npy')
+        np.save(input_path, X)
+        out = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float64,
+                                        shape=(n_samples, forest.n_classes_))
+        del out
+
+        tasks = [
+            (input_path, output_path, start, min(start + shard_size, n_samples))
+            for start in range(0, n_samples, shard_size)
+        ]
+        with _pool(forest, n_workers) as executor:
+            for _ in executor.map(_score_slice, tasks):
+                pass
+
+        return np.load(output_path)
+
+
+def iter_scored_chunks(forest, chunks, n_workers=None, max_in_flight=None):
+    """
+    Score a stream of chunks across a process pool, yielding results in order.
+
+    At most `max_in_flight` chunks are pending at once, so memory stays
+    bounded however long the stream is.
+
+    Args:
+        forest (PackedForest): Model to score with
+        chunks (iterable): (payload, X) pairs; payload is passed through
+        n_workers (int): Worker processes (default: available CPUs)
+        max_in_flight (int): Pending chunks (default: 2 per worker)
+
+    Yields:
+        tuple: (payload, probabilities) in the order chunks were given
+    """
+    n_workers = n_workers or default_workers()
+    max_in_flight = max_in_flight or 2 * n_workers
+    pending = deque()
+
+    with _pool(forest, n_workers) as executor:
+        for payload, X in chunks:
+            pending.append((payload, executor.submit(_score_matrix, X)))
+            if len(pending) >= max_in_flight:
+                payload, future = pending.popleft()
+                yield payload, future.result()
+
+        while pending:
+            payload, future = pending.popleft()
+            yield payload, future.result()
@@ -4,14 +4,30 @@ Author: Jo$h
 
 This script loads the trained Random Forest model and makes predictions
 on new trader data.
+
+Start-up is kept short for cron jobs and autoscaled pods: the forest is
+memory-mapped from its native export (no unpickling, no sklearn import),
+and pandas is only imported by the DataFrame APIs. The export directory
+(`python inference.py export`) can also be given instead of the pickle.
 """
 
+import argparse
+import os
 import pickle
 import numpy as np
-import pandas as pd
 import warnings
 warnings.filterwarnings('ignore')
 
+from cache import get_shared_cache
+from inference import FOREST_FILE, PackedForest, load_engine
+from parallel import iter_scored_chunks, predict_proba_parallel
+
+# With engine='auto' and a pickled model, predict_batch hands frames at
+# least this large to sklearn: its compiled tree walk is faster per row
+# than the packed forest, which pays back unpickling the model and
+# importing sklearn
+SKLEARN_BATCH_ROWS = 100_000
+
 
 class RoninTraderPredictor:
     """
@@ -19,21 +35,40 @@ class RoninTraderPredictor:
     """
     
     def __init__(self, model_path='models/best_model_random_forest.pkl', 
-                 feature_names_path='models/feature_names.pkl'):
+                 feature_names_path='models/feature_names.pkl',
+                 engine='auto', cache=None):
         """
         Initialize the predictor by loading the trained model.
         
         Args:
-            model_path (str): Path to the saved model file
-            feature_names_path (str): Path to the feature names file
+            model_path (str): Path to the saved model file, or a packed
+                forest export directory
+            feature_names_path (str): Path to the feature names file (not
+                read for exports, which carry their own)
+            engine (str): 'auto' to memory-map the forest's native export
+                when it is current and use sklearn for very large batches,
+                'sklearn' to call the pickled model directly, or 'packed'
+                to use the array-backed PackedForest engine
+            cache (PredictionCache): Cache for predict_single results. Defaults
+                to the process-wide cache configured by PREDICTION_CACHE_* env
+                vars (shared with the Flask app), which is off unless enabled
         """
         print("Loading model...")
-        with open(model_path, 'rb') as f:
-            self.model = pickle.load(f)
+        self.model_path = model_path
+        self.engine = engine
+        self._sklearn = None
+        self.model = load_engine(model_path, engine)
+        
+        self.feature_names = getattr(self.model, 'feature_names', None)
+        if self.feature_names is None:
+            print("Loading feature names...")
+            with open(feature_names_path, 'rb') as f:
+                self.feature_names = pickle.load(f)
         
-        print("Loading feature names...")
-        with open(feature_names_path, 'rb') as f:
-            self.feature_names = pickle.load(f)
+        # Same cache key as app.py: forest.json marks a new export directory
+        watch_path = (os.path.join(model_path, FOREST_FILE) if os.path.isdir(model_path)
+                      else model_path)
+        self.cache = cache if cache is not None else get_shared_cache(watch_path)
         
         print(f"✅ Model loaded successfully!")
         print(f"✅ Expected features: {self.feature_names}")
@@ -77,12 +112,18 @@ class RoninTraderPredictor:
         # Validate input
         self.validate_input(trader_data)
         
-        # Create feature array in correct order
-        features = np.array([[trader_data[feat] for feat in self.feature_names]])
+        # Feature values in correct order
+        values = [trader_data[feat] for feat in self.feature_names]
         
-        # Make prediction
-        prediction = self.model.predict(features)[0]
-        probability = self.model.predict_proba(features)[0]
+        cached = self.cache.get(values) if self.cache is not None else None
+        if cached is not None:
+            prediction, probability = cached
+        else:
+            # Make prediction; the label is the most probable class, as in model.predict
+            probability = self.model.predict_proba(np.array([values]))[0]
+            prediction = self.model.classes_[np.argmax(probability)]
+            if self.cache is not None:
+                self.cache.put(values, (prediction, probability.tolist()))
         
         # Map prediction to label
         label = "Good Trader" if prediction == 1 else "Bad Trader"
@@ -98,44 +139,151 @@ class RoninTraderPredictor:
         
         return result
     
-    def predict_batch(self, traders_df):
+    def _feature_matrix(self, traders_df):
+        """Validate columns and return the features as a float64 matrix."""
+        missing_cols = set(self.feature_names) - set(traders_df.columns)
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}")
+        
+        # Select features in correct order
+        return traders_df[self.feature_names].to_numpy(dtype=np.float64)
+    
+    def _add_predictions(self, traders_df, probabilities, copy=True):
+        """Attach prediction columns derived from class probabilities."""
+        # Labels are the most probable class, as in model.predict
+        predictions = self.model.classes_.take(np.argmax(probabilities, axis=1))
+        
+        results_df = traders_df.copy() if copy else traders_df
+        results_df['prediction'] = np.where(predictions == 1, 'Good Trader', 'Bad Trader')
+        results_df['will_remain_active'] = predictions
+        results_df['confidence'] = probabilities.max(axis=1)
+        results_df['probability_good_trader'] = probabilities[:, 1]
+        results_df['probability_bad_trader'] = probabilities[:, 0]
+        
+        return results_df
+    
+    def _packed_forest(self):
+        """The model as a PackedForest, which worker processes can memory-map."""
+        if isinstance(self.model, PackedForest):
+            return self.model
+        if getattr(self, '_packed', None) is None:
+            self._packed = PackedForest.from_sklearn(self.model)
+        return self._packed
+    
+    def predict_batch(self, traders_df, copy=True):
         """
         Make predictions for multiple traders.
         
         Args:
             traders_df (pd.DataFrame): DataFrame with trader features
+            copy (bool): If False, prediction columns are added to traders_df
+                in place instead of to a copy, avoiding a second full frame
         
         Returns:
             pd.DataFrame: DataFrame with predictions and probabilities
         """
-        # Validate columns
-        missing_cols = set(self.feature_names) - set(traders_df.columns)
-        if missing_cols:
-            raise ValueError(f"Missing required columns: {missing_cols}")
+        X = self._feature_matrix(traders_df)
+        probabilities = self._batch_model(len(X)).predict_proba(X)
+        return self._add_predictions(traders_df, probabilities, copy=copy)
+    
+    def _batch_model(self, n_rows):
+        """The model for a batch of n_rows (see SKLEARN_BATCH_ROWS)."""
+        if (self.engine != 'auto' or n_rows < SKLEARN_BATCH_ROWS
+                or not isinstance(self.model, PackedForest) or os.path.isdir(self.model_path)):
+            return self.model
+        if self._sklearn is None:
+            with open(self.model_path, 'rb') as f:
+                self._sklearn = pickle.load(f)
+        return self._sklearn
+    
+    def predict_batch_parallel(self, traders_df, n_workers=None, copy=True,
+                               shard_size=100_000):
+        """
+        Make predictions for a large DataFrame across a process pool.
         
-        # Select features in correct order
-        X = traders_df[self.feature_names]
+        Rows are split into shards scored by worker processes that
+        memory-map the packed forest, and reassembled in input order.
+        Results are identical to predict_batch.
         
-        # Make predictions
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
+        Args:
+            traders_df (pd.DataFrame): DataFrame with trader features
+            n_workers (int): Worker processes (default: available CPUs)
+            copy (bool): If False, add prediction columns to traders_df in place
+            shard_size (int): Rows per worker task
         
-        # Create results dataframe
-        results_df = traders_df.copy()
-        results_df['prediction'] = ['Good Trader' if p == 1 else 'Bad Trader' 
-                                     for p in predictions]
-        results_df['will_remain_active'] = predictions
-        results_df['confidence'] = probabilities.max(axis=1)
-        results_df['probability_good_trader'] = probabilities[:, 1]
-        results_df['probability_bad_trader'] = probabilities[:, 0]
+        Returns:
+            pd.DataFrame: DataFrame with predictions and probabilities
+        """
+        X = self._feature_matrix(traders_df)
+        probabilities = predict_proba_parallel(self._packed_forest(), X,
+                                               n_workers=n_workers,
+                                               shard_size=shard_size)
+        return self._add_predictions(traders_df, probabilities, copy=copy)
+    
+    def predict_transactions(self, transactions, as_of=None, **feature_options):
+        """
+        Compute features from a raw transaction log and predict every wallet.
         
-        return results_df
+        Args:
+            transactions: Path to a .csv/.parquet log of (wallet, timestamp,
+                value) records, or a DataFrame of them
+            as_of: End of the 365-day feature window (default: now, UTC)
+            **feature_options: Passed to features.compute_features
+        
+        Returns:
+            pd.DataFrame: Features and predictions indexed by wallet
+        """
+        from features import compute_features
+        
+        features = compute_features(transactions, as_of=as_of, **feature_options)
+        return self.predict_batch(features, copy=False)
+    
+    def score_file(self, input_path, output_path, chunksize=100_000,
+                   resume=True, progress=True, n_workers=1):
+        """
+        Stream a CSV/Parquet file through the model chunk by chunk.
+        
+        Each chunk is read, scored in place and appended to the output before
+        the next one is read, so memory stays flat regardless of input size.
+        A checkpoint next to the output records progress after every chunk;
+        with resume=True an interrupted run continues where it stopped.
+        
+        Args:
+            input_path (str): Input .csv or .parquet file with feature columns
+            output_path (str): Output .csv or .parquet file
+            chunksize (int): Rows read and scored per chunk
+            resume (bool): Continue from an existing checkpoint if present
+            progress (bool): Print rows scored and rows/sec after each chunk
+            n_workers (int): Worker processes; above 1, chunks are scored
+                concurrently by a process pool and written in input order
+        
+        Returns:
+            dict: Rows scored, elapsed seconds, rows/sec and resume offset
+        """
+        from streaming import score_stream
+        
+        scorer = None
+        if n_workers > 1:
+            forest = self._packed_forest()
+            
+            def scorer(chunks):
+                pairs = ((chunk, self._feature_matrix(chunk)) for chunk in chunks)
+                for chunk, probabilities in iter_scored_chunks(forest, pairs, n_workers):
+                    yield self._add_predictions(chunk, probabilities, copy=False)
+        
+        return score_stream(
+            lambda chunk: self.predict_batch(chunk, copy=False),
+            input_path, output_path, chunksize=chunksize,
+            resume=resume, progress=progress, scorer=scorer
+        )
 
 
 def main():
     """
     Example usage of the predictor.
     """
+    import pandas as pd
+    
     print("="*80)
     print("RONIN TRADER CLASSIFICATION - PREDICTION SCRIPT")
     print("="*80)
@@ -219,5 +367,42 @@ def main():
     print("="*80)
 
 
+def cli():
+    """
+    Command line entry point.
+    
+    python predict.py                 Run the examples in main()
+    python predict.py score --input big.csv --output scored.parquet
+                                      Stream a file through the model
+    """
+    parser = argparse.ArgumentParser(description="Ronin trader predictions")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    score = subparsers.add_parser('score', help='Score a CSV/Parquet file in chunks')
+    score.add_argument('--input', required=True, help='Input .csv or .parquet file')
+    score.add_argument('--output', required=True, help='Output .csv or .parquet file')
+    score.add_argument('--chunksize', type=int, default=100_000,
+                       help='Rows per chunk (default: 100000)')
+    score.add_argument('--no-resume', action='store_true',
+                       help='Ignore any checkpoint and start from the first row')
+    score.add_argument('--engine', default='auto', choices=['auto', 'sklearn', 'packed'],
+                       help='Inference engine (default: auto)')
+    score.add_argument('--workers', type=int, default=1,
+                       help='Worker processes scoring chunks in parallel (default: 1)')
+    score.add_argument('--model', default='models/best_model_random_forest.pkl')
+    score.add_argument('--features', default='models/feature_names.pkl')
+    
+    args = parser.parse_args()
+    if args.command is None:
+        main()
+        return
+    
+    predictor = RoninTraderPredictor(args.model, args.features, engine=args.engine)
+    summary = predictor.score_file(args.input, args.output, chunksize=args.chunksize,
+                                   resume=not args.no_resume, n_workers=args.workers)
+    print(f"✅ Scored {summary['rows']:,} rows in {summary['seconds']:.1f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec) -> {args.output}")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
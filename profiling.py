@@ -0,0 +1,321 @@
+"""
+Ronin Trader Classification - On-demand Profiling
+Author: Jo$h
+
+Opt-in profiling of a live API worker, switched on by configuration and
+not by a redeploy:
+
+    PROFILING_ENABLED=true     turn the profiling surface on (default off)
+    PROFILING_TOKEN=<secret>   required in the X-Profile-Token header (profiling
+                               refuses to start without one)
+    PROFILING_DIR              where profiles are saved (default profiles/)
+
+Single requests: add `?profile=sample` (or the header `X-Profile: sample`)
+to /predict, /predict_batch or /predict_wallet. The request is then run
+under a sampling profiler, and the response carries X-Profile-Id and
+X-Profile-File headers. `?profile=cprofile` uses cProfile instead. It
+counts every call, so it is exact for short requests but slows them
+down. `?profile_output=inline` returns the report as the response body.
+
+Whole worker: `/admin/profile?seconds=N` samples every thread of the
+worker for N seconds in the background, at most PROFILING_MAX_CONCURRENT
+runs at a time. Fetch the result from `/admin/profile/<id>`. Responses
+name profiles by file name only, never by server path.
+
+The sampler is pure Python (sys._current_frames() from a background
+thread), so there is nothing to install. Samples are saved as collapsed
+stacks (`.folded`), the input format of flamegraph.pl, speedscope and
+inferno. cProfile runs are saved as `.pstats` for `python -m pstats` or
+snakeviz.
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+
+TOKEN_HEADER = 'X-Profile-Token'
+# Leaf frames of threads that are blocked, not running: dropped from
+# worker profiles so they show CPU time only
+IDLE_FRAMES = {
+    ('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'), ('socket.py', 'accept'), ('socket.py', 'readinto'),
+    ('queue.py', 'get'), ('socketserver.py', 'serve_forever'),
+    ('base_events.py', '_run_once'), ('thread.py', '_worker')
+}
+PROFILE_ID = re.compile(r'^[0-9A-Za-z-]+$')
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of other threads at a fixed interval.
+    """
+
+    def __init__(self, interval=0.005, thread_ids=None, include_idle=False):
+        """
+        Args:
+            interval (float): Seconds between samples
+            thread_ids (set): Threads to sample (default: all but the sampler)
+            include_idle (bool): Keep samples of threads blocked in IDLE_FRAMES
+        """
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        self.seconds = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None
+                                        and thread_id not in self.thread_ids):
+                    continue
+                code = frame.f_code
+                if (not self.include_idle and
+                        (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self):
+        """Collapsed stacks, one 'root;...;leaf count' line per distinct stack."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def top(self, n=20):
+        """The n frames with the most samples at the top of the stack."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(n)
+
+    def report(self, n=20):
+        """Plain-text summary followed by the collapsed stacks."""
+        lines = [f"{self.samples} samples over {self.seconds:.3f}s "
+                 f"(every {self.interval * 1000:g} ms)", '', 'Top frames (self samples):']
+        lines += [f"{count:>8}  {count / max(self.samples, 1):>6.1%}  {frame}"
+                  for frame, count in self.top(n)]
+        return '\n'.join(lines) + '\n\nCollapsed stacks:\n' + self.folded()
+
+
+class RequestProfile:
+    """A profile of one request, started before the view and stopped after."""
+
+    def __init__(self, mode, interval, inline, thread_ids='current'):
+        self.mode = mode
+        self.inline = inline
+        self.id = new_profile_id()
+        if mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            if thread_ids == 'current':
+                thread_ids = {threading.get_ident()}
+            # Idle frames are kept only when following the request's own thread
+            self._profiler = SamplingProfiler(interval, thread_ids=thread_ids,
+                                              include_idle=thread_ids is not None).start()
+
+    def stop(self):
+        """Stop profiling; returns a text report."""
+        if self.mode == 'cprofile':
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(40)
+            return out.getvalue()
+        return self._profiler.stop().report()
+
+    def save(self, directory):
+        """Write the profile (.pstats or .folded); returns the file path."""
+        os.makedirs(directory, exist_ok=True)
+        if self.mode == 'cprofile':
+            path = os.path.join(directory, f'{self.id}.pstats')
+            self._profiler.dump_stats(path)
+        else:
+            path = os.path.join(directory, f'{self.id}.folded')
+            with open(path, 'w') as f:
+                f.write(self._profiler.folded())
+        return path
+
+
+def new_profile_id():
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class Profiling:
+    """
+    Access control and storage for request and worker profiles.
+    """
+
+    def __init__(self, token=None, directory='profiles', request_interval=0.001,
+                 worker_interval=0.005, max_seconds=60, max_concurrent=1):
+        """
+        Args:
+            token (str): Secret expected in the X-Profile-Token header (None:
+                every request is refused)
+            directory (str): Where profiles are saved
+            request_interval (float): Sampling interval for single requests
+            worker_interval (float): Sampling interval for /admin/profile
+            max_seconds (float): Longest /admin/profile run allowed
+            max_concurrent (int): /admin/profile runs allowed at the same time
+        """
+        self.token = token
+        self.directory = directory
+        self.request_interval = request_interval
+        self.worker_interval = worker_interval
+        self.max_seconds = max_seconds
+        self.max_concurrent = max_concurrent
+        self.running = {}
+        self._lock = threading.Lock()
+
+    def authorized(self, token):
+        # Fail closed: no configured token means nobody may profile
+        if not self.token:
+            return False
+        return token is not None and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def requested_mode(self, args, headers):
+        """'sample', 'cprofile' or None from ?profile= / X-Profile."""
+        mode = (args.get('profile') or headers.get('x-profile') or '').lower()
+        if not mode or mode in ('0', 'false', 'no'):
+            return None
+        return 'cprofile' if mode == 'cprofile' else 'sample'
+
+    def start_request(self, args, headers, all_threads=False):
+        """
+        A RequestProfile if this request asked for one and may have it, else None.
+
+        Args:
+            args (dict): Query parameters
+            headers: Request headers, looked up by lowercase name
+            all_threads (bool): Sample every thread, for servers that hand the
+                request to other threads (cProfile only sees its own thread,
+                so this always samples)
+        """
+        mode = self.requested_mode(args, headers)
+        if mode is None or not self.authorized(headers.get(TOKEN_HEADER.lower())):
+            return None
+        inline = (args.get('profile_output') or headers.get('x-profile-output')) == 'inline'
+        if all_threads:
+            return RequestProfile('sample', self.request_interval, inline, thread_ids=None)
+        return RequestProfile(mode, self.request_interval, inline)
+
+    def finish_request(self, profile):
+        """
+        Stop and save a request profile.
+
+        Returns:
+            tuple: (text report, response headers)
+        """
+        report = profile.stop()
+        path = profile.save(self.directory)
+        return report, {'X-Profile-Id': profile.id, 'X-Profile-File': os.path.basename(path)}
+
+    def start_worker_profile(self, seconds, include_idle=False):
+        """
+        Sample every thread of this worker for `seconds` in the background.
+
+        Returns:
+            dict: id, seconds and the file name the profile will be saved
+            under, or None if max_concurrent runs are already going
+        """
+        seconds = min(float(seconds), self.max_seconds)
+        profile_id = new_profile_id()
+        path = os.path.join(self.directory, f'{profile_id}.folded')
+        profiler = SamplingProfiler(self.worker_interval, include_idle=include_idle)
+        with self._lock:
+            if len(self.running) >= self.max_concurrent:
+                return None
+            self.running[profile_id] = profiler
+
+        def run():
+            try:
+                profiler.start()
+                time.sleep(seconds)
+                profiler.stop()
+                os.makedirs(self.directory, exist_ok=True)
+                with open(f'{path}.tmp', 'w') as f:
+                    f.write(profiler.folded())
+                os.replace(f'{path}.tmp', path)
+            finally:
+                with self._lock:
+                    self.running.pop(profile_id, None)
+
+        threading.Thread(target=run, name='worker-profile', daemon=True).start()
+        return {'id': profile_id, 'seconds': seconds, 'pid': os.getpid(),
+                'file': os.path.basename(path)}
+
+    def find(self, profile_id):
+        """
+        Path of a saved profile, 'running' while it is being recorded, else None.
+        """
+        if not PROFILE_ID.match(profile_id):
+            return None
+        if profile_id in self.running:
+            return 'running'
+        for suffix in ('.folded', '.pstats'):
+            path = os.path.join(self.directory, profile_id + suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+
+def profiling_from_env():
+    """
+    Profiling settings from environment variables, or None when disabled.
+
+    PROFILING_ENABLED          - 'true' to allow profiling (default off)
+    PROFILING_TOKEN            - secret for the X-Profile-Token header
+    PROFILING_DIR              - output directory (default profiles/)
+    PROFILING_INTERVAL_MS      - /admin/profile sampling interval (default 5)
+    PROFILING_MAX_SECONDS      - longest /admin/profile run (default 60)
+    PROFILING_MAX_CONCURRENT   - /admin/profile runs at a time per worker (default 1)
+
+    Raises:
+        ValueError: If profiling is enabled without a PROFILING_TOKEN
+    """
+    if os.getenv('PROFILING_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    token = os.getenv('PROFILING_TOKEN')
+    if not token:
+        raise ValueError("PROFILING_ENABLED requires PROFILING_TOKEN; "
+                         "refusing to expose profiling without one")
+    return Profiling(
+        token=token,
+        directory=os.getenv('PROFILING_DIR', 'profiles'),
+        worker_interval=float(os.getenv('PROFILING_INTERVAL_MS', 5)) / 1000,
+        max_seconds=float(os.getenv('PROFILING_MAX_SECONDS', 60)),
+        max_concurrent=int(os.getenv('PROFILING_MAX_CONCURRENT', 1))
+    )
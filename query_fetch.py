@@ -1,23 +1,12 @@
-import os
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Get API key from environment
-dune_api_key = os.getenv("DEFI_JOSH_DUNE_QUERY_API_KEY")
-
-query_id = "6221750"    # Data source: https://dune.com/queries/6221750
-
-url = f"https://api.dune.com/api/v1/query/{query_id}/results/csv"
-
-headers = {"X-DUNE-API-KEY": dune_api_key}
-
-response = requests.get(url, headers=headers)
-
-# Save to CSV file
-with open("ronin_traders_dataset.csv", "w") as file:
-    file.write(response.text)
-
-print("Data saved to ronin_traders_dataset.csv")
\ No newline at end of file
+from ingest import fetch_dataset
+
+# Data source: https://dune.com/queries/6221750
+# Streams the query result to disk and stores it as Parquet plus a manifest;
+# skipped when the upstream execution/ETag has not changed since the last run.
+manifest = fetch_dataset(output_dir=".", keep_csv=True)
+
+if manifest["skipped"]:
+    print("Dataset unchanged, kept ronin_traders_dataset.csv")
+else:
+    print(f"Data saved to ronin_traders_dataset.csv and {manifest['parquet']} "
+          f"({manifest['rows']} rows)")
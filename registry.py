@@ -0,0 +1,464 @@
+"""
+Ronin Trader Classification - Model Registry & Hot Reload
+Author: Jo$h
+
+A local, versioned model registry:
+
+    models/registry/
+        CURRENT               name of the active version
+        v0001/
+            manifest.json     files with SHA-256, feature names, metrics
+            model.pkl         (or packed_forest/ for a PackedForest export)
+            feature_names.pkl (not needed by exports that carry their own)
+        v0002/ ...
+
+Versions are never modified after publishing. A version directory is
+staged under a temporary name and renamed into place, and CURRENT is
+replaced atomically, so a reader never sees half a version.
+Activating an older version is a rollback.
+
+ModelReloader lets a running server pick up a new CURRENT without a
+restart. A background thread polls CURRENT, loads and verifies the new
+version, warms it up off the request path, and hands it to a callback
+that swaps it in with a single assignment. Requests in flight finish on
+the model they started with.
+
+Usage:
+    python registry.py publish --model models/best_model_random_forest.pkl --features models/feature_names.pkl
+    python registry.py list
+    python registry.py activate v0001
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from inference import PackedForest, build_engine, file_sha256, load_engine
+
+
+DEFAULT_ROOT = 'models/registry'
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+WARMUP_BATCH_SIZES = (1, 100, 1000)
+
+
+class RegistryError(Exception):
+    """A version is missing, incomplete or fails verification."""
+
+
+def _write_atomic(path, text):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def metrics_from_results(results_path, model_name):
+    """The row of model_comparison_results.csv for model_name, as a dict."""
+    import pandas as pd
+
+    results = pd.read_csv(results_path)
+    row = results[results['Model'] == model_name]
+    if row.empty:
+        raise RegistryError(f"No results for '{model_name}' in {results_path}")
+    return {key: (value.item() if hasattr(value, 'item') else value)
+            for key, value in row.iloc[0].items()}
+
+
+class LoadedModel:
+    """
+    A model version loaded into memory, with its load and warm-up timings.
+    """
+
+    def __init__(self, model, feature_names, version=None, manifest=None,
+                 source=None, load_seconds=None):
+        self.model = model
+        self.feature_names = feature_names
+        self.version = version
+        self.manifest = manifest or {}
+        self.source = source
+        self.load_seconds = load_seconds
+        self.loaded_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.warmup = {'status': 'pending'}
+
+    def warm_up(self, batch_sizes=WARMUP_BATCH_SIZES, seed=0):
+        """
+        Score synthetic batches so the first real request does not pay for
+        cold code paths or, for memory-mapped forests, page faults. Also
+        checks the outputs are valid probabilities.
+
+        Raises:
+            RegistryError: If the model returns malformed probabilities
+        """
+        self.warmup = {'status': 'warming'}
+        rng = np.random.default_rng(seed)
+        started = time.perf_counter()
+        batch_ms = {}
+        for n_rows in batch_sizes:
+            X = rng.lognormal(0, 2, size=(n_rows, len(self.feature_names)))
+            batch_started = time.perf_counter()
+            probabilities = np.asarray(self.model.predict_proba(X))
+            batch_ms[str(n_rows)] = round((time.perf_counter() - batch_started) * 1000, 3)
+            if (probabilities.shape != (n_rows, len(self.model.classes_))
+                    or not np.allclose(probabilities.sum(axis=1), 1.0)):
+                self.warmup = {'status': 'failed', 'error': 'invalid probabilities'}
+                raise RegistryError(f"Version {self.version} returned invalid probabilities")
+        self.warmup = {'status': 'ready',
+                       'seconds': round(time.perf_counter() - started, 4),
+                       'batch_ms': batch_ms}
+        return self.warmup
+
+    def info(self):
+        """Summary for /health."""
+        return {
+            'version': self.version,
+            'source': self.source,
+            'format': self.manifest.get('format'),
+            'loaded_at': self.loaded_at,
+            'load_seconds': self.load_seconds,
+            'warmup': self.warmup,
+            'metrics': self.manifest.get('metrics')
+        }
+
+
+def load_files(model_path, features_path, engine='sklearn', packed_model_dir=None):
+    """
+    Load an unversioned model the way app.py always has (MODEL_PATH etc.).
+
+    packed_model_dir, or a model_path that is a forest directory, is
+    checked and memory-mapped. packed_model_dir only applies to the
+    'auto' and 'packed' engines; with 'sklearn' the pickle at model_path
+    is served as asked. For a pickle with engine='auto', its native
+    export (`python inference.py export`) is memory-mapped while it is
+    current (see inference.load_engine). Exports carry their feature names,
+    so features_path is only read for pickles and exports saved without them.
+    """
+    started = time.perf_counter()
+    if packed_model_dir and engine in ('auto', 'packed'):
+        model = PackedForest.load(packed_model_dir, mmap_mode='r')
+        source = packed_model_dir
+    else:
+        model = load_engine(model_path, engine)
+        source = model_path
+    feature_names = getattr(model, 'feature_names', None)
+    if feature_names is None:
+        with open(features_path, 'rb') as f:
+            feature_names = pickle.load(f)
+    return LoadedModel(model, feature_names, manifest=getattr(model, 'manifest', None),
+                       source=source, load_seconds=round(time.perf_counter() - started, 4))
+
+
+class ModelRegistry:
+    """
+    Versioned model directories with checksummed manifests.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    @property
+    def current_path(self):
+        return os.path.join(self.root, CURRENT_FILE)
+
+    def versions(self):
+        """Published version names, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, name, MANIFEST_FILE)))
+
+    def manifest(self, version):
+        path = os.path.join(self.root, version, MANIFEST_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RegistryError(f"Unknown version '{version}' in {self.root}")
+
+    def current(self):
+        """The active version name, or None if nothing is active."""
+        try:
+            with open(self.current_path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _next_version(self):
+        numbers = [int(name[1:]) for name in self.versions()
+                   if name.startswith('v') and name[1:].isdigit()]
+        return f'v{max(numbers, default=0) + 1:04d}'
+
+    def publish(self, model_path, features_path, metrics=None, notes=None, activate=True):
+        """
+        Copy a model into a new version.
+
+        Args:
+            model_path (str): Pickled model, or a PackedForest export directory
+            features_path (str): Pickled feature name list (optional for
+                exports that carry their own)
+            metrics (dict): Evaluation metrics stored in the manifest
+                (default for exports: the metrics they were saved with)
+            notes (str): Free-form description
+            activate (bool): Make it the CURRENT version
+
+        Returns:
+            dict: The new version's manifest
+        """
+        os.makedirs(self.root, exist_ok=True)
+        version = self._next_version()
+        staging = os.path.join(self.root, f'.{version}.tmp')
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        features_file = 'feature_names.pkl'
+        if os.path.isdir(model_path):
+            model_file, fmt = 'packed_forest', 'packed'
+            shutil.copytree(model_path, os.path.join(staging, model_file))
+            forest = PackedForest.load(os.path.join(staging, model_file))
+            if forest.feature_names is not None and features_path is None:
+                features_file, feature_names = None, forest.feature_names
+            if metrics is None:
+                metrics = forest.manifest['metrics']
+        else:
+            model_file, fmt = 'model.pkl', 'pickle'
+            shutil.copy2(model_path, os.path.join(staging, model_file))
+        if features_file:
+            shutil.copy2(features_path, os.path.join(staging, features_file))
+            with open(features_path, 'rb') as f:
+                feature_names = pickle.load(f)
+
+        files = {}
+        for directory, _, names in os.walk(staging):
+            for name in sorted(names):
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, staging)] = file_sha256(path)
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'format': fmt,
+            'model': model_file,
+            'features_file': features_file,
+            'feature_names': list(feature_names),
+            'source': os.path.abspath(model_path),
+            'metrics': metrics or {},
+            'notes': notes,
+            'files': files
+        }
+        _write_atomic(os.path.join(staging, MANIFEST_FILE), json.dumps(manifest, indent=2))
+        os.rename(staging, os.path.join(self.root, version))
+
+        if activate:
+            self.activate(version)
+        return manifest
+
+    def verify(self, version):
+        """
+        Check every file of a version against its manifest.
+
+        Raises:
+            RegistryError: On a missing file or checksum mismatch
+        """
+        manifest = self.manifest(version)
+        directory = os.path.join(self.root, version)
+        for name, expected in manifest['files'].items():
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                raise RegistryError(f"{version}: missing {name}")
+            if file_sha256(path) != expected:
+                raise RegistryError(f"{version}: checksum mismatch for {name}")
+        return manifest
+
+    def activate(self, version):
+        """Point CURRENT at a published version (also used to roll back)."""
+        self.verify(version)
+        _write_atomic(self.current_path, version + '\n')
+
+    def load(self, version=None, engine='sklearn'):
+        """
+        Verify and load a version (default: CURRENT).
+
+        Args:
+            version (str): Version name
+            engine (str): Inference engine for pickled models ('auto', 'sklearn' or 'packed')
+
+        Returns:
+            LoadedModel: Not yet warmed up
+        """
+        version = version or self.current()
+        if version is None:
+            raise RegistryError(f"No active version in {self.root}")
+
+        started = time.perf_counter()
+        manifest = self.verify(version)
+        directory = os.path.join(self.root, version)
+        model_path = os.path.join(directory, manifest['model'])
+        if manifest['format'] == 'packed':
+            # Checksums were just verified against the version manifest
+            model = PackedForest.load(model_path, mmap_mode='r', verify=False)
+        else:
+            with open(model_path, 'rb') as f:
+                model = build_engine(pickle.load(f), engine)
+        if manifest['features_file']:
+            with open(os.path.join(directory, manifest['features_file']), 'rb') as f:
+                feature_names = pickle.load(f)
+        else:
+            feature_names = manifest['feature_names']
+
+        return LoadedModel(model, feature_names, version=version, manifest=manifest,
+                           source=directory,
+                           load_seconds=round(time.perf_counter() - started, 4))
+
+
+class ModelReloader:
+    """
+    Polls the registry and swaps in new versions from a background thread.
+    """
+
+    def __init__(self, registry, activate, engine='sklearn', interval=10.0, active_version=None):
+        """
+        Args:
+            registry (ModelRegistry): Registry to watch
+            activate (callable): activate(loaded_model) installs a warmed-up version
+            engine (str): Inference engine for pickled models
+            interval (float): Seconds between checks of CURRENT
+            active_version (str): Version already being served
+        """
+        self.registry = registry
+        self.activate = activate
+        self.engine = engine
+        self.interval = interval
+        self.active_version = active_version
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+        self.checks = 0
+        self.swaps = 0
+        self.last_check = None
+        self.last_error = None
+        self.loading = None
+
+    def ensure_running(self):
+        """Start the polling thread, again after a fork (e.g. gunicorn --preload)."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='model-reloader',
+                                            daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def check(self):
+        """
+        Load, warm up and activate CURRENT if it changed.
+
+        Returns:
+            bool: True when a new version was swapped in
+        """
+        self.checks += 1
+        self.last_check = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        version = self.registry.current()
+        if version is None or version == self.active_version:
+            return False
+
+        self.loading = version
+        try:
+            loaded = self.registry.load(version, engine=self.engine)
+            loaded.warm_up()
+        except Exception as e:
+            self.last_error = {'version': version, 'error': str(e), 'at': self.last_check}
+            return False
+        finally:
+            self.loading = None
+
+        self.activate(loaded)
+        self.active_version = version
+        self.swaps += 1
+        self.last_error = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = {'error': str(e), 'at': self.last_check}
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'registry': self.registry.root,
+            'interval': self.interval,
+            'checks': self.checks,
+            'swaps': self.swaps,
+            'last_check': self.last_check,
+            'loading': self.loading,
+            'last_error': self.last_error
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned model registry")
+    parser.add_argument('--root', default=os.getenv('MODEL_REGISTRY_DIR', DEFAULT_ROOT))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    publish = subparsers.add_parser('publish', help='Add a new version')
+    publish.add_argument('--model', required=True, help='Pickled model or PackedForest directory')
+    publish.add_argument('--features', default='models/feature_names.pkl')
+    publish.add_argument('--results', default='models/model_comparison_results.csv',
+                         help='model_comparison_results.csv to take metrics from')
+    publish.add_argument('--model-name', default='Random Forest',
+                         help='Row of the results file with this model\'s metrics')
+    publish.add_argument('--notes')
+    publish.add_argument('--no-activate', action='store_true')
+
+    subparsers.add_parser('list', help='List versions')
+    activate = subparsers.add_parser('activate', help='Make a version current (or roll back)')
+    activate.add_argument('version')
+    verify = subparsers.add_parser('verify', help='Check a version\'s checksums')
+    verify.add_argument('version', nargs='?')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'publish':
+        metrics = (metrics_from_results(args.results, args.model_name)
+                   if os.path.exists(args.results) else None)
+        manifest = registry.publish(args.model, args.features, metrics=metrics,
+                                    notes=args.notes, activate=not args.no_activate)
+        print(f"✅ Published {manifest['version']} ({manifest['format']}) to {args.root}"
+              + ("" if args.no_activate else " and made it current"))
+    elif args.command == 'list':
+        current = registry.current()
+        for version in registry.versions():
+            manifest = registry.manifest(version)
+            marker = '*' if version == current else ' '
+            auc = manifest['metrics'].get('ROC-AUC')
+            print(f"{marker} {version}  {manifest['created_at']}  {manifest['format']:<7} "
+                  f"ROC-AUC {auc if auc is not None else '-'}  {manifest.get('notes') or ''}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"✅ {args.version} is now current")
+    else:
+        version = args.version or registry.current()
+        registry.verify(version)
+        print(f"✅ {version} matches its manifest")
+
+
+if __name__ == "__main__":
+    main()
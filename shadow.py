@@ -0,0 +1,346 @@
+"""
+Ronin Trader Classification - Shadow & A/B Model Evaluation
+Author: Jo$h
+
+Trials challenger models (an XGBoost candidate, a compressed forest, an
+older registry version) against the served model on live traffic.
+
+Shadow scoring: a sampled fraction of /predict and /predict_batch
+requests is queued, after the response has been computed, for every
+challenger. A background thread scores the queued rows and records, per
+challenger, how often its label agrees with the served one and how far
+its probability of a good trader moves. The thread's CPU time is
+recorded as the added cost. The queue is bounded, and when it is full
+samples are dropped, never waited on. Responses are never affected.
+
+A/B split: a weighted share of requests is answered by a challenger
+instead of the served model. Requests carrying a key (e.g. a wallet
+address) always get the same arm.
+
+Challengers are given as name=source pairs, where source is a pickled
+model, a PackedForest export directory or registry:<version>.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+from registry import DEFAULT_ROOT, ModelRegistry, load_files
+
+
+# Upper edges of the |probability delta| histogram buckets
+DELTA_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+def parse_pairs(spec):
+    """'a=x,b=y' -> {'a': 'x', 'b': 'y'} (empty or None -> {})."""
+    pairs = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition('=')
+        if not sep or not name.strip() or not value.strip():
+            raise ValueError(f"Expected name=value, got '{item.strip()}'")
+        pairs[name.strip()] = value.strip()
+    return pairs
+
+
+def load_challenger(source, features_path, engine='sklearn'):
+    """
+    Load a challenger model.
+
+    Args:
+        source (str): Pickled model, PackedForest directory or registry:<version>
+        features_path (str): Feature names for pickled and packed models
+        engine (str): Inference engine for pickled models
+
+    Returns:
+        registry.LoadedModel: Warmed-up challenger
+    """
+    if source.startswith('registry:'):
+        registry = ModelRegistry(os.getenv('MODEL_REGISTRY_DIR', DEFAULT_ROOT))
+        loaded = registry.load(source[len('registry:'):], engine=engine)
+    elif os.path.isdir(source):
+        loaded = load_files(None, features_path, 'packed', packed_model_dir=source)
+    else:
+        loaded = load_files(source, features_path, engine)
+    loaded.warm_up()
+    return loaded
+
+
+class ChallengerStats:
+    """Agreement, probability deltas and CPU cost of one challenger."""
+
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.agreements = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.histogram = np.zeros(len(DELTA_BUCKETS), dtype=np.int64)
+        self.cpu_seconds = 0.0
+        self.errors = 0
+
+    def record(self, agree, delta, cpu_seconds):
+        abs_delta = np.abs(delta)
+        self.batches += 1
+        self.rows += len(delta)
+        self.agreements += int(np.count_nonzero(agree))
+        self.delta_sum += float(delta.sum())
+        self.abs_delta_sum += float(abs_delta.sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_delta.max()))
+        self.histogram += np.bincount(
+            np.searchsorted(DELTA_BUCKETS, abs_delta, side='left').clip(max=len(DELTA_BUCKETS) - 1),
+            minlength=len(DELTA_BUCKETS))
+        self.cpu_seconds += cpu_seconds
+
+    def summary(self):
+        rows = max(self.rows, 1)
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'agreement_rate': round(self.agreements / rows, 6) if self.rows else None,
+            'mean_delta': round(self.delta_sum / rows, 6),
+            'mean_abs_delta': round(self.abs_delta_sum / rows, 6),
+            'max_abs_delta': round(self.max_abs_delta, 6),
+            'abs_delta_histogram': {f'<={edge}': int(count)
+                                    for edge, count in zip(DELTA_BUCKETS, self.histogram)},
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'cpu_us_per_row': round(self.cpu_seconds / rows * 1e6, 2),
+            'errors': self.errors
+        }
+
+
+class ShadowScorer:
+    """
+    Scores sampled traffic with challenger models on a background thread.
+    """
+
+    def __init__(self, challengers, fraction=0.1, max_queue=256, log_path=None, seed=None):
+        """
+        Args:
+            challengers (dict): name -> LoadedModel
+            fraction (float): Share of requests shadow-scored (0..1)
+            max_queue (int): Queued requests before new samples are dropped
+            log_path (str): Append one JSON line per scored request and challenger
+            seed (int): Sampling seed, for reproducible tests
+        """
+        self.challengers = challengers
+        self.fraction = fraction
+        self.max_queue = max_queue
+        self.log_path = log_path
+
+        self._random = random.Random(seed)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._started_cpu = time.process_time()
+
+        self.stats_by_model = {name: ChallengerStats() for name in challengers}
+        self.sampled = 0
+        self.dropped = 0
+
+    def _ensure_worker(self):
+        """Start the worker thread, again after a fork (e.g. gunicorn --preload)."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Threads and queued items do not survive fork
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._started_cpu = time.process_time()
+            self._thread = threading.Thread(target=self._run, name='shadow-scorer',
+                                            daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def sample(self):
+        """Whether to shadow-score the current request."""
+        return self.fraction > 0 and self._random.random() < self.fraction
+
+    def submit(self, X, probabilities):
+        """
+        Queue rows the served model scored; never blocks.
+
+        Args:
+            X (np.ndarray): (n, n_features) rows that were scored
+            probabilities (np.ndarray): The served model's (n, 2) probabilities
+
+        Returns:
+            bool: False when the queue was full and the sample was dropped
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((X, np.asarray(probabilities)))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.sampled += 1
+        return True
+
+    def maybe_submit(self, X, probabilities):
+        """submit() for a sampled fraction of calls."""
+        if self.sample():
+            self.submit(X, probabilities)
+
+    def _run(self):
+        while True:
+            X, probabilities = self._queue.get()
+            try:
+                self._score(X, probabilities)
+            finally:
+                self._queue.task_done()
+
+    def _score(self, X, probabilities):
+        served_labels = np.argmax(probabilities, axis=1)
+        records = []
+        for name, challenger in self.challengers.items():
+            stats = self.stats_by_model[name]
+            started = time.thread_time()
+            try:
+                challenger_probabilities = challenger.model.predict_proba(X)
+            except Exception:
+                stats.errors += 1
+                continue
+            cpu_seconds = time.thread_time() - started
+            agree = np.argmax(challenger_probabilities, axis=1) == served_labels
+            delta = challenger_probabilities[:, 1] - probabilities[:, 1]
+            stats.record(agree, delta, cpu_seconds)
+            records.append({
+                'ts': round(time.time(), 3),
+                'model': name,
+                'version': challenger.version,
+                'rows': len(X),
+                'agreement': round(float(agree.mean()), 6),
+                'mean_abs_delta': round(float(np.abs(delta).mean()), 6),
+                'max_abs_delta': round(float(np.abs(delta).max()), 6),
+                'cpu_ms': round(cpu_seconds * 1000, 3)
+            })
+        if self.log_path and records:
+            with open(self.log_path, 'a') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in records))
+
+    def drain(self, timeout=None):
+        """Wait until every queued sample has been scored."""
+        if self._thread is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            time.sleep(0.005)
+
+    def stats(self):
+        models = {name: stats.summary() for name, stats in self.stats_by_model.items()}
+        shadow_cpu = sum(stats.cpu_seconds for stats in self.stats_by_model.values())
+        process_cpu = time.process_time() - self._started_cpu
+        return {
+            'fraction': self.fraction,
+            'sampled': self.sampled,
+            'dropped': self.dropped,
+            'queued': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'cpu_share': round(shadow_cpu / process_cpu, 4) if process_cpu > 0 else None,
+            'models': models
+        }
+
+
+class TrafficSplit:
+    """
+    Weighted assignment of requests to the served model or a challenger.
+    """
+
+    def __init__(self, challengers, weights, seed=None):
+        """
+        Args:
+            challengers (dict): name -> LoadedModel
+            weights (dict): name -> share of requests (the rest is control)
+            seed (int): Seed for unkeyed requests
+        """
+        unknown = set(weights) - set(challengers)
+        if unknown:
+            raise ValueError(f"A/B weights for unknown challengers: {sorted(unknown)}")
+        if sum(weights.values()) > 1 or min(weights.values(), default=0) < 0:
+            raise ValueError("A/B weights must be >= 0 and sum to at most 1")
+        self.challengers = challengers
+        self.weights = weights
+        self._edges = np.cumsum(list(weights.values()))
+        self._names = list(weights)
+        self._random = random.Random(seed)
+        self.served = {name: 0 for name in ['control'] + self._names}
+
+    def choose(self, key=None):
+        """
+        Pick an arm for a request.
+
+        Args:
+            key (str): Stable key, e.g. a wallet address, for sticky assignment
+
+        Returns:
+            tuple: (arm name, LoadedModel), the model being None for control
+        """
+        if key is None:
+            point = self._random.random()
+        else:
+            digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+            point = int.from_bytes(digest, 'big') / 2 ** 64
+        index = int(np.searchsorted(self._edges, point, side='right'))
+        if index >= len(self._names):
+            self.served['control'] += 1
+            return 'control', None
+        name = self._names[index]
+        self.served[name] += 1
+        return name, self.challengers[name]
+
+    def stats(self):
+        return {'weights': self.weights, 'served': dict(self.served)}
+
+
+def experiment_from_env(feature_names):
+    """
+    Challengers, shadow scorer and A/B split from environment variables.
+
+    CHALLENGER_MODELS   - name=source pairs, e.g. 'xgb=models/best_model_xgboost.pkl,
+                          rf10=models/packed_rf10,prev=registry:v0003'
+    SHADOW_FRACTION     - share of requests shadow-scored by every challenger (default 0)
+    SHADOW_QUEUE_SIZE   - queued requests before samples are dropped (default 256)
+    SHADOW_LOG_PATH     - JSON lines log of per-request comparisons (default none)
+    AB_WEIGHTS          - name=share pairs answered by a challenger, e.g. 'xgb=0.1'
+
+    Returns:
+        tuple: (challengers, ShadowScorer or None, TrafficSplit or None)
+    """
+    sources = parse_pairs(os.getenv('CHALLENGER_MODELS'))
+    if not sources:
+        return {}, None, None
+
+    features_path = os.getenv('FEATURES_PATH', 'models/feature_names.pkl')
+    engine = os.getenv('INFERENCE_ENGINE', 'auto')
+    challengers = {}
+    for name, source in sources.items():
+        loaded = load_challenger(source, features_path, engine)
+        if list(loaded.feature_names) != list(feature_names):
+            raise ValueError(f"Challenger '{name}' expects features {loaded.feature_names}")
+        challengers[name] = loaded
+        print(f"✅ Challenger '{name}' loaded from {source} ({loaded.load_seconds}s)")
+
+    scorer = None
+    fraction = float(os.getenv('SHADOW_FRACTION', 0))
+    if fraction > 0:
+        scorer = ShadowScorer(challengers, fraction=fraction,
+                              max_queue=int(os.getenv('SHADOW_QUEUE_SIZE', 256)),
+                              log_path=os.getenv('SHADOW_LOG_PATH'))
+
+    weights = {name: float(share) for name, share in parse_pairs(os.getenv('AB_WEIGHTS')).items()}
+    split = TrafficSplit(challengers, weights) if weights else None
+    return challengers, scorer, split
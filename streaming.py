@@ -0,0 +1,251 @@
+"""
+Ronin Trader Classification - Streaming Scoring
+Author: Jo$h
+
+Chunked reading and incremental writing of CSV/Parquet files so exports with
+millions of wallets can be scored with flat memory. Progress is checkpointed
+after every chunk, so a crashed run resumes from the last completed chunk
+instead of starting over.
+"""
+
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+
+def file_format(path):
+    """Return 'csv' or 'parquet' based on the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError(f"Unsupported file type '{ext}' for {path}. Use .csv or .parquet")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet files: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def iter_chunks(path, chunksize, start_row=0):
+    """
+    Yield DataFrames of at most `chunksize` rows, starting at `start_row`.
+
+    Args:
+        path (str): .csv or .parquet input file
+        chunksize (int): Rows per chunk
+        start_row (int): Data rows to skip (resume offset)
+    """
+    if file_format(path) == 'csv':
+        # A callable keeps memory flat when skipping millions of rows
+        skiprows = (lambda i: 0 < i <= start_row) if start_row else None
+        yield from pd.read_csv(path, chunksize=chunksize, skiprows=skiprows)
+        return
+
+    _, pq = _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+
+    # Skip whole row groups that end before the resume offset
+    first_group, skipped = 0, 0
+    while first_group < parquet_file.num_row_groups:
+        group_rows = parquet_file.metadata.row_group(first_group).num_rows
+        if skipped + group_rows > start_row:
+            break
+        skipped += group_rows
+        first_group += 1
+
+    to_drop = start_row - skipped
+    row_groups = range(first_group, parquet_file.num_row_groups)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, row_groups=row_groups):
+        if to_drop:
+            if to_drop >= batch.num_rows:
+                to_drop -= batch.num_rows
+                continue
+            batch = batch.slice(to_drop)
+            to_drop = 0
+        yield batch.to_pandas()
+
+
+class CsvChunkWriter:
+    """Appends scored chunks to a CSV file, truncating any partial tail on resume."""
+
+    def __init__(self, path, state=None):
+        self.path = path
+        offset = state.get('output_bytes', 0) if state else 0
+        if offset:
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+            self.file = open(path, 'a', newline='')
+        else:
+            self.file = open(path, 'w', newline='')
+        self.header_written = offset > 0
+
+    def write(self, df):
+        df.to_csv(self.file, header=not self.header_written, index=False)
+        self.header_written = True
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def state(self):
+        return {'output_bytes': self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetChunkWriter:
+    """
+    Writes each scored chunk as an atomically renamed part file, then merges
+    the parts into the final Parquet file one part at a time.
+    """
+
+    def __init__(self, path, state=None):
+        self.pa, self.pq = _require_pyarrow()
+        self.path = path
+        self.parts_dir = path + '.parts'
+        self.parts = state.get('parts', 0) if state else 0
+
+        if self.parts == 0 and os.path.isdir(self.parts_dir):
+            shutil.rmtree(self.parts_dir)
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+        # Drop anything written after the last checkpoint
+        for name in os.listdir(self.parts_dir):
+            if not name.endswith('.parquet') or int(name[5:10]) >= self.parts:
+                os.remove(os.path.join(self.parts_dir, name))
+
+    def _part_path(self, index):
+        return os.path.join(self.parts_dir, f'part-{index:05d}.parquet')
+
+    def write(self, df):
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        final = self._part_path(self.parts)
+        self.pq.write_table(table, final + '.tmp')
+        os.replace(final + '.tmp', final)
+        self.parts += 1
+
+    def state(self):
+        return {'parts': self.parts}
+
+    def close(self):
+        if self.parts:
+            part_paths = [self._part_path(i) for i in range(self.parts)]
+            schemas = [self.pq.read_schema(p) for p in part_paths]
+            try:
+                schema = self.pa.unify_schemas(schemas, promote_options='permissive')
+            except TypeError:
+                # pyarrow < 14 has no type promotion
+                schema = self.pa.unify_schemas(schemas)
+            schema = schema.remove_metadata()
+
+            with self.pq.ParquetWriter(self.path + '.tmp', schema) as writer:
+                for part_path in part_paths:
+                    writer.write_table(self.pq.read_table(part_path).cast(schema))
+            os.replace(self.path + '.tmp', self.path)
+        shutil.rmtree(self.parts_dir)
+
+
+WRITERS = {'csv': CsvChunkWriter, 'parquet': ParquetChunkWriter}
+
+
+def _input_identity(path):
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _load_checkpoint(checkpoint_path, input_path, output_path):
+    """Return the saved state if it belongs to this input/output pair."""
+    if file_format(output_path) == 'parquet':
+        partial_output = output_path + '.parts'
+    else:
+        partial_output = output_path
+    if not os.path.exists(checkpoint_path) or not os.path.exists(partial_output):
+        return None
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+    if state.get('input') != _input_identity(input_path):
+        print(f"⚠️  Input changed since checkpoint, starting over: {input_path}")
+        return None
+    return state
+
+
+def _save_checkpoint(checkpoint_path, state):
+    with open(checkpoint_path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(checkpoint_path + '.tmp', checkpoint_path)
+
+
+def score_stream(score_fn, input_path, output_path, chunksize=100_000,
+                 resume=True, progress=True, scorer=None):
+    """
+    Score a file chunk by chunk and write the results incrementally.
+
+    Args:
+        score_fn (callable): Takes a DataFrame chunk, returns it with
+            prediction columns added
+        input_path (str): .csv or .parquet input
+        output_path (str): .csv or .parquet output
+        chunksize (int): Rows per chunk
+        resume (bool): Continue from `<output>.checkpoint.json` if present
+        progress (bool): Print progress and throughput after each chunk
+        scorer (callable): Optional replacement for `map(score_fn, chunks)`;
+            takes the chunk iterator and yields scored chunks in order (used
+            to pipeline chunks through a process pool)
+
+    Returns:
+        dict: rows (total scored), resumed_from, seconds and rows_per_sec
+    """
+    writer_class = WRITERS[file_format(output_path)]
+    file_format(input_path)  # fail fast on unsupported input types
+
+    checkpoint_path = output_path + '.checkpoint.json'
+    state = _load_checkpoint(checkpoint_path, input_path, output_path) if resume else None
+    start_row = state['rows_done'] if state else 0
+    if start_row and progress:
+        print(f"Resuming from row {start_row:,}")
+
+    writer = writer_class(output_path, state)
+    identity = _input_identity(input_path)
+    rows_done = start_row
+    started = time.perf_counter()
+
+    try:
+        chunks = iter_chunks(input_path, chunksize, start_row)
+        scored_chunks = scorer(chunks) if scorer else map(score_fn, chunks)
+        for scored in scored_chunks:
+            writer.write(scored)
+            rows_done += len(scored)
+            _save_checkpoint(checkpoint_path, dict(
+                input=identity, rows_done=rows_done, **writer.state()
+            ))
+
+            if progress:
+                elapsed = time.perf_counter() - started
+                rate = (rows_done - start_row) / elapsed if elapsed else 0.0
+                print(f"Scored {rows_done:,} rows ({rate:,.0f} rows/sec)")
+    except BaseException:
+        # Leave the checkpoint and partial output in place for resume
+        if isinstance(writer, CsvChunkWriter):
+            writer.close()
+        raise
+
+    writer.close()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - started
+    scored = rows_done - start_row
+    return {
+        'rows': rows_done,
+        'resumed_from': start_row,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(scored / elapsed, 1) if elapsed else 0.0
+    }
@@ -11,6 +11,70 @@ import json
 # API base URL
 BASE_URL = "http://localhost:5000"
 
+# Request payloads, shared with load_test.py
+
+# High activity trader
+GOOD_TRADER = {
+    "tx_count_365d": 500,
+    "total_volume": 100.0,
+    "active_weeks": 45,
+    "avg_tx_value": 0.2,
+    "tx_per_active_week": 11.1
+}
+
+# Low activity trader
+BAD_TRADER = {
+    "tx_count_365d": 5,
+    "total_volume": 0.1,
+    "active_weeks": 2,
+    "avg_tx_value": 0.02,
+    "tx_per_active_week": 2.5
+}
+
+BATCH = {
+    "traders": [
+        GOOD_TRADER,
+        {
+            "tx_count_365d": 10,
+            "total_volume": 0.5,
+            "active_weeks": 2,
+            "avg_tx_value": 0.05,
+            "tx_per_active_week": 5.0
+        },
+        {
+            "tx_count_365d": 250,
+            "total_volume": 50.0,
+            "active_weeks": 30,
+            "avg_tx_value": 0.2,
+            "tx_per_active_week": 8.3
+        }
+    ]
+}
+
+# Missing: active_weeks, avg_tx_value, tx_per_active_week
+INCOMPLETE_TRADER = {
+    "tx_count_365d": 100,
+    "total_volume": 10.0
+}
+
+PARTIAL_BATCH = {
+    "traders": [
+        GOOD_TRADER,
+        {
+            "tx_count_365d": 10,
+            "total_volume": 0.5
+        }
+    ]
+}
+
+NEGATIVE_TRADER = {
+    "tx_count_365d": -10,  # Invalid: negative
+    "total_volume": 10.0,
+    "active_weeks": 5,
+    "avg_tx_value": 2.0,
+    "tx_per_active_week": 2.0
+}
+
 def print_section(title):
     """Print a formatted section header."""
     print("\n" + "="*80)
@@ -55,14 +119,7 @@ def test_predict_good_trader():
     """Test prediction for a likely good trader."""
     print_section("TEST 4: Predict - Good Trader Example")
     
-    # High activity trader
-    data = {
-        "tx_count_365d": 500,
-        "total_volume": 100.0,
-        "active_weeks": 45,
-        "avg_tx_value": 0.2,
-        "tx_per_active_week": 11.1
-    }
+    data = GOOD_TRADER
     
     print(f"Input data:\n{json.dumps(data, indent=2)}")
     
@@ -85,14 +142,7 @@ def test_predict_bad_trader():
     """Test prediction for a likely bad trader."""
     print_section("TEST 5: Predict - Bad Trader Example")
     
-    # Low activity trader
-    data = {
-        "tx_count_365d": 5,
-        "total_volume": 0.1,
-        "active_weeks": 2,
-        "avg_tx_value": 0.02,
-        "tx_per_active_week": 2.5
-    }
+    data = BAD_TRADER
     
     print(f"Input data:\n{json.dumps(data, indent=2)}")
     
@@ -115,31 +165,7 @@ def test_predict_batch():
     """Test batch prediction."""
     print_section("TEST 6: Batch Prediction")
     
-    data = {
-        "traders": [
-            {
-                "tx_count_365d": 500,
-                "total_volume": 100.0,
-                "active_weeks": 45,
-                "avg_tx_value": 0.2,
-                "tx_per_active_week": 11.1
-            },
-            {
-                "tx_count_365d": 10,
-                "total_volume": 0.5,
-                "active_weeks": 2,
-                "avg_tx_value": 0.05,
-                "tx_per_active_week": 5.0
-            },
-            {
-                "tx_count_365d": 250,
-                "total_volume": 50.0,
-                "active_weeks": 30,
-                "avg_tx_value": 0.2,
-                "tx_per_active_week": 8.3
-            }
-        ]
-    }
+    data = BATCH
     
     print(f"Input: {len(data['traders'])} traders")
     
@@ -162,16 +188,36 @@ def test_predict_batch():
     assert response.status_code == 200, "Batch prediction failed"
     print("✅ Batch prediction test passed!")
 
+def test_predict_batch_partial_errors():
+    """Test that one bad trader does not abort the rest of the batch."""
+    print_section("TEST 7: Batch Prediction - Partial Errors")
+    
+    data = PARTIAL_BATCH
+    
+    print(f"Input: {len(data['traders'])} traders (one intentionally incomplete)")
+    
+    response = requests.post(
+        f"{BASE_URL}/predict_batch",
+        json=data,
+        headers={"Content-Type": "application/json"}
+    )
+    
+    print(f"\nStatus Code: {response.status_code}")
+    result = response.json()
+    print(f"\nSummary:\n{json.dumps(result['summary'], indent=2)}")
+    print(f"\nErrors:\n{json.dumps(result['errors'], indent=2)}")
+    
+    assert response.status_code == 200, "Batch with one bad row should still succeed"
+    assert result['summary']['scored'] == 1, "Valid trader should be scored"
+    assert result['errors'][0]['index'] == 1, "Bad trader should be reported by index"
+    print("✅ Batch partial errors test passed!")
+
 def test_invalid_input():
     """Test error handling with invalid input."""
-    print_section("TEST 7: Error Handling - Invalid Input")
+    print_section("TEST 8: Error Handling - Invalid Input")
     
     # Missing required feature
-    data = {
-        "tx_count_365d": 100,
-        "total_volume": 10.0
-        # Missing: active_weeks, avg_tx_value, tx_per_active_week
-    }
+    data = INCOMPLETE_TRADER
     
     print(f"Input data (intentionally incomplete):\n{json.dumps(data, indent=2)}")
     
@@ -189,15 +235,9 @@ def test_invalid_input():
 
 def test_negative_values():
     """Test error handling with negative values."""
-    print_section("TEST 8: Error Handling - Negative Values")
+    print_section("TEST 9: Error Handling - Negative Values")
     
-    data = {
-        "tx_count_365d": -10,  # Invalid: negative
-        "total_volume": 10.0,
-        "active_weeks": 5,
-        "avg_tx_value": 2.0,
-        "tx_per_active_week": 2.0
-    }
+    data = NEGATIVE_TRADER
     
     print(f"Input data (with negative value):\n{json.dumps(data, indent=2)}")
     
@@ -213,6 +253,27 @@ def test_negative_values():
     assert response.status_code == 400, "Should return 400 for negative values"
     print("✅ Negative values test passed!")
 
+def test_non_finite_values():
+    """Test that NaN, Infinity and float32 overflows fail only their own row."""
+    print_section("TEST 10: Error Handling - Non-Finite Values")
+    
+    traders = [GOOD_TRADER, dict(BAD_TRADER, total_volume=float('nan')),
+               dict(BAD_TRADER, avg_tx_value=1e300)]
+    
+    # json.dumps writes NaN as the bare token the API has to reject
+    response = requests.post(
+        f"{BASE_URL}/predict_batch",
+        data=json.dumps({"traders": traders}),
+        headers={"Content-Type": "application/json"}
+    )
+    
+    print(f"\nStatus Code: {response.status_code}")
+    print(f"Response:\n{json.dumps(response.json(), indent=2)}")
+    
+    assert response.status_code == 200, "Valid rows should still be scored"
+    assert [e['index'] for e in response.json()['errors']] == [1, 2]
+    print("✅ Non-finite values test passed!")
+
 def run_all_tests():
     """Run all tests."""
     print("="*80)
@@ -226,8 +287,10 @@ def run_all_tests():
         test_predict_good_trader()
         test_predict_bad_trader()
         test_predict_batch()
+        test_predict_batch_partial_errors()
         test_invalid_input()
         test_negative_values()
+        test_non_finite_values()
         
         print("\n" + "="*80)
         print("🎉 ALL TESTS PASSED!")
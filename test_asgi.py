@@ -0,0 +1,81 @@
+"""
+Test script for the ASGI API
+Author: Jo$h
+
+Drives the ASGI app directly (no server) and checks it returns the same
+JSON as the Flask app for every endpoint.
+"""
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import app as flask_api
+import asgi_app
+from conftest import call
+
+TRADER = {
+    "tx_count_365d": 500,
+    "total_volume": 100.0,
+    "active_weeks": 45,
+    "avg_tx_value": 0.2,
+    "tx_per_active_week": 11.1
+}
+
+def flask_call(method, path, payload=None):
+    client = flask_api.app.test_client()
+    response = client.open(path, method=method, json=payload)
+    return response.status_code, response.get_json()
+
+def test_same_contract_as_flask():
+    """Every endpoint returns the same status and body as the Flask app."""
+    cases = [
+        ('GET', '/', None),
+        ('GET', '/features', None),
+        ('POST', '/predict', TRADER),
+        ('POST', '/predict', {"tx_count_365d": 1}),
+        ('POST', '/predict_batch', {"traders": [TRADER, {"tx_count_365d": -1}]}),
+        ('POST', '/predict_batch', {"traders": []}),
+    ]
+    for method, path, payload in cases:
+        assert call(method, path, payload) == flask_call(method, path, payload), path
+
+def test_big_integer_inputs():
+    """Integers beyond 64 bits are valid inputs and are echoed back as JSON, not a 500."""
+    trader = dict(TRADER, tx_count_365d=2 ** 70)
+    for path, payload in (('/predict', trader), ('/predict_batch', {"traders": [trader, TRADER]})):
+        status, body = call('POST', path, payload)
+        assert status == 200, body
+        assert (status, body) == flask_call('POST', path, payload), path
+    assert call('POST', '/predict', trader)[1]['input_features']['tx_count_365d'] == 2 ** 70
+
+def test_health_reports_executor():
+    """/health includes the inference executor's queue state."""
+    status, body = call('GET', '/health')
+    assert status == 200
+    assert body['status'] == 'healthy'
+    assert body['inference_executor']['pending'] == 0
+
+def test_unknown_route_and_method():
+    """Unknown paths are 404 and wrong methods 405."""
+    assert call('GET', '/nope')[0] == 404
+    assert call('GET', '/predict')[0] == 405
+
+def test_busy_executor_returns_503():
+    """A saturated executor rejects new work with 503."""
+    executor = asgi_app.executor
+    saved = executor.max_pending
+    executor.max_pending = 0
+    try:
+        status, body = call('POST', '/predict', TRADER)
+    finally:
+        executor.max_pending = saved
+    assert status == 503
+    assert 'busy' in body['error']
+
+if __name__ == "__main__":
+    test_same_contract_as_flask()
+    test_big_integer_inputs()
+    test_health_reports_executor()
+    test_unknown_route_and_method()
+    test_busy_executor_returns_503()
+    print("✅ All ASGI API tests passed!")
@@ -0,0 +1,201 @@
+"""
+Test script for the columnar and binary /predict_batch formats
+Author: Jo$h
+
+Sends the same traders as JSON rows, columnar JSON, Arrow and raw float64
+through the Flask test client and checks every format agrees, along with
+the ?fields= and ?compact= response options.
+"""
+
+import json
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+import pyarrow as pa
+import pyarrow.ipc
+
+import app as api
+import fast_json
+from batch_formats import ARROW, RAW, RAW_COLUMNS
+
+TRADERS = [
+    {"tx_count_365d": 500, "total_volume": 100.0, "active_weeks": 45,
+     "avg_tx_value": 0.2, "tx_per_active_week": 11.1},
+    {"tx_count_365d": 10, "total_volume": 0.5, "active_weeks": 2,
+     "avg_tx_value": 0.05, "tx_per_active_week": 5.0},
+    {"tx_count_365d": 150, "total_volume": 25.5, "active_weeks": 20,
+     "avg_tx_value": 0.17, "tx_per_active_week": 7.5},
+]
+
+def client():
+    return api.app.test_client()
+
+def matrix():
+    return np.array([[t[feat] for feat in api.feature_names] for t in TRADERS],
+                    dtype=np.float64)
+
+def columns():
+    return {feat: [t[feat] for t in TRADERS] for feat in api.feature_names}
+
+def arrow_body(data):
+    table = pa.table(data)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def expected_probabilities():
+    response = client().post('/predict_batch', json={"traders": TRADERS})
+    assert response.status_code == 200
+    return [p['probability_good_trader'] for p in response.get_json()['predictions']]
+
+def test_columnar_json_matches_rows():
+    """Columnar JSON returns parallel arrays with the same probabilities."""
+    response = client().post('/predict_batch', json=columns())
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['predictions']['probability_good_trader'] == expected_probabilities()
+    assert body['predictions']['input_features'] == columns()
+    assert body['summary']['scored'] == len(TRADERS)
+
+def test_raw_float64_roundtrip():
+    """Raw float64 in, raw float64 out, one row per input row."""
+    response = client().post('/predict_batch', data=matrix().astype('<f8').tobytes(),
+                             content_type=RAW)
+    assert response.status_code == 200
+    assert response.mimetype == RAW
+    out = np.frombuffer(response.data, dtype='<f8').reshape(-1, len(RAW_COLUMNS))
+    assert out[:, RAW_COLUMNS.index('probability_good_trader')].tolist() == expected_probabilities()
+
+def test_arrow_roundtrip():
+    """Arrow in, Arrow out, with summary metadata."""
+    response = client().post('/predict_batch', data=arrow_body(columns()),
+                             content_type=ARROW)
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert table.column('probability_good_trader').to_pylist() == expected_probabilities()
+    assert json.loads(table.schema.metadata[b'summary'])['scored'] == len(TRADERS)
+
+def test_response_format_negotiation():
+    """?format= and Accept pick the response format; inputs can be omitted."""
+    c = client()
+    response = c.post('/predict_batch?format=rows&include_inputs=false',
+                      data=matrix().tobytes(), content_type=RAW)
+    predictions = response.get_json()['predictions']
+    assert [p['probability_good_trader'] for p in predictions] == expected_probabilities()
+    assert 'input_features' not in predictions[0]
+
+    response = c.post('/predict_batch', json={"traders": TRADERS},
+                      headers={'Accept': ARROW})
+    assert response.mimetype == ARROW
+
+def test_invalid_rows_and_bodies():
+    """Bad rows are reported by index; undecodable bodies are a 400."""
+    X = matrix()
+    X[1, 0] = -1
+    X[2, 3] = np.nan
+    response = client().post('/predict_batch?format=columnar', data=X.tobytes(),
+                             content_type=RAW)
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [e['index'] for e in body['errors']] == [1, 2]
+    assert body['predictions']['prediction'][1:] == [None, None]
+
+    # json.loads accepts NaN/Infinity; such rows fail alone, as do float32 overflows
+    traders = [dict(t) for t in TRADERS]
+    traders[0]['total_volume'] = float('nan')
+    traders[2]['avg_tx_value'] = 1e300
+    response = client().post('/predict_batch', data=json.dumps({"traders": traders}),
+                             content_type='application/json')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [e['index'] for e in body['errors']] == [0, 2]
+    assert [p['index'] for p in body['predictions']] == [1]
+    response = client().post('/predict', data=json.dumps(dict(TRADERS[0], active_weeks=float('inf'))),
+                             content_type='application/json')
+    assert response.status_code == 400 and 'finite' in response.get_json()['error']
+
+    data = columns()
+    data['total_volume'][0] = "lots"
+    body = client().post('/predict_batch', json=data).get_json()
+    assert body['errors'][0]['index'] == 0
+
+    # float32 overflows fail their row in every format, not the whole batch
+    X = matrix()
+    X[0, 1] = 1e300
+    for data, content_type in ((X.tobytes(), RAW), (arrow_body(dict(zip(api.feature_names, X.T))),
+                                                    ARROW)):
+        body = client().post('/predict_batch?format=rows', data=data,
+                             content_type=content_type).get_json()
+        assert [e['index'] for e in body['errors']] == [0], body
+        assert body['summary']['scored'] == len(TRADERS) - 1
+    data = columns()
+    data['tx_count_365d'][1] = 10 ** 400
+    data['total_volume'][2] = 1e300
+    body = client().post('/predict_batch', data=json.dumps(data),
+                         content_type='application/json').get_json()
+    assert [e['index'] for e in body['errors']] == [1, 2]
+    # Same error as /predict gives for the same value
+    predict = client().post('/predict', data=json.dumps(dict(TRADERS[1], tx_count_365d=10 ** 400)),
+                            content_type='application/json').get_json()
+    assert body['errors'][0]['error'] == predict['error'] == 'Feature "tx_count_365d" is out of range'
+
+    # Nested lists are not a column
+    for bad in ([[1, 2], [3], [4]], [[1], [2], [3]]):
+        data = columns()
+        data['active_weeks'] = bad
+        assert client().post('/predict_batch', json=data).status_code == 400
+
+    assert client().post('/predict_batch', data=b'\x00' * 7, content_type=RAW).status_code == 400
+    assert client().post('/predict_batch', data=b'nope', content_type=ARROW).status_code == 400
+
+def test_fields_and_compact():
+    """?fields= trims each result; ?compact=true returns parallel arrays."""
+    c = client()
+    body = c.post('/predict?fields=probability_good_trader', json=TRADERS[0]).get_json()
+    assert set(body) == {'probability_good_trader'}
+
+    body = c.post('/predict?compact=true', json=TRADERS[0]).get_json()
+    assert set(body) == {'will_remain_active', 'probability_good_trader'}
+
+    body = c.post('/predict_batch?fields=prediction', json={"traders": TRADERS}).get_json()
+    assert [set(p) for p in body['predictions']] == [{'index', 'prediction'}] * len(TRADERS)
+
+    body = c.post('/predict_batch?compact=true', json={"traders": TRADERS}).get_json()
+    assert set(body['predictions']) == {'will_remain_active', 'probability_good_trader'}
+    assert body['predictions']['probability_good_trader'] == expected_probabilities()
+
+    assert c.post('/predict?fields=bogus', json=TRADERS[0]).status_code == 400
+
+def test_json_backends_agree_on_nan():
+    """orjson and the stdlib fallback both write NaN and infinity as null."""
+    X = matrix()
+    X[1, 2] = np.nan
+    X[2, 0] = np.inf
+    obj = {'input_features': {'active_weeks': [20.0, np.nan]}, 'x': (np.inf, 1.5)}
+    encoded = fast_json.dumps(obj)
+    saved, fast_json.orjson = fast_json.orjson, None
+    try:
+        assert fast_json.dumps(obj) == encoded
+        # Invalid rows are echoed back with their NaN inputs
+        response = client().post('/predict_batch?format=columnar', data=X.tobytes(),
+                                 content_type=RAW)
+    finally:
+        fast_json.orjson = saved
+    assert encoded == b'{"input_features":{"active_weeks":[20.0,null]},"x":[null,1.5]}'
+    # Beyond 64 bits orjson gives way to the stdlib encoder, NumPy values included
+    assert fast_json.dumps({'n': 2 ** 70, 'p': np.array([0.5, np.nan])}) == \
+        b'{"n":1180591620717411303424,"p":[0.5,null]}'
+    body = json.loads(response.data, parse_constant=lambda name: 1 / 0)
+    assert body['predictions']['input_features']['active_weeks'][1] is None
+
+if __name__ == "__main__":
+    test_columnar_json_matches_rows()
+    test_raw_float64_roundtrip()
+    test_arrow_roundtrip()
+    test_response_format_negotiation()
+    test_invalid_rows_and_bodies()
+    test_fields_and_compact()
+    test_json_backends_agree_on_nan()
+    print("✅ All batch format tests passed!")
@@ -0,0 +1,119 @@
+"""
+Test script for the /predict micro-batching queue
+Author: Jo$h
+
+Uses a stub scoring function so the batching logic is checked without
+loading the model.
+"""
+
+import queue
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from batching import MicroBatcher
+
+def echo_score(features):
+    """Label each row by its first value and return it as the probability."""
+    labels = (features[:, 0] > 0.5).astype(int)
+    probabilities = np.column_stack([1 - features[:, 0], features[:, 0]])
+    return labels, probabilities
+
+def test_results_fan_out_to_the_right_caller():
+    """Every submitter gets the result for its own row."""
+    batcher = MicroBatcher(echo_score, max_batch_size=16, max_wait_us=2000)
+
+    def call(i):
+        value = i / 1000
+        label, probability = batcher.submit([value, 0, 0, 0, 0]).result(timeout=5)
+        return value, label, probability
+
+    with ThreadPoolExecutor(32) as executor:
+        results = list(executor.map(call, range(500)))
+
+    for value, label, probability in results:
+        assert probability[1] == value
+        assert label == int(value > 0.5)
+    assert batcher.rows == 500
+    assert batcher.batches < 500, "Concurrent rows should share model calls"
+
+def test_batch_size_is_capped():
+    """No model call sees more than max_batch_size rows."""
+    sizes = []
+
+    def recording_score(features):
+        sizes.append(len(features))
+        return echo_score(features)
+
+    batcher = MicroBatcher(recording_score, max_batch_size=8, max_wait_us=5000)
+    futures = [batcher.submit([0.1, 0, 0, 0, 0]) for _ in range(50)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert max(sizes) <= 8
+    assert sum(sizes) == 50
+
+def test_errors_propagate_to_every_waiter():
+    """A failing model call fails all futures in that batch."""
+    def failing_score(features):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(failing_score, max_wait_us=100)
+    future = batcher.submit([0, 0, 0, 0, 0])
+    try:
+        future.result(timeout=5)
+    except RuntimeError:
+        return
+    raise AssertionError("Expected the scoring error to reach the caller")
+
+def test_bad_row_fails_alone():
+    """A row that breaks the model fails its own request, not its batch mates."""
+    calls = []
+
+    def strict_score(features):
+        calls.append(len(features))
+        if not np.isfinite(features).all():
+            raise ValueError("Input contains NaN")
+        return echo_score(features)
+
+    batcher = MicroBatcher(strict_score, max_batch_size=16, max_wait_us=200_000)
+    rows = [[0.9, 0, 0, 0, 0], [np.nan, 0, 0, 0, 0], [0.1, 0, 0, 0, 0]]
+    futures = [batcher.submit(row) for row in rows]
+
+    assert futures[0].result(timeout=5)[0] == 1
+    assert futures[2].result(timeout=5)[0] == 0
+    try:
+        futures[1].result(timeout=5)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    assert calls == [3, 1, 1, 1]
+    assert batcher.stats()['split_batches'] == 1
+
+def test_full_queue_rejects():
+    """submit() raises queue.Full once queue_depth rows are pending."""
+    release = threading.Event()
+
+    def blocking_score(features):
+        release.wait(5)
+        return echo_score(features)
+
+    batcher = MicroBatcher(blocking_score, max_batch_size=1, max_wait_us=0,
+                           queue_depth=2)
+    batcher.submit([0, 0, 0, 0, 0])
+    try:
+        for _ in range(10):
+            batcher.submit([0, 0, 0, 0, 0])
+    except queue.Full:
+        return
+    finally:
+        release.set()
+    raise AssertionError("Expected queue.Full when the queue is saturated")
+
+if __name__ == "__main__":
+    test_results_fan_out_to_the_right_caller()
+    test_batch_size_is_capped()
+    test_errors_propagate_to_every_waiter()
+    test_bad_row_fails_alone()
+    test_full_queue_rejects()
+    print("✅ All micro-batching tests passed!")
@@ -0,0 +1,60 @@
+"""
+Test script for the benchmark suite
+Author: Jo$h
+
+Checks that the synthetic dataset stays consistent when scaled up and
+that baseline comparison flags regressions in the right direction only.
+"""
+
+import warnings
+warnings.filterwarnings('ignore')
+
+from benchmarks.run import compare, direction, synthetic_dataset
+from features import FEATURE_COLUMNS
+
+
+def test_synthetic_dataset():
+    """Any size, same seed same rows, derived features recomputed."""
+    data = synthetic_dataset(25_000, seed=7, chunk_rows=10_000)
+    assert len(data) == 25_000
+    assert list(data.columns) == FEATURE_COLUMNS + ['target_variable']
+    assert data.equals(synthetic_dataset(25_000, seed=7, chunk_rows=10_000))
+
+    assert (data['tx_count_365d'] >= 1).all()
+    assert data['active_weeks'].between(1, 52).all()
+    assert (data['active_weeks'] <= data['tx_count_365d']).all()
+    assert ((data['avg_tx_value'] * data['tx_count_365d'] - data['total_volume']).abs()
+            < 1e-9 * data['total_volume'].abs().max()).all()
+    assert (data['tx_per_active_week'] * data['active_weeks']
+            - data['tx_count_365d']).abs().max() < 1e-9
+    assert set(data['target_variable']) == {'Good Trader', 'Bad Trader'}
+
+
+def test_compare():
+    """Throughput must not drop, timings must not rise; noise is tolerated."""
+    assert direction('api.predict.requests_per_s') == 1
+    assert direction('api.predict.p50_ms') == -1
+    assert direction('load.import_app.cold_s') == -1
+    assert direction('api.predict.p99_ms') == 0
+    assert direction('training.random_forest.rows_5000.roc_auc') == 0
+
+    baseline = {'a.rows_per_s': 1000, 'a.p50_ms': 10.0, 'a.p95_ms': 0.2,
+                'a.fit_s': 2.0, 'a.peak_rss_mib': 300, 'old.p50_ms': 1.0}
+    current = {'a.rows_per_s': 700, 'a.p50_ms': 5.0, 'a.p95_ms': 0.4,
+               'a.fit_s': 2.2, 'a.peak_rss_mib': 400, 'new.p50_ms': 1.0}
+    status = {row[0]: row[4] for row in compare(current, baseline, tolerance=0.2)}
+    assert status == {
+        'a.rows_per_s': 'regression',
+        'a.p50_ms': 'improved',
+        'a.p95_ms': 'ok',  # doubled, but by less than the noise floor
+        'a.fit_s': 'ok',
+        'a.peak_rss_mib': 'regression',
+        'old.p50_ms': 'missing',
+        'new.p50_ms': 'new',
+    }
+
+
+if __name__ == "__main__":
+    test_synthetic_dataset()
+    test_compare()
+    print("✅ All benchmark suite tests passed!")
@@ -0,0 +1,107 @@
+"""
+Test script for the prediction cache
+Author: Jo$h
+
+Covers LRU eviction, TTL expiry, key quantization and invalidation when the
+model file changes.
+"""
+
+import os
+import tempfile
+import time
+
+from cache import PredictionCache, get_shared_cache
+
+RESULT = (1, [0.1, 0.9])
+
+def test_lru_eviction_by_entries():
+    """The least recently used entry is evicted first."""
+    cache = PredictionCache(max_entries=2)
+    cache.put([1, 2, 3, 4, 5], RESULT)
+    cache.put([2, 2, 3, 4, 5], RESULT)
+    cache.get([1, 2, 3, 4, 5])             # touch the first entry
+    cache.put([3, 2, 3, 4, 5], RESULT)     # evicts the second
+
+    assert cache.get([1, 2, 3, 4, 5]) == RESULT
+    assert cache.get([2, 2, 3, 4, 5]) is None
+    assert cache.evictions == 1
+
+def test_byte_bound():
+    """A byte limit keeps the approximate footprint under the bound."""
+    cache = PredictionCache(max_entries=None, max_bytes=2000)
+    for i in range(100):
+        cache.put([i, 0, 0, 0, 0], RESULT)
+
+    assert cache.bytes <= 2000
+    assert cache.evictions > 0
+
+def test_ttl_expiry():
+    """Entries older than the TTL are misses."""
+    cache = PredictionCache(ttl=0.05)
+    cache.put([1, 2, 3, 4, 5], RESULT)
+    assert cache.get([1, 2, 3, 4, 5]) == RESULT
+    time.sleep(0.1)
+    assert cache.get([1, 2, 3, 4, 5]) is None
+    assert cache.expirations == 1
+
+def test_quantized_keys():
+    """Nearby values share a key when quantization is on."""
+    cache = PredictionCache(quantize=4)
+    cache.put([150, 25.5, 20, 0.170001, 7.5], RESULT)
+
+    assert cache.get([150, 25.5, 20, 0.17, 7.5]) == RESULT
+    assert cache.get([150, 25.5, 20, 0.171, 7.5]) is None
+
+def test_invalidated_when_model_file_changes():
+    """Touching the watched model file clears the cache."""
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(b'model v1')
+        model_path = f.name
+    try:
+        cache = PredictionCache(model_path=model_path, check_interval=0)
+        cache.put([1, 2, 3, 4, 5], RESULT)
+        assert cache.get([1, 2, 3, 4, 5]) == RESULT
+
+        with open(model_path, 'wb') as f:
+            f.write(b'model v2, retrained')
+        assert cache.get([1, 2, 3, 4, 5]) is None
+        assert cache.invalidations == 1
+    finally:
+        os.remove(model_path)
+
+def test_stats():
+    """Counters are reported for /health."""
+    cache = PredictionCache()
+    cache.get([1, 2, 3, 4, 5])
+    cache.put([1, 2, 3, 4, 5], RESULT)
+    cache.get([1, 2, 3, 4, 5])
+    stats = cache.stats()
+
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['entries'] == 1
+
+def test_shared_cache_per_model():
+    """Each model file gets its own shared cache; the same file shares one."""
+    os.environ['PREDICTION_CACHE_SIZE'] = '10'
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ('a.pkl', 'b.pkl')]
+            for path in paths:
+                open(path, 'wb').close()
+            first, second = get_shared_cache(paths[0]), get_shared_cache(paths[1])
+            first.put([1, 2, 3, 4, 5], (1, [0.1, 0.9]))
+            assert second is not first and second.get([1, 2, 3, 4, 5]) is None
+            assert get_shared_cache(os.path.join(tmp, '.', 'a.pkl')) is first
+    finally:
+        del os.environ['PREDICTION_CACHE_SIZE']
+
+if __name__ == "__main__":
+    test_lru_eviction_by_entries()
+    test_byte_bound()
+    test_ttl_expiry()
+    test_quantized_keys()
+    test_invalidated_when_model_file_changes()
+    test_stats()
+    test_shared_cache_per_model()
+    print("✅ All prediction cache tests passed!")
@@ -0,0 +1,82 @@
+"""
+Test script for compressed forest variants
+Author: Jo$h
+
+Checks that lossless variants reproduce the model exactly, that reduced
+variants behave like their definition, and that the selection and export
+helpers work.
+"""
+
+import tempfile
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from compression import choose_variant, compress, float32_thresholds, pareto_front
+from inference import PackedForest
+
+from conftest import load_fixtures
+
+def test_lossless_variants_are_exact():
+    """float32 thresholds and a no-op depth limit change nothing."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+    expected = model.predict_proba(X)
+
+    f32 = compress(packed, float32=True)
+    assert f32.threshold.dtype == np.float32
+    assert np.array_equal(f32.predict_proba(X), expected)
+    assert np.array_equal(compress(packed, max_depth=packed.max_depth).predict_proba(X), expected)
+
+def test_tree_subset_and_depth_limit():
+    """Fewer trees average only those trees; a depth limit shrinks the forest."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+    subset = compress(packed, n_trees=10)
+    expected = sum(tree.predict_proba(X) for tree in model.estimators_[:10]) / 10
+    assert subset.n_estimators == 10
+    assert np.allclose(subset.predict_proba(X), expected)
+
+    shallow = compress(packed, max_depth=6, prune_tol=0.05)
+    assert shallow.max_depth <= 6
+    assert len(shallow.feature) < len(packed.feature)
+    proba = shallow.predict_proba(X)
+    assert np.allclose(proba.sum(axis=1), 1.0)
+
+def test_float32_thresholds_round_down():
+    """Rounded thresholds never exceed the originals."""
+    threshold = np.array([0.1, 1 / 3, 2.5, 1e-8])
+    rounded = float32_thresholds(threshold)
+    assert (rounded.astype(np.float64) <= threshold).all()
+
+def test_export_roundtrip():
+    """A saved variant loads back with its compression settings."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+    variant = compress(packed, n_trees=5, max_depth=8, float32=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        variant.save(tmp)
+        loaded = PackedForest.load(tmp)
+        assert loaded.compression['n_trees'] == 5
+        assert np.array_equal(loaded.predict_proba(X), variant.predict_proba(X))
+
+def test_pareto_and_choice():
+    """Dominated rows are off the front; the choice respects the AUC budget."""
+    report = pd.DataFrame({
+        'variant': ['sklearn (pickle)', 'a', 'b', 'c'],
+        'roc_auc': [0.965, 0.965, 0.964, 0.960],
+        'p50_ms': [4.0, 0.2, 0.1, 0.3],
+    })
+    report['auc_drop'] = 0.965 - report['roc_auc']
+    assert pareto_front(report).tolist() == [False, True, True, False]
+    assert choose_variant(report, 0.0015)['variant'] == 'b'
+    assert choose_variant(report, 0.0)['variant'] == 'a'
+
+if __name__ == "__main__":
+    test_lossless_variants_are_exact()
+    test_tree_subset_and_depth_limit()
+    test_float32_thresholds_round_down()
+    test_export_roundtrip()
+    test_pareto_and_choice()
+    print("✅ All compression tests passed!")
@@ -0,0 +1,153 @@
+"""
+Test script for the wallet feature store
+Author: Jo$h
+
+Feeds the synthetic transaction log from conftest.py into the store in
+increments, checks it against features.py after updates and after expiry,
+and scores stored wallets through /predict_wallet/<address>.
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+import app as api
+from feature_store import FeatureStore, normalize_wallet
+from features import FEATURE_COLUMNS, compute_features
+from conftest import AS_OF, DATASET_PATH, WINDOW_START, call, synthetic_log
+
+
+def clean_log(dataset, seed=0):
+    """The synthetic log without its out-of-window noise rows."""
+    log = synthetic_log(dataset, seed)
+    start = pd.Timestamp(WINDOW_START, unit='s', tz='UTC')
+    log = log[(log['timestamp'] >= start) & (log['timestamp'] < AS_OF)]
+    return log.sort_values('timestamp').reset_index(drop=True)
+
+
+def assert_same_features(actual, expected):
+    actual = actual.reindex(expected.index)
+    for column in ['tx_count_365d', 'active_weeks']:
+        np.testing.assert_array_equal(actual[column].to_numpy(), expected[column].to_numpy())
+    for column in ['total_volume', 'avg_tx_value', 'tx_per_active_week']:
+        np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy(),
+                                   rtol=1e-9)
+
+
+def test_incremental_updates_match_full_recompute():
+    """Three time-ordered increments give the same features as features.py."""
+    dataset = pd.read_csv(DATASET_PATH).head(1000)
+    log = clean_log(dataset)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(os.path.join(tmp, 'store.sqlite'))
+        for part in np.array_split(np.arange(len(log)), 3):
+            store.update(log.iloc[part], chunksize=20_000)
+
+        expected = compute_features(log, as_of=AS_OF)
+        assert_same_features(store.get_many(log['wallet']), expected)
+        assert store.stats()['wallets'] == len(dataset)
+
+        wallet = dataset['wallet'][0]
+        assert store.get(wallet) == store.get('ronin:' + wallet[2:].upper())
+        assert store.get('0x' + '0' * 40) is None
+        store.close()
+
+
+def test_expiry_drops_old_weeks():
+    """Moving the window forward matches an exact recompute at the new date."""
+    dataset = pd.read_csv(DATASET_PATH).head(1000)
+    log = clean_log(dataset, seed=3)
+    # A Monday, so the new window starts on a week boundary and is exact
+    later = AS_OF + pd.Timedelta(days=57)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(os.path.join(tmp, 'store.sqlite'))
+        store.update(log)
+        stats = store.expire(later)
+        assert stats['buckets_expired'] > 0
+
+        expected = compute_features(log, as_of=later)
+        actual = store.get_many(log['wallet'].unique())
+        assert set(actual.index) == set(expected.index)
+        assert stats['wallets_removed'] == len(dataset) - len(expected)
+        assert_same_features(actual, expected)
+
+        # Late transactions for expired weeks are ignored
+        before = store.stats()['buckets']
+        store.update(log.head(10).assign(value=1.0), as_of=later)
+        assert store.stats()['buckets'] == before
+        store.close()
+
+
+def test_lookups_do_not_expire():
+    """Lookups are read-only; the background timer expires the new weeks."""
+    dataset = pd.read_csv(DATASET_PATH).head(200)
+    log = clean_log(dataset, seed=5)
+    wallet = log['wallet'][0]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'store.sqlite')
+        store = FeatureStore(path)
+        store.update(log)
+        before = store.stats()
+        # The wall clock is past AS_OF, so weeks are due, but a lookup leaves them
+        features = store.get(wallet)
+        store.get_many([wallet])
+        assert store.stats() == before
+        store.close()
+
+        store = FeatureStore(path, expire_interval=60)
+        store.close()
+        store = FeatureStore(path)
+        assert store.stats()['buckets'] < before['buckets']
+        assert store.stats()['oldest_week'] > before['oldest_week']
+        assert store.expire_if_due() is None
+        assert store.get(wallet) != features
+        store.close()
+
+
+def test_predict_wallet_endpoint():
+    """/predict_wallet scores stored features like /predict does."""
+    dataset = pd.read_csv(DATASET_PATH).head(200)
+    original = api.feature_store
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            api.feature_store = None
+            assert api.predict_wallet_response(dataset['wallet'][0])[1] == 503
+
+            api.feature_store = FeatureStore(os.path.join(tmp, 'store.sqlite'))
+            api.feature_store.update(clean_log(dataset, seed=4))
+            client = api.app.test_client()
+
+            wallet = dataset['wallet'][5]
+            response = client.get(f'/predict_wallet/{wallet.upper().replace("0X", "0x")}')
+            assert response.status_code == 200
+            body = response.get_json()
+            assert body['wallet'] == normalize_wallet(wallet)
+
+            features = api.feature_store.get(wallet)
+            direct = client.post('/predict', json=features).get_json()
+            assert body['probability_good_trader'] == direct['probability_good_trader']
+            assert body['input_features'] == features
+            assert list(features) == FEATURE_COLUMNS
+
+            compact = client.get(f'/predict_wallet/{wallet}?compact=true').get_json()
+            assert set(compact) == {'will_remain_active', 'probability_good_trader', 'wallet'}
+            assert client.get('/predict_wallet/0x' + 'f' * 40).status_code == 404
+            assert client.get('/predict_wallet/not-a-wallet').status_code == 400
+
+            status, asgi_body = call('GET', f'/predict_wallet/{wallet}')
+            assert status == 200 and asgi_body == body
+        finally:
+            if api.feature_store is not None:
+                api.feature_store.close()
+            api.feature_store = original
+
+
+if __name__ == "__main__":
+    test_incremental_updates_match_full_recompute()
+    test_expiry_drops_old_weeks()
+    test_lookups_do_not_expire()
+    test_predict_wallet_endpoint()
+    print("✅ All feature store tests passed!")
@@ -0,0 +1,85 @@
+"""
+Test script for feature engineering
+Author: Jo$h
+
+Builds a synthetic transaction log whose wallets have exactly the features
+in data/ronin_traders_dataset.csv, then checks that features.py recovers
+them and that the predictor scores them like the precomputed columns.
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from features import FEATURE_COLUMNS, compute_features, week_index
+from predict import RoninTraderPredictor
+
+from conftest import AS_OF, DATASET_PATH, synthetic_log
+
+def assert_features_match(features, dataset):
+    features = features.reindex(dataset['wallet'])
+    for column in ['tx_count_365d', 'active_weeks']:
+        np.testing.assert_array_equal(features[column].to_numpy(), dataset[column].to_numpy())
+    for column in ['total_volume', 'avg_tx_value', 'tx_per_active_week']:
+        np.testing.assert_allclose(features[column].to_numpy(), dataset[column].to_numpy(),
+                                   rtol=1e-9)
+
+
+def test_week_index_starts_on_monday():
+    """Sunday and the following Monday fall in different weeks."""
+    sunday, monday = (int(pd.Timestamp(d, tz='UTC').timestamp())
+                      for d in ('2024-01-07 23:59:59', '2024-01-08'))
+    assert week_index(np.array([monday])) == week_index(np.array([sunday])) + 1
+    assert week_index(np.array([monday + 6 * 86_400])) == week_index(np.array([monday]))
+
+
+def test_parity_with_dataset_from_parquet_log():
+    """Features from a ~1M-transaction log match the precomputed dataset."""
+    dataset = pd.read_csv(DATASET_PATH)
+    log = synthetic_log(dataset)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transactions.parquet')
+        log.to_parquet(path, index=False)
+        features = compute_features(path, as_of=AS_OF, chunksize=50_000)
+
+    assert list(features.columns) == FEATURE_COLUMNS
+    assert len(features) == len(dataset)
+    assert_features_match(features, dataset)
+
+
+def test_csv_log_with_string_timestamps_and_custom_columns():
+    """CSV logs with ISO timestamps and Dune-style column names work too."""
+    dataset = pd.read_csv(DATASET_PATH).head(300)
+    log = synthetic_log(dataset, seed=1).rename(
+        columns={'wallet': 'from', 'timestamp': 'block_time', 'value': 'amount_usd'})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transactions.csv')
+        log.to_csv(path, index=False)
+        features = compute_features(path, as_of='2025-01-06', chunksize=7_000,
+                                    wallet_col='from', time_col='block_time',
+                                    value_col='amount_usd')
+    assert_features_match(features, dataset)
+
+
+def test_predict_transactions_matches_precomputed_features():
+    """Scoring the log gives the same predictions as scoring the dataset."""
+    dataset = pd.read_csv(DATASET_PATH).head(500)
+    predictor = RoninTraderPredictor()
+    scored = predictor.predict_transactions(synthetic_log(dataset, seed=2), as_of=AS_OF)
+    expected = predictor.predict_batch(dataset.set_index('wallet')[FEATURE_COLUMNS])
+
+    scored = scored.reindex(expected.index)
+    np.testing.assert_array_equal(scored['will_remain_active'], expected['will_remain_active'])
+    np.testing.assert_allclose(scored['probability_good_trader'],
+                               expected['probability_good_trader'], atol=1e-12)
+
+
+if __name__ == "__main__":
+    test_week_index_starts_on_monday()
+    test_parity_with_dataset_from_parquet_log()
+    test_csv_log_with_string_timestamps_and_custom_columns()
+    test_predict_transactions_matches_precomputed_features()
+    print("✅ All feature engineering tests passed!")
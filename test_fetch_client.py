@@ -0,0 +1,184 @@
+"""
+Test script for the concurrent fetch client
+Author: Jo$h
+
+Runs fetch_client against a local HTTP server that splits the dataset into
+one shard per query ID and injects latency, 429 responses and a corrupted
+body, then checks the merged output against the original CSV.
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from fetch_client import FetchClient, FetchError, dune_jobs, fetch_and_merge
+from conftest import DATASET_PATH
+
+N_SHARDS = 6
+
+
+class FlakyDune(BaseHTTPRequestHandler):
+    """Serves /api/v1/query/<n>/results/csv as shard n, misbehaving on request."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests += 1
+            attempt = server.attempts[self.path] = server.attempts.get(self.path, 0) + 1
+        try:
+            time.sleep(server.latency)
+            shard = int(self.path.split('/')[-3])
+            if attempt <= server.throttle:
+                self.send_response(429)
+                self.send_header('Retry-After', str(server.retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = server.shards[shard]
+            sent = body
+            if shard in server.corrupt and attempt == server.throttle + 1:
+                sent = body[:-2] + b'0\n'  # same length, wrong bytes
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            if server.gzip:
+                sent = gzip.compress(sent)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(sent)))
+            self.send_header('X-Checksum-SHA256', hashlib.sha256(body).hexdigest())
+            self.end_headers()
+            self.wfile.write(sent)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_POST(self):
+        # Always failing, to count how often a POST is sent
+        with self.server.lock:
+            self.server.requests += 1
+        self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_shards(latency=0.0, throttle=0, retry_after='0.05', corrupt=(), gzip=False):
+    """Start the mock on a free port; returns the server (call shutdown())."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyDune)
+    with open(DATASET_PATH, 'rb') as f:
+        header = f.readline()
+        rows = f.readlines()
+    size = -(-len(rows) // N_SHARDS)
+    server.shards = [header + b''.join(rows[i:i + size]) for i in range(0, len(rows), size)]
+    server.latency = latency
+    server.throttle = throttle
+    server.retry_after = retry_after
+    server.corrupt = set(corrupt)
+    server.gzip = gzip
+    server.lock = threading.Lock()
+    server.attempts = {}
+    server.requests = server.in_flight = server.max_in_flight = 0
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}/api/v1'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_concurrent_fetch_with_latency_and_429s():
+    """Throttled, slow and corrupted shards still merge into the exact dataset."""
+    server = serve_shards(latency=0.2, throttle=2, corrupt={1, 4})
+    try:
+        client = FetchClient(max_concurrency=N_SHARDS, per_host_limit=3, backoff_base=0.01)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'merged.parquet')
+            started = time.perf_counter()
+            result = fetch_and_merge(dune_jobs(range(N_SHARDS), server.base_url), output, client)
+            elapsed = time.perf_counter() - started
+
+            assert result['merged'] == 5000
+            pd.testing.assert_frame_equal(pd.read_parquet(output), pd.read_csv(DATASET_PATH))
+            assert os.listdir(tmp) == ['merged.parquet']  # shards cleaned up
+
+        # 2 throttled + 1 good attempt per shard, plus a retry for each corrupted one
+        assert server.requests == N_SHARDS * 3 + 2
+        assert result['stats']['rate_limited'] == N_SHARDS * 2
+        assert result['stats']['retries'] == N_SHARDS * 2 + 2
+        assert server.max_in_flight <= 3
+        # 20 requests at 0.2s each would take 4s one after another
+        assert elapsed < 3.0
+    finally:
+        server.shutdown()
+
+
+def test_csv_merge_and_verified_checksums():
+    """CSV output keeps one header; shard checksums match what was served."""
+    server = serve_shards()
+    try:
+        jobs = dune_jobs(range(N_SHARDS), server.base_url)
+        for job, body in zip(jobs, server.shards):
+            job['sha256'] = hashlib.sha256(body).hexdigest()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'merged.csv')
+            result = fetch_and_merge(jobs, output, FetchClient(backoff_base=0.01))
+            with open(output) as f, open(DATASET_PATH) as g:
+                assert f.read() == g.read()
+        assert [shard['sha256'] for shard in result['shards']] == [
+            job['sha256'] for job in jobs]
+        assert result['stats']['retries'] == 0
+    finally:
+        server.shutdown()
+
+
+def test_gives_up_after_max_retries():
+    """A host that never stops throttling raises FetchError."""
+    server = serve_shards(throttle=100, retry_after='0')
+    try:
+        client = FetchClient(max_retries=2, backoff_base=0.01)
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                client.fetch_all(dune_jobs([0], server.base_url), tmp)
+                assert False, "expected FetchError"
+            except FetchError:
+                pass
+        assert server.requests == 3
+    finally:
+        server.shutdown()
+
+
+def test_gzip_bodies_and_posts_are_not_retried():
+    """Gzip-encoded shards verify on the first try; a failed POST is not resent."""
+    server = serve_shards(gzip=True)
+    try:
+        client = FetchClient(max_retries=2, backoff_base=0.01)
+        with tempfile.TemporaryDirectory() as tmp:
+            shards = client.fetch_all(dune_jobs(range(N_SHARDS), server.base_url), tmp)
+        assert [shard['bytes'] for shard in shards] == [len(body) for body in server.shards]
+        assert client.stats()['retries'] == 0
+
+        server.requests = 0
+        try:
+            client.request('POST', f'{server.base_url}/query/1/execute', json={})
+            assert False, "expected FetchError"
+        except FetchError:
+            pass
+        assert server.requests == 1
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_fetch_with_latency_and_429s()
+    test_csv_merge_and_verified_checksums()
+    test_gives_up_after_max_retries()
+    test_gzip_bodies_and_posts_are_not_retried()
+    print("✅ All fetch client tests passed!")
@@ -0,0 +1,297 @@
+"""
+Test script for the packed Random Forest inference engine
+Author: Jo$h
+
+Checks that PackedForest reproduces the sklearn model's probabilities
+bit for bit on the full training dataset, that its saved format round-trips
+with a checked manifest, that explicit engines are honoured, and that the
+predictor starts from the native export without importing pandas or sklearn.
+"""
+
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from inference import (ModelFormatError, PackedForest, build_engine, export_native, load_engine,
+                       native_path)
+from predict import SKLEARN_BATCH_ROWS, RoninTraderPredictor
+from registry import ModelRegistry, load_files
+
+from conftest import FEATURES_PATH, MODEL_PATH, load_fixtures
+
+def test_packed_matches_sklearn_on_dataset():
+    """Probabilities and labels must be identical on every dataset row."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+
+    expected = model.predict_proba(X)
+    actual = packed.predict_proba(X)
+
+    assert actual.dtype == expected.dtype
+    assert np.array_equal(actual, expected), "Probabilities differ from sklearn"
+    assert np.array_equal(packed.predict(X), model.predict(X)), "Labels differ"
+
+def test_packed_matches_sklearn_across_chunks():
+    """Chunked evaluation must not change results."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model, chunk_size=37)
+
+    assert np.array_equal(packed.predict_proba(X), model.predict_proba(X))
+
+def test_packed_single_rows():
+    """Single-row calls (the API's hot path) match sklearn."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+
+    for row in X[:50]:
+        row = row.reshape(1, -1)
+        assert np.array_equal(packed.predict_proba(row), model.predict_proba(row))
+
+def test_save_and_mmap_load_roundtrip():
+    """A forest saved to disk and memory-mapped back scores identically."""
+    model, feature_names, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, 'forest')
+        manifest = packed.save(directory, feature_names=feature_names,
+                               metrics={'ROC-AUC': np.float64(0.9646)}, model_name='Random Forest')
+        assert os.listdir(tmp) == ['forest']
+        loaded = PackedForest.load(directory, mmap_mode='r')
+
+        assert isinstance(loaded.feature, np.memmap)
+        assert loaded.path == directory
+        assert loaded.manifest == manifest
+        assert loaded.feature_names == feature_names
+        assert manifest['classes'] == [0, 1]
+        assert manifest['class_labels'] == {'0': 'Bad Trader', '1': 'Good Trader'}
+        assert manifest['metrics'] == {'ROC-AUC': 0.9646}
+        assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+        # Re-exporting swaps the directory; forests mapped from the old one keep working
+        smaller = PackedForest.load(directory)
+        smaller.roots = smaller.roots[:10]
+        smaller.n_estimators = 10
+        smaller.save(directory, feature_names=feature_names)
+        assert os.listdir(tmp) == ['forest']
+        assert PackedForest.load(directory).n_estimators == 10
+        assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+        try:
+            packed.save(directory, feature_names=feature_names[:3])
+            assert False, "Expected ModelFormatError"
+        except ModelFormatError:
+            pass
+
+def test_load_rejects_damaged_exports():
+    """Checksums, format version and node indices are checked before serving."""
+    model, feature_names, _ = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+    with tempfile.TemporaryDirectory() as tmp:
+        packed.save(tmp, feature_names=feature_names)
+        path = os.path.join(tmp, 'threshold.npy')
+        data = bytearray(open(path, 'rb').read())
+        data[-1] ^= 0xFF
+        open(path, 'wb').write(bytes(data))
+        try:
+            PackedForest.load(tmp)
+            assert False, "Expected ModelFormatError"
+        except ModelFormatError as e:
+            assert 'checksum' in str(e)
+
+        packed.save(tmp, feature_names=feature_names)
+        np.save(os.path.join(tmp, 'roots.npy'), np.full(len(packed.roots), 10 ** 9))
+        try:
+            PackedForest.load(tmp, verify=False)
+            assert False, "Expected ModelFormatError"
+        except ModelFormatError as e:
+            assert 'indices' in str(e)
+
+        for version in (99, None):
+            packed.save(tmp, feature_names=feature_names)
+            manifest_path = os.path.join(tmp, 'forest.json')
+            manifest = json.load(open(manifest_path))
+            manifest['format_version'] = version
+            json.dump(manifest, open(manifest_path, 'w'))
+            try:
+                PackedForest.load(tmp)
+                assert False, "Expected ModelFormatError"
+            except ModelFormatError as e:
+                assert 'version' in str(e) or 're-export' in str(e)
+
+        # Truncated manifests fail the same way, not with a KeyError
+        for damage in (lambda m: m.pop('arrays'), lambda m: m['arrays'].pop('value'),
+                       lambda m: m['arrays']['roots'].pop('sha256'),
+                       lambda m: m['arrays']['feature'].update(file='../feature.npy')):
+            packed.save(tmp, feature_names=feature_names)
+            manifest_path = os.path.join(tmp, 'forest.json')
+            manifest = json.load(open(manifest_path))
+            damage(manifest)
+            json.dump(manifest, open(manifest_path, 'w'))
+            try:
+                PackedForest.load(tmp)
+                assert False, "Expected ModelFormatError"
+            except ModelFormatError:
+                pass
+
+def test_packed_rejects_bad_input():
+    """Wrong shapes and non-finite values raise ValueError like sklearn."""
+    model, _, X = load_fixtures()
+    packed = PackedForest.from_sklearn(model)
+
+    for bad in (X[:1, :3], np.full((1, X.shape[1]), np.nan)):
+        try:
+            packed.predict_proba(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for input {bad}")
+
+def test_predictor_engine_selection():
+    """An explicit engine is honoured even when a native export sits next to the pickle."""
+    trader = {
+        'tx_count_365d': 150,
+        'total_volume': 25.5,
+        'active_weeks': 20,
+        'avg_tx_value': 0.17,
+        'tx_per_active_week': 7.5
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        shutil.copy(MODEL_PATH, model_path)
+        export_native(model_path)
+
+        predictors = {engine: RoninTraderPredictor(model_path, FEATURES_PATH, engine=engine)
+                      for engine in ('sklearn', 'packed', 'auto')}
+        assert isinstance(predictors['sklearn'].model, RandomForestClassifier)
+        assert isinstance(predictors['packed'].model, PackedForest)
+        assert predictors['packed'].model.path is None
+        assert isinstance(predictors['auto'].model, PackedForest)
+        assert predictors['auto'].model.path == native_path(model_path)
+
+        assert isinstance(load_files(model_path, FEATURES_PATH, 'sklearn').model,
+                          RandomForestClassifier)
+        assert load_files(model_path, FEATURES_PATH, 'auto').model.path == native_path(model_path)
+        # PACKED_MODEL_DIR does not override an explicit sklearn engine either
+        packed_dir = native_path(model_path)
+        assert isinstance(load_files(model_path, FEATURES_PATH, 'sklearn', packed_dir).model,
+                          RandomForestClassifier)
+        for engine in ('auto', 'packed'):
+            assert load_files(model_path, FEATURES_PATH, engine, packed_dir).source == packed_dir
+
+        expected = predictors['sklearn'].predict_single(trader)
+        assert predictors['packed'].predict_single(trader) == expected
+        assert predictors['auto'].predict_single(trader) == expected
+
+def test_native_export():
+    """engine='auto' maps an explicit export while it matches the pickle, and never writes one."""
+    model, feature_names, X = load_fixtures()
+    expected = model.predict_proba(X)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        shutil.copy(MODEL_PATH, model_path)
+
+        # Loading has no side effects: packed in memory, nothing written
+        first = load_engine(model_path)
+        assert isinstance(first, PackedForest) and first.path is None
+        assert os.listdir(tmp) == ['model.pkl']
+
+        export_native(model_path, feature_names=feature_names)
+        assert sorted(os.listdir(tmp)) == ['model', 'model.pkl']
+        mapped = load_engine(model_path)
+        assert mapped.path == native_path(model_path)
+        assert isinstance(mapped.feature, np.memmap)
+        assert np.array_equal(mapped.predict_proba(X), expected)
+
+        # A new pickle makes the export stale until it is exported again
+        os.utime(model_path, ns=(0, 0))
+        assert load_engine(model_path).path is None
+        assert load_engine(model_path).path is None
+        export_native(model_path, feature_names=feature_names)
+        assert load_engine(model_path).path == native_path(model_path)
+
+        # The export directory itself can be served; it brings its feature names
+        directory = native_path(model_path)
+        loaded = load_files(directory, None, 'auto')
+        assert loaded.feature_names == feature_names and loaded.source == directory
+        assert loaded.info()['format'] == 'ronin-forest'
+        assert RoninTraderPredictor(directory, None).feature_names == feature_names
+        try:
+            load_engine(directory, 'sklearn')
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+        # Registry versions take exports without a feature names pickle
+        registry = ModelRegistry(os.path.join(tmp, 'registry'))
+        version = registry.publish(directory, None)
+        assert version['format'] == 'packed' and version['feature_names'] == feature_names
+        served = registry.load()
+        assert np.array_equal(served.model.predict_proba(X[:100]), expected[:100])
+
+        # Models that are not Random Forests are served as they are
+        tree = DecisionTreeClassifier(max_depth=3).fit(X[:500], model.predict(X[:500]))
+        tree_path = os.path.join(tmp, 'tree.pkl')
+        with open(tree_path, 'wb') as f:
+            pickle.dump(tree, f)
+        assert isinstance(load_engine(tree_path), DecisionTreeClassifier)
+        try:
+            export_native(tree_path)
+            assert False, "Expected ModelFormatError"
+        except ModelFormatError:
+            pass
+
+        # Large batches go to sklearn; results do not depend on the route
+        predictor = RoninTraderPredictor(model_path, FEATURES_PATH)
+        frame = pd.DataFrame(np.tile(X, (SKLEARN_BATCH_ROWS // len(X) + 1, 1)),
+                             columns=feature_names)
+        small = predictor.predict_batch(frame.iloc[:1000])
+        assert predictor._sklearn is None
+        large = predictor.predict_batch(frame)
+        assert predictor._sklearn is not None
+        assert large.iloc[:1000].equals(small)
+
+def test_lazy_imports():
+    """import predict and a first prediction need neither pandas nor sklearn."""
+    code = ("import sys, predict\n"
+            "p = predict.RoninTraderPredictor(sys.argv[1], sys.argv[2])\n"
+            "p.predict_single(dict(zip(p.feature_names, [150, 25.5, 20, 0.17, 7.5])))\n"
+            "print(sorted(m for m in ('pandas', 'sklearn') if m in sys.modules))")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        shutil.copy(MODEL_PATH, model_path)
+        export_native(model_path)
+        output = subprocess.run([sys.executable, '-c', code, model_path, FEATURES_PATH],
+                                capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == '[]'
+
+def test_unknown_engine():
+    """build_engine rejects engines it does not know."""
+    try:
+        build_engine(object(), 'gpu')
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for unknown engine")
+
+if __name__ == "__main__":
+    test_packed_matches_sklearn_on_dataset()
+    test_packed_matches_sklearn_across_chunks()
+    test_packed_single_rows()
+    test_save_and_mmap_load_roundtrip()
+    test_load_rejects_damaged_exports()
+    test_packed_rejects_bad_input()
+    test_predictor_engine_selection()
+    test_native_export()
+    test_lazy_imports()
+    test_unknown_engine()
+    print("✅ All inference engine tests passed!")
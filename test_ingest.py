@@ -0,0 +1,149 @@
+"""
+Test script for dataset ingestion
+Author: Jo$h
+
+Runs ingest.fetch_dataset against a local HTTP stand-in for the Dune API
+that serves the bundled dataset with Dune's paging and execution headers.
+"""
+
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from ingest import fetch_dataset
+from train import load_dataset
+from conftest import DATASET_PATH
+
+
+class DuneStandIn(BaseHTTPRequestHandler):
+    """Serves /api/v1/query/<id>/results/csv like Dune, from a local CSV."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        url = urlparse(self.path)
+        if not url.path.endswith('/results/csv'):
+            self.send_error(404)
+            return
+
+        etag = f'"{server.execution_id}"' if server.send_etag else None
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        query = parse_qs(url.query)
+        offset = int(query.get('offset', [0])[0])
+        limit = int(query.get('limit', [len(server.rows)])[0])
+        page = server.rows[offset:offset + limit]
+        body = (server.header + ''.join(page)).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('x-dune-execution-id', server.execution_id)
+        if etag:
+            self.send_header('ETag', etag)
+        if offset + limit < len(server.rows):
+            self.send_header('x-dune-next-offset', str(offset + limit))
+        self.end_headers()
+        self.wfile.write(body)
+        server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_dataset(path=DATASET_PATH):
+    """Start the stand-in on a free port; returns the server (call shutdown())."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DuneStandIn)
+    with open(path) as f:
+        server.header = f.readline()
+        server.rows = f.readlines()
+    server.execution_id = '01HEXECUTION0001'
+    server.send_etag = True
+    server.requests = 0
+    server.bytes_sent = 0
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}/api/v1'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_full_download_and_manifest():
+    """One streamed request becomes Parquet identical to the CSV."""
+    server = serve_dataset()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = fetch_dataset(tmp, api_key='test', base_url=server.base_url,
+                                     chunk_bytes=4096)
+            assert not manifest['skipped']
+            assert manifest['rows'] == 5000 and manifest['pages'] == 1
+            assert manifest['columns'][0] == {'name': 'wallet', 'type': 'string'}
+
+            expected = pd.read_csv(DATASET_PATH)
+            actual = pd.read_parquet(os.path.join(tmp, manifest['parquet']))
+            pd.testing.assert_frame_equal(actual, expected)
+            assert manifest['parquet_bytes'] < os.path.getsize(DATASET_PATH)
+
+            X, y = load_dataset(os.path.join(tmp, manifest['parquet']))
+            assert len(X) == 5000 and set(y.unique()) == {0, 1}
+    finally:
+        server.shutdown()
+
+
+def test_unchanged_upstream_is_skipped():
+    """A matching ETag or execution ID skips the download."""
+    server = serve_dataset()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            fetch_dataset(tmp, base_url=server.base_url)
+            sent = server.bytes_sent
+
+            assert fetch_dataset(tmp, base_url=server.base_url)['skipped']
+            assert server.bytes_sent == sent  # 304, no body
+
+            server.send_etag = False
+            assert fetch_dataset(tmp, base_url=server.base_url)['skipped']
+
+            server.execution_id = '01HEXECUTION0002'
+            manifest = fetch_dataset(tmp, base_url=server.base_url)
+            assert not manifest['skipped']
+            assert manifest['execution_id'] == '01HEXECUTION0002'
+
+            assert not fetch_dataset(tmp, base_url=server.base_url, force=True)['skipped']
+    finally:
+        server.shutdown()
+
+
+def test_paged_download():
+    """limit/offset pages are stitched into one Parquet file and CSV."""
+    server = serve_dataset()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = fetch_dataset(tmp, base_url=server.base_url, page_size=700,
+                                     keep_csv=True)
+            assert manifest['pages'] == 8 and server.requests == 8
+            assert manifest['rows'] == 5000
+
+            expected = pd.read_csv(DATASET_PATH)
+            pd.testing.assert_frame_equal(
+                pd.read_parquet(os.path.join(tmp, manifest['parquet'])), expected)
+            with open(os.path.join(tmp, manifest['csv'])) as f, open(DATASET_PATH) as g:
+                assert f.read() == g.read()
+            # Nothing left behind but the outputs
+            assert sorted(os.listdir(tmp)) == sorted([manifest['parquet'], manifest['csv'],
+                                                      'ronin_traders_dataset.manifest.json'])
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_full_download_and_manifest()
+    test_unchanged_upstream_is_skipped()
+    test_paged_download()
+    print("✅ All ingestion tests passed!")
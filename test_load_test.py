@@ -0,0 +1,90 @@
+"""
+Test script for the load-testing harness
+Author: Jo$h
+
+Runs short closed- and open-loop tests against the Flask app served from
+a background thread, and checks the SLO sweep against a simulated server.
+"""
+
+import threading
+import warnings
+warnings.filterwarnings('ignore')
+
+from werkzeug.serving import make_server
+
+import app as api
+from load_test import build_requests, find_max_rps, parse_mix, run_load
+
+
+def serve():
+    server = make_server('127.0.0.1', 0, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def test_mix():
+    """Weights are normalized; batch size scales the test_api batch."""
+    assert parse_mix('predict=3,health=1') == {'predict': 0.75, 'health': 0.25}
+    assert parse_mix('predict') == {'predict': 1.0}
+    for bad in ('predict=1,nope=1', 'predict=0'):
+        try:
+            parse_mix(bad)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+    plan = build_requests(parse_mix('predict_batch'), batch_size=10)
+    name, weight, requests, expected = plan[0]
+    assert (name, weight, expected) == ('predict_batch', 1.0, 200)
+    assert requests[0][1] == '/predict_batch' and requests[0][2].count(b'tx_count_365d') == 10
+
+
+def test_closed_and_open_loop():
+    """Both load models record every request; expected 400s are not errors."""
+    server, url = serve()
+    try:
+        plan = build_requests(parse_mix('predict=0.6,predict_batch=0.2,invalid=0.1,health=0.1'))
+        closed = run_load(url, plan, 'closed', concurrency=3, duration=1.5, warmup=0.5,
+                          interval=0.5)
+        summary = closed['summary']
+        assert summary['requests'] > 20 and summary['errors'] == 0
+        assert set(summary['scenarios']) == {'predict', 'predict_batch', 'invalid', 'health'}
+        assert 0 < summary['p50_ms'] <= summary['p95_ms'] <= summary['p99_ms'] <= summary['p999_ms']
+        assert len(closed['timeline']) == 3
+        assert sum(bucket['requests'] for bucket in closed['timeline']) >= summary['requests']
+
+        opened = run_load(url, build_requests({'predict': 1.0}), 'open', rate=40,
+                          duration=1.5, warmup=0.5, arrivals='uniform')
+        assert opened['summary']['error_rate'] == 0
+        assert 30 <= opened['summary']['requests'] <= 50
+
+        refused = run_load('http://127.0.0.1:9', plan, 'open', rate=20, duration=0.5,
+                           warmup=0, timeout=1)
+        assert refused['summary']['outcomes'] == {'connection_error': refused['summary']['requests']}
+    finally:
+        server.shutdown()
+
+
+def test_sweep():
+    """The sweep brackets the knee of a simulated server, then bisects."""
+    def measure(rate):
+        return {'p99_ms': 10.0 if rate <= 120 else 500.0, 'error_rate': 0.0}
+
+    result = find_max_rps(measure, start_rate=20, slo_ms=100)
+    assert 120 * 0.95 <= result['max_rps'] <= 120
+    assert [step['passed'] for step in result['steps'][:5]] == [True] * 5
+    assert not all(step['passed'] for step in result['steps'])
+
+    # Too fast already at the first rate: the sweep steps down
+    result = find_max_rps(measure, start_rate=1000, slo_ms=100)
+    assert result['max_rps'] <= 120 and not result['steps'][0]['passed']
+
+    errors = find_max_rps(lambda rate: {'p99_ms': 1.0, 'error_rate': 0.5}, 10, slo_ms=100)
+    assert errors['max_rps'] is None and 'error rate' in errors['steps'][0]['reason']
+
+
+if __name__ == "__main__":
+    test_mix()
+    test_closed_and_open_loop()
+    test_sweep()
+    print("✅ All load test harness tests passed!")
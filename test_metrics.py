@@ -0,0 +1,145 @@
+"""
+Test script for the /metrics endpoint
+Author: Jo$h
+
+Checks the Prometheus text output and that requests through both the
+Flask and the ASGI app show up in the request, stage, batch size and
+prediction metrics.
+"""
+
+import asyncio
+import re
+import warnings
+warnings.filterwarnings('ignore')
+
+import app as api
+import asgi_app
+from metrics import Metrics
+from conftest import TRADER, call
+
+SAMPLE = re.compile(r'^([a-z_]+)(?:\{(.*)\})? (\S+)$')
+
+
+def parse(text):
+    """Prometheus text -> {(name, frozenset of label pairs): value}."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name, labels, value = SAMPLE.match(line).groups()
+        pairs = frozenset(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels or ''))
+        samples[(name, pairs)] = float(value)
+    return samples
+
+
+def value(samples, name, **labels):
+    """Sum of the samples named `name` whose labels include `labels`."""
+    wanted = set(labels.items())
+    return sum(v for (sample, pairs), v in samples.items()
+               if sample == name and wanted <= set(pairs))
+
+
+def asgi_text(path):
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'headers': []}
+    asyncio.run(asgi_app.app(scope, receive, send))
+    return sent[0], sent[1]['body'].decode()
+
+
+def test_exposition_format():
+    """Histograms are cumulative with _sum/_count; labels are escaped."""
+    metrics = Metrics()
+    for seconds in (0.0002, 0.003, 0.003, 20.0):
+        metrics.stages.observe(seconds, ('/predict', 'inference'))
+    metrics.requests.inc(('/x"y', 'GET', '200'), 3)
+    samples = parse(metrics.render())
+
+    def bucket(le):
+        return value(samples, 'ronin_stage_duration_seconds_bucket', stage='inference', le=le)
+
+    assert bucket('0.0001') == 0 and bucket('0.00025') == 1
+    assert bucket('0.005') == 3 and bucket('10') == 3 and bucket('+Inf') == 4
+    assert value(samples, 'ronin_stage_duration_seconds_count', stage='inference') == 4
+    assert abs(value(samples, 'ronin_stage_duration_seconds_sum', stage='inference') - 20.0062) < 1e-9
+    assert value(samples, 'ronin_requests_total', endpoint='/x\\"y') == 3
+
+    disabled = Metrics(enabled=False)
+    disabled.finish_request('/predict', 'POST', 200, disabled.start_request())
+    disabled.stage('/predict', 'parse', 0.0)
+    disabled.predicted(1)
+    assert value(parse(disabled.render()), 'ronin_requests_total') == 0
+
+
+def test_flask_request_metrics():
+    """Counts, errors, stages, batch sizes and the good/bad ratio."""
+    client = api.app.test_client()
+    before = parse(client.get('/metrics').get_data(as_text=True))
+
+    singles = [client.post('/predict', json=TRADER) for _ in range(3)]
+    assert all(single.status_code == 200 for single in singles)
+    assert client.post('/predict', json={'tx_count_365d': 1}).status_code == 400
+    traders = [TRADER, dict(TRADER, tx_count_365d=3, active_weeks=1, total_volume=0.01)]
+    batch = client.post('/predict_batch', json={'traders': traders}).get_json()
+
+    response = client.get('/metrics')
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    after = parse(response.get_data(as_text=True))
+
+    def delta(name, **labels):
+        return value(after, name, **labels) - value(before, name, **labels)
+
+    assert delta('ronin_requests_total', endpoint='/predict', status='200') == 3
+    assert delta('ronin_request_errors_total', endpoint='/predict', kind='client') == 1
+    assert delta('ronin_request_duration_seconds_count', endpoint='/predict_batch') == 1
+    for stage in ('parse', 'validate', 'array', 'inference', 'format', 'serialize'):
+        assert delta('ronin_stage_duration_seconds_count', endpoint='/predict', stage=stage) >= 3
+        assert delta('ronin_stage_duration_seconds_count', endpoint='/predict_batch',
+                     stage=stage) == 1
+    assert delta('ronin_request_rows_count', endpoint='/predict_batch') == 1
+    assert delta('ronin_request_rows_bucket', endpoint='/predict_batch', le='2') == 1
+    assert delta('ronin_inference_batch_rows_bucket', le='2') >= 1
+
+    good = batch['summary']['good_traders'] + sum(
+        single.get_json()['will_remain_active'] for single in singles)
+    assert delta('ronin_predictions_total', prediction='good') == good
+    assert delta('ronin_predictions_total', prediction='bad') == 5 - good
+    assert 0 <= value(after, 'ronin_good_trader_ratio') <= 1
+    # The scrape itself is the only request in flight
+    assert value(after, 'ronin_requests_in_flight') == 1
+
+
+def test_asgi_request_metrics():
+    """The ASGI app records the same series, with route rules as endpoints."""
+    before = parse(api.metrics.render())
+    assert call('POST', '/predict', TRADER)[0] == 200
+    assert call('GET', '/predict_wallet/0x' + 'a' * 40)[0] in (404, 503)
+    assert call('GET', '/nope')[0] == 404
+
+    start, text = asgi_text('/metrics')
+    assert start['status'] == 200
+    assert (b'content-type', b'text/plain; version=0.0.4; charset=utf-8') in start['headers']
+    after = parse(text)
+
+    def delta(name, **labels):
+        return value(after, name, **labels) - value(before, name, **labels)
+
+    assert delta('ronin_requests_total', endpoint='/predict', status='200') == 1
+    assert delta('ronin_requests_total', endpoint='/predict_wallet/<address>') == 1
+    assert delta('ronin_requests_total', endpoint='unmatched', status='404') == 1
+    assert delta('ronin_stage_duration_seconds_count', endpoint='/predict', stage='parse') == 1
+    assert delta('ronin_stage_duration_seconds_count', endpoint='/predict', stage='serialize') == 1
+    assert value(after, 'ronin_requests_in_flight') == 1
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_flask_request_metrics()
+    test_asgi_request_metrics()
+    print("✅ All metrics tests passed!")
@@ -0,0 +1,54 @@
+"""
+Test script for multi-process batch scoring
+Author: Jo$h
+
+Parallel scoring must return exactly what single-process scoring returns,
+in the same row order.
+"""
+
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from parallel import iter_scored_chunks, predict_proba_parallel
+from predict import RoninTraderPredictor
+from conftest import DATASET_PATH
+
+def test_predict_batch_parallel_matches_predict_batch():
+    """Sharded results are reassembled in order and equal the serial path."""
+    predictor = RoninTraderPredictor()
+    df = pd.read_csv(DATASET_PATH)
+
+    expected = predictor.predict_batch(df)
+    actual = predictor.predict_batch_parallel(df, n_workers=2, shard_size=700)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+def test_iter_scored_chunks_keeps_order():
+    """Chunks come back in submission order with their payloads."""
+    predictor = RoninTraderPredictor(engine='packed')
+    X = pd.read_csv(DATASET_PATH)[predictor.feature_names].to_numpy(dtype=np.float64)
+    chunks = ((i, X[i:i + 500]) for i in range(0, len(X), 500))
+
+    results = list(iter_scored_chunks(predictor.model, chunks, n_workers=2,
+                                      max_in_flight=3))
+
+    assert [start for start, _ in results] == list(range(0, len(X), 500))
+    combined = np.vstack([proba for _, proba in results])
+    assert np.array_equal(combined, predictor.model.predict_proba(X))
+
+def test_predict_proba_parallel_single_worker():
+    """One worker still goes through the pool and matches in-process scoring."""
+    predictor = RoninTraderPredictor(engine='packed')
+    X = pd.read_csv(DATASET_PATH)[predictor.feature_names].head(300).to_numpy()
+
+    proba = predict_proba_parallel(predictor.model, X, n_workers=1, shard_size=64)
+
+    assert np.array_equal(proba, predictor.model.predict_proba(X))
+
+if __name__ == "__main__":
+    test_predict_batch_parallel_matches_predict_batch()
+    test_iter_scored_chunks_keeps_order()
+    test_predict_proba_parallel_single_worker()
+    print("✅ All parallel scoring tests passed!")
@@ -0,0 +1,206 @@
+"""
+Test script for on-demand profiling
+Author: Jo$h
+
+Checks the sampling profiler on a busy thread, per-request profiles on
+the Flask and ASGI apps, the /admin/profile worker profile, and that
+nothing is profiled without PROFILING_ENABLED and the right token (or
+at all when no token is configured).
+"""
+
+import asyncio
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import app as api
+import asgi_app
+from profiling import Profiling, SamplingProfiler, profiling_from_env
+from conftest import TRADER
+
+TOKEN = {'X-Profile-Token': 's3cret'}
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return total
+
+
+def asgi_request(method, path, payload=None, headers=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]}
+    asyncio.run(asgi_app.app(scope, receive, send))
+    return sent[0]['status'], dict(sent[0]['headers']), sent[1]['body']
+
+
+def test_sampling_profiler():
+    """A busy thread dominates the samples; idle threads are dropped."""
+    worker = threading.Thread(target=busy_loop, args=(0.3,))
+    idle = threading.Event()
+    sleeper = threading.Thread(target=idle.wait, args=(5,))
+    sleeper.start()
+    profiler = SamplingProfiler(interval=0.002).start()
+    worker.start()
+    worker.join()
+    profiler.stop()
+    idle.set()
+    sleeper.join()
+
+    assert profiler.samples > 10
+    busy = sum(count for stack, count in profiler.stacks.items() if 'busy_loop' in stack)
+    assert busy / profiler.samples > 0.5
+    assert not any(stack.rsplit(';', 1)[-1].startswith('wait (threading.py')
+                   for stack in profiler.stacks)
+    for line in profiler.folded().splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0 and stack
+    assert 'busy_loop' in profiler.report()
+
+
+def test_request_profiles():
+    """?profile= saves a profile only when enabled and authorized."""
+    client = api.app.test_client()
+    original = api.profiler
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            api.profiler = None
+            response = client.post('/predict?profile=sample', json=TRADER, headers=TOKEN)
+            assert response.status_code == 200 and 'X-Profile-Id' not in response.headers
+
+            api.profiler = Profiling(token='s3cret', directory=tmp)
+            response = client.post('/predict?profile=sample', json=TRADER)
+            assert 'X-Profile-Id' not in response.headers
+            response = client.post('/predict?profile=sample', json=TRADER,
+                                   headers={'X-Profile-Token': 'wrong'})
+            assert 'X-Profile-Id' not in response.headers
+
+            response = client.post('/predict?profile=sample', json=TRADER, headers=TOKEN)
+            assert response.status_code == 200 and 'prediction' in response.get_json()
+            assert response.headers['X-Profile-File'].endswith('.folded')
+            assert os.sep not in response.headers['X-Profile-File']
+            assert os.path.exists(os.path.join(tmp, response.headers['X-Profile-File']))
+
+            response = client.post('/predict_batch?profile=cprofile&profile_output=inline',
+                                   json={'traders': [TRADER] * 50}, headers=TOKEN)
+            assert response.mimetype == 'text/plain'
+            assert 'predict_proba' in response.get_data(as_text=True)
+            stats = pstats.Stats(os.path.join(tmp, response.headers['X-Profile-File']))
+            assert stats.total_calls > 0
+
+            status, headers, body = asgi_request('POST', '/predict?profile=1', TRADER,
+                                                 headers=TOKEN)
+            assert status == 200 and 'prediction' in json.loads(body)
+            assert os.path.exists(os.path.join(tmp, headers[b'x-profile-file'].decode()))
+
+            # An inline report keeps the status of the request it profiled
+            response = client.post('/predict?profile=1&profile_output=inline',
+                                   json={'tx_count_365d': 1}, headers=TOKEN)
+            assert response.status_code == 400 and response.mimetype == 'text/plain'
+            status, headers, body = asgi_request('POST', '/predict?profile=1&profile_output=inline',
+                                                 {'tx_count_365d': 1}, headers=TOKEN)
+            assert status == 400 and headers[b'content-type'].startswith(b'text/plain')
+        finally:
+            api.profiler = original
+
+
+def test_admin_worker_profile():
+    """/admin/profile records in the background and serves the result."""
+    client = api.app.test_client()
+    original = api.profiler
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            api.profiler = None
+            assert client.get('/admin/profile?seconds=1', headers=TOKEN).status_code == 404
+
+            api.profiler = Profiling(token='s3cret', directory=tmp, worker_interval=0.002,
+                                     max_seconds=0.5)
+            assert client.get('/admin/profile?seconds=1').status_code == 403
+            for seconds in ('x', 'nan', 'inf', '-1'):
+                response = client.get(f'/admin/profile?seconds={seconds}', headers=TOKEN)
+                assert response.status_code == 400, seconds
+
+            started = client.get('/admin/profile?seconds=30', headers=TOKEN)
+            assert started.status_code == 202
+            body = started.get_json()
+            assert body['seconds'] == 0.5 and body['pid'] == os.getpid()
+            assert body['file'] == f"{body['id']}.folded"
+            # One run at a time by default
+            assert client.get('/admin/profile?seconds=1', headers=TOKEN).status_code == 429
+            busy_loop(0.6)
+
+            result = client.get(body['result'], headers=TOKEN)
+            deadline = time.time() + 5
+            while result.status_code == 202 and time.time() < deadline:
+                time.sleep(0.05)
+                result = client.get(body['result'], headers=TOKEN)
+            assert result.status_code == 200 and result.mimetype == 'text/plain'
+            assert 'busy_loop' in result.get_data(as_text=True)
+
+            assert client.get(body['result']).status_code == 403
+            assert client.get('/admin/profile/no-such-id', headers=TOKEN).status_code == 404
+            assert client.get('/admin/profile/..%2Fapp.py', headers=TOKEN).status_code == 404
+
+            status, _, asgi_body = asgi_request('GET', body['result'], headers=TOKEN)
+            assert status == 200 and asgi_body == result.get_data()
+            assert client.get('/admin/profile?seconds=0.1', headers=TOKEN).status_code == 202
+        finally:
+            api.profiler = original
+
+
+def test_requires_token():
+    """Profiling never runs open: no token configured means every request is refused."""
+    client = api.app.test_client()
+    original = api.profiler
+    saved = {key: os.environ.get(key) for key in ('PROFILING_ENABLED', 'PROFILING_TOKEN')}
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.environ['PROFILING_ENABLED'] = 'true'
+            os.environ.pop('PROFILING_TOKEN', None)
+            try:
+                profiling_from_env()
+                assert False, "Expected ValueError"
+            except ValueError as e:
+                assert 'PROFILING_TOKEN' in str(e)
+            os.environ['PROFILING_TOKEN'] = 's3cret'
+            assert profiling_from_env().authorized('s3cret')
+
+            api.profiler = Profiling(token=None, directory=tmp)
+            assert not api.profiler.authorized(None) and not api.profiler.authorized('')
+            response = client.post('/predict?profile=sample', json=TRADER, headers=TOKEN)
+            assert response.status_code == 200 and 'X-Profile-Id' not in response.headers
+            assert client.get('/admin/profile?seconds=1').status_code == 403
+            assert client.get('/admin/profile?seconds=1', headers=TOKEN).status_code == 403
+            assert os.listdir(tmp) == []
+        finally:
+            api.profiler = original
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+if __name__ == "__main__":
+    test_sampling_profiler()
+    test_request_profiles()
+    test_admin_worker_profile()
+    test_requires_token()
+    print("✅ All profiling tests passed!")
@@ -0,0 +1,131 @@
+"""
+Test script for the model registry and hot reload
+Author: Jo$h
+
+Publishes models into a temporary registry, checks manifests, checksums
+and rollback, and swaps a new version into the running API while
+/predict requests keep arriving.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import app as api
+from features import FEATURE_COLUMNS
+from registry import ModelRegistry, ModelReloader, RegistryError
+from conftest import FEATURES_PATH, MODEL_PATH, TRADER, small_tree
+
+RESULTS_PATH = 'models/model_comparison_results.csv'
+
+
+def test_publish_verify_and_rollback():
+    """Versions are numbered, checksummed, and CURRENT can be moved back."""
+    from registry import metrics_from_results
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(os.path.join(tmp, 'registry'))
+        assert registry.current() is None and registry.versions() == []
+
+        metrics = metrics_from_results(RESULTS_PATH, 'Random Forest')
+        first = registry.publish(MODEL_PATH, FEATURES_PATH, metrics=metrics)
+        second = registry.publish(small_tree(tmp), FEATURES_PATH, notes='tree')
+        assert (first['version'], second['version']) == ('v0001', 'v0002')
+        assert registry.versions() == ['v0001', 'v0002']
+        assert registry.current() == 'v0002'
+        assert first['feature_names'] == FEATURE_COLUMNS
+        assert first['metrics']['ROC-AUC'] == metrics['ROC-AUC']
+        assert set(first['files']) == {'model.pkl', 'feature_names.pkl'}
+
+        registry.activate('v0001')
+        loaded = registry.load()
+        assert loaded.version == 'v0001' and loaded.load_seconds >= 0
+        assert loaded.warm_up()['status'] == 'ready'
+        assert set(loaded.warmup['batch_ms']) == {'1', '100', '1000'}
+
+        # A modified file is caught before it can be loaded or activated
+        with open(os.path.join(registry.root, 'v0002', 'model.pkl'), 'ab') as f:
+            f.write(b'\0')
+        for action in (registry.verify, registry.load, registry.activate):
+            try:
+                action('v0002')
+                assert False, "Expected RegistryError"
+            except RegistryError as e:
+                assert 'checksum mismatch' in str(e)
+        assert registry.current() == 'v0001'
+
+        try:
+            registry.load('v0099')
+            assert False, "Expected RegistryError"
+        except RegistryError:
+            pass
+
+
+def test_hot_reload_under_load():
+    """A new CURRENT is loaded, warmed up and swapped in without failed requests."""
+    original_active, original_reloader = api.active, api.reloader
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(os.path.join(tmp, 'registry'))
+        registry.publish(MODEL_PATH, FEATURES_PATH)
+        registry.publish(small_tree(tmp), FEATURES_PATH, activate=False)
+        registry.publish(MODEL_PATH, FEATURES_PATH, activate=False)
+        client = api.app.test_client()
+
+        try:
+            api.activate(registry.load('v0001'))
+            api.reloader = ModelReloader(registry, api.activate, interval=0.02,
+                                         active_version='v0001')
+            before = client.post('/predict', json=TRADER).get_json()
+
+            statuses = []
+            stop = threading.Event()
+
+            def hammer():
+                while not stop.is_set():
+                    statuses.append(client.post('/predict', json=TRADER).status_code)
+
+            threads = [threading.Thread(target=hammer) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            registry.activate('v0002')
+            deadline = time.time() + 10
+            while api.active.version != 'v0002' and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.1)
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            assert api.active.version == 'v0002'
+            assert statuses and set(statuses) == {200}
+            after = client.post('/predict', json=TRADER).get_json()
+            assert after['probability_good_trader'] != before['probability_good_trader']
+
+            health = client.get('/health').get_json()
+            assert health['model']['version'] == 'v0002'
+            assert health['model']['warmup']['status'] == 'ready'
+            assert health['model']['load_seconds'] >= 0
+            assert health['model_reload']['swaps'] == 1
+
+            # A corrupt version is rejected and the current one keeps serving
+            os.remove(os.path.join(registry.root, 'v0003', 'feature_names.pkl'))
+            with open(registry.current_path, 'w') as f:
+                f.write('v0003\n')
+            assert api.reloader.check() is False
+            assert api.active.version == 'v0002'
+            assert 'missing' in api.reloader.stats()['last_error']['error']
+            assert client.post('/predict', json=TRADER).status_code == 200
+        finally:
+            if api.reloader is not None:
+                api.reloader.stop()
+            api.reloader = original_reloader
+            api.activate(original_active)
+
+
+if __name__ == "__main__":
+    test_publish_verify_and_rollback()
+    test_hot_reload_under_load()
+    print("✅ All registry tests passed!")
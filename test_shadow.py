@@ -0,0 +1,146 @@
+"""
+Test script for shadow scoring and A/B splits
+Author: Jo$h
+
+Runs a small decision tree as the challenger to the served forest, checks
+agreement and delta statistics against a direct comparison, and checks
+that shadow scoring never changes API responses.
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+import app as api
+from registry import LoadedModel
+from shadow import ShadowScorer, TrafficSplit, parse_pairs
+from conftest import DATASET_PATH, TRADER, small_tree
+
+
+def tree_challenger(directory):
+    with open(small_tree(directory), 'rb') as f:
+        return LoadedModel(pickle.load(f), api.feature_names, source='tree.pkl')
+
+
+class BlockedModel:
+    """Challenger whose scoring waits until released, to fill the queue."""
+
+    def __init__(self, model):
+        self.model = model
+        self.release = threading.Event()
+
+    def predict_proba(self, X):
+        self.release.wait()
+        return self.model.predict_proba(X)
+
+
+def test_shadow_statistics():
+    """Agreement and deltas match a direct comparison; a full queue drops samples."""
+    dataset = pd.read_csv(DATASET_PATH).head(500)
+    X = dataset[api.feature_names].to_numpy(dtype=np.float64)
+    served = api.model.predict_proba(X)
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = tree_challenger(tmp)
+        log_path = os.path.join(tmp, 'shadow.jsonl')
+        scorer = ShadowScorer({'tree': tree, 'same': api.active}, fraction=1.0,
+                              log_path=log_path, seed=0)
+        for part in np.array_split(np.arange(len(X)), 5):
+            assert scorer.submit(X[part], served[part])
+        scorer.drain(timeout=30)
+
+        stats = scorer.stats()
+        assert stats['sampled'] == 5 and stats['dropped'] == 0
+        same = stats['models']['same']
+        assert same['rows'] == 500 and same['agreement_rate'] == 1.0
+        assert same['max_abs_delta'] == 0.0
+
+        expected = tree.model.predict_proba(X)
+        agreement = np.mean(np.argmax(expected, axis=1) == np.argmax(served, axis=1))
+        tree_stats = stats['models']['tree']
+        assert abs(tree_stats['agreement_rate'] - agreement) < 1e-6
+        assert abs(tree_stats['mean_abs_delta'] - np.abs(expected[:, 1] - served[:, 1]).mean()) < 1e-6
+        assert sum(tree_stats['abs_delta_histogram'].values()) == 500
+        assert tree_stats['cpu_seconds'] >= 0 and tree_stats['batches'] == 5
+
+        with open(log_path) as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 10 and {r['model'] for r in records} == {'tree', 'same'}
+
+        # A stalled challenger never blocks submit(); excess samples are dropped
+        blocked = BlockedModel(tree.model)
+        slow = ShadowScorer({'slow': LoadedModel(blocked, api.feature_names)},
+                            fraction=1.0, max_queue=2)
+        results = [slow.submit(X[:10], served[:10]) for _ in range(6)]
+        assert results.count(False) >= 3 and slow.stats()['dropped'] == results.count(False)
+        blocked.release.set()
+        slow.drain(timeout=10)
+
+        assert not any(ShadowScorer({}, fraction=0.0).sample() for _ in range(100))
+
+
+def test_traffic_split():
+    """Weights are honoured and keyed requests keep their arm."""
+    challengers = {'a': None, 'b': None}
+    split = TrafficSplit(challengers, {'a': 0.2, 'b': 0.1}, seed=1)
+    for _ in range(10_000):
+        split.choose()
+    served = split.stats()['served']
+    assert abs(served['a'] / 10_000 - 0.2) < 0.02
+    assert abs(served['b'] / 10_000 - 0.1) < 0.02
+    assert abs(served['control'] / 10_000 - 0.7) < 0.02
+
+    wallet = '0x15397c6d8ec5c41781636a3512a0f0d096d76512'
+    assert len({split.choose(wallet)[0] for _ in range(20)}) == 1
+
+    for weights in ({'c': 0.1}, {'a': 0.8, 'b': 0.3}):
+        try:
+            TrafficSplit(challengers, weights)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    assert parse_pairs('xgb=models/x.pkl, rf = registry:v0002') == {
+        'xgb': 'models/x.pkl', 'rf': 'registry:v0002'}
+
+
+def test_api_shadow_and_ab():
+    """Shadowed responses are unchanged; A/B responses come from the challenger."""
+    client = api.app.test_client()
+    batch = {'traders': [TRADER, dict(TRADER, tx_count_365d=3, active_weeks=1)]}
+    baseline = client.post('/predict', json=TRADER).get_json()
+    baseline_batch = client.post('/predict_batch', json=batch).get_json()
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = tree_challenger(tmp)
+        try:
+            api.shadow_scorer = ShadowScorer({'tree': tree}, fraction=1.0)
+            assert client.post('/predict', json=TRADER).get_json() == baseline
+            assert client.post('/predict_batch', json=batch).get_json() == baseline_batch
+            api.shadow_scorer.drain(timeout=10)
+            health = client.get('/health').get_json()
+            assert health['shadow']['models']['tree']['rows'] == 3
+
+            api.ab_split = TrafficSplit({'tree': tree}, {'tree': 1.0})
+            body = client.post('/predict', json=TRADER).get_json()
+            values = np.array([[TRADER[f] for f in api.feature_names]], dtype=np.float64)
+            assert body['ab_variant'] == 'tree'
+            assert body['probability_good_trader'] == tree.model.predict_proba(values)[0, 1]
+            assert client.post('/predict_batch', json=batch).get_json()['summary']['ab_variant'] == 'tree'
+            # Challenger answers are not shadow-scored against themselves
+            api.shadow_scorer.drain(timeout=10)
+            assert api.shadow_scorer.stats()['models']['tree']['rows'] == 3
+            assert client.get('/health').get_json()['ab_test']['served']['tree'] == 2
+        finally:
+            api.shadow_scorer = None
+            api.ab_split = None
+
+
+if __name__ == "__main__":
+    test_shadow_statistics()
+    test_traffic_split()
+    test_api_shadow_and_ab()
+    print("✅ All shadow tests passed!")
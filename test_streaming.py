@@ -0,0 +1,77 @@
+"""
+Test script for streaming, chunked file scoring
+Author: Jo$h
+
+Scores a slice of the bundled dataset chunk by chunk, including a run that
+crashes half way and is resumed from its checkpoint.
+"""
+
+import os
+import tempfile
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from predict import RoninTraderPredictor
+from streaming import score_stream
+from conftest import DATASET_PATH
+
+def read_any(path):
+    """Read a scored .csv or .parquet output."""
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+def check_resume(output_name):
+    """Crash on the third chunk, resume, and compare with a clean run."""
+    predictor = RoninTraderPredictor(engine='packed')
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'traders.csv')
+        pd.read_csv(DATASET_PATH).head(1000).to_csv(input_path, index=False)
+        output_path = os.path.join(tmp, output_name)
+
+        calls = []
+        def crash_on_third_chunk(chunk):
+            calls.append(len(chunk))
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return predictor.predict_batch(chunk, copy=False)
+
+        try:
+            score_stream(crash_on_third_chunk, input_path, output_path,
+                         chunksize=150, progress=False)
+        except KeyboardInterrupt:
+            pass
+        assert os.path.exists(output_path + '.checkpoint.json')
+
+        summary = predictor.score_file(input_path, output_path, chunksize=150,
+                                       progress=False)
+        assert summary['resumed_from'] == 300
+        assert summary['rows'] == 1000
+        assert not os.path.exists(output_path + '.checkpoint.json')
+
+        scored = read_any(output_path)
+        expected = predictor.predict_batch(pd.read_csv(input_path))
+        assert list(scored['wallet']) == list(expected['wallet'])
+        assert list(scored['prediction']) == list(expected['prediction'])
+
+def test_resume_csv_output():
+    """An interrupted CSV run resumes without duplicate or missing rows."""
+    check_resume('scored.csv')
+
+def test_resume_parquet_output():
+    """An interrupted Parquet run resumes without duplicate or missing rows."""
+    check_resume('scored.parquet')
+
+def test_predict_batch_without_copy():
+    """copy=False adds the prediction columns to the caller's frame."""
+    predictor = RoninTraderPredictor()
+    df = pd.read_csv(DATASET_PATH).head(20)
+    result = predictor.predict_batch(df, copy=False)
+
+    assert result is df
+    assert 'probability_good_trader' in df.columns
+
+if __name__ == "__main__":
+    test_resume_csv_output()
+    test_resume_parquet_output()
+    test_predict_batch_without_copy()
+    print("✅ All streaming scoring tests passed!")
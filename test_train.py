@@ -0,0 +1,77 @@
+"""
+Test script for the training pipeline
+Author: Jo$h
+
+Retrains candidates with train.py and checks the results match the
+notebook's (models/model_comparison_results.csv) and the artifacts land
+where the app expects them.
+"""
+
+import os
+import pickle
+import tempfile
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from train import FEATURE_COLUMNS, available_models, select_model, train
+
+RESULTS_PATH = "models/model_comparison_results.csv"
+
+def test_matches_notebook_results():
+    """Test-set metrics match the notebook run, and artifacts are written."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = train(output_dir=tmp, models=['Logistic Regression', 'Decision Tree'],
+                       cv=2, n_jobs=2, verbose=False)
+
+        expected = pd.read_csv(RESULTS_PATH).set_index('Model')
+        for _, row in result['results'].iterrows():
+            for metric in ('Accuracy', 'Precision', 'Recall', 'F1-Score', 'ROC-AUC'):
+                assert abs(row[metric] - expected.loc[row['Model'], metric]) < 1e-9, metric
+
+        assert result['best_model_name'] == 'Decision Tree'
+        assert os.path.exists(os.path.join(tmp, 'best_model_decision_tree.pkl'))
+        # Only Random Forests get a native copy
+        assert 'native' not in result['artifacts']
+        assert os.path.exists(os.path.join(tmp, 'training_timings.json'))
+        with open(os.path.join(tmp, 'feature_names.pkl'), 'rb') as f:
+            assert pickle.load(f) == FEATURE_COLUMNS
+        assert {'load', 'fit_and_cv', 'save', 'total'} <= set(result['timings'])
+        assert 'CV ROC-AUC' in result['results'].columns
+
+def test_latency_selection_skips_scaled_models():
+    """--max-auc-drop never ships a model that needs a scaler the API does not apply."""
+    results = pd.DataFrame({
+        'Model': ['Random Forest', 'Decision Tree', 'Logistic Regression'],
+        'ROC-AUC': [0.9646, 0.9500, 0.9640],
+        'p50 Latency (ms)': [0.20, 0.05, 0.01]
+    })
+    scaled = ['Logistic Regression']
+    assert select_model(results, 0.001, scaled=scaled) == 'Random Forest'
+    assert select_model(results, 0.05, scaled=scaled) == 'Decision Tree'
+    assert select_model(results, 0.05) == 'Logistic Regression'
+    try:
+        select_model(results[results['Model'] == 'Logistic Regression'], 0.05, scaled=scaled)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = train(output_dir=tmp, models=['Logistic Regression', 'Decision Tree'],
+                       cv=0, n_jobs=1, verbose=False, max_auc_drop=1.0)
+        assert result['best_model_name'] == 'Decision Tree' and result['scaler'] is None
+        assert not os.path.exists(os.path.join(tmp, 'scaler.pkl'))
+
+def test_unknown_model():
+    """Asking for a model that does not exist is an error."""
+    try:
+        available_models(['Neural Net'])
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for unknown model")
+
+if __name__ == "__main__":
+    test_matches_notebook_results()
+    test_latency_selection_skips_scaled_models()
+    test_unknown_model()
+    print("✅ All training pipeline tests passed!")
@@ -0,0 +1,62 @@
+"""
+Test script for the hyperparameter search
+Author: Jo$h
+
+Runs a small successive-halving search twice on a sample of the dataset
+and checks the second run (and a run resumed after losing some trials)
+is served from the trial cache.
+"""
+
+import os
+import tempfile
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+from tuning import SEARCH_SPACES, TrialCache, rung_sizes, sample_configs, tune
+from conftest import DATASET_PATH
+
+def small_dataset(directory, rows=600):
+    path = os.path.join(directory, 'sample.csv')
+    pd.read_csv(DATASET_PATH).sample(rows, random_state=0).to_csv(path, index=False)
+    return path
+
+def run(data_path, cache_dir):
+    return tune(data_path, output=None, cache_dir=cache_dir, models=['Random Forest'],
+                n_candidates=4, eta=2, cv=2, n_jobs=1, verbose=False)
+
+def test_search_is_cached_and_resumable():
+    """Re-runs reuse every trial; deleted trials are retrained on resume."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = small_dataset(tmp)
+        cache_dir = os.path.join(tmp, 'cache')
+
+        first = run(data_path, cache_dir)
+        assert {'ROC-AUC', 'CV ROC-AUC', 'Fit Time (s)', 'Batch Latency (us/row)'} <= set(first.columns)
+        assert first['ROC-AUC'].is_monotonic_decreasing
+        assert (first['Single-Row Latency (ms)'] > 0).all()
+
+        entries = sorted(os.listdir(cache_dir))
+        second = run(data_path, cache_dir)
+        pd.testing.assert_frame_equal(first, second)
+        assert sorted(os.listdir(cache_dir)) == entries
+
+        # Simulate an interrupted run that only finished part of the trials
+        for name in entries[:3]:
+            os.remove(os.path.join(cache_dir, name))
+        resumed = run(data_path, cache_dir)
+        assert len(os.listdir(cache_dir)) == len(entries)
+        assert resumed['CV ROC-AUC'].tolist() == first['CV ROC-AUC'].tolist()
+
+def test_configs_and_rungs():
+    """The baseline config is always tried; the last round uses all rows."""
+    configs = sample_configs('Random Forest', 9)
+    assert configs[0] == {} and len(configs) == 9
+    assert set(configs[1]) == set(SEARCH_SPACES['Random Forest'])
+    assert rung_sizes(4000, 27, 3, 200) == [444, 1333, 4000]
+    assert TrialCache.key(a=1, b=2) == TrialCache.key(b=2, a=1)
+
+if __name__ == "__main__":
+    test_search_is_cached_and_resumable()
+    test_configs_and_rungs()
+    print("✅ All hyperparameter search tests passed!")
@@ -0,0 +1,442 @@
+"""
+Ronin Trader Classification - Training Pipeline
+Author: Jo$h
+
+Scriptable version of the training in notebooks/01_eda_and_training.ipynb.
+It uses the same stratified 80/20 split, the same candidate models and
+hyperparameters, and the same test-set metrics. It saves the best model by
+ROC-AUC with feature_names.pkl and model_comparison_results.csv, plus a
+pickle-free native copy of a winning Random Forest (see inference.py).
+
+Every candidate's final fit and each of its cross-validation folds is an
+independent task in one process pool, so models train concurrently and
+their folds do too. Wall-clock time per stage is saved to
+training_timings.json next to the other artifacts.
+
+Usage:
+    python train.py
+    python train.py --output models --cv 5 --jobs 4
+    python train.py --models "Random Forest" "Decision Tree"
+    python train.py --publish models/registry
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score
+)
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from features import FEATURE_COLUMNS
+from inference import PackedForest, native_path
+from parallel import default_workers
+
+
+TARGET_COLUMN = 'target_variable'
+TARGET_MAPPING = {'Good Trader': 1, 'Bad Trader': 0}
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+
+def _xgboost_classifier(**params):
+    import xgboost as xgb
+    return xgb.XGBClassifier(**params)
+
+
+# name -> (factory, params, needs scaled features); same settings as the notebook
+CANDIDATES = {
+    'Logistic Regression': (LogisticRegression,
+                            {'random_state': RANDOM_STATE, 'max_iter': 1000}, True),
+    'Decision Tree': (DecisionTreeClassifier,
+                      {'random_state': RANDOM_STATE, 'max_depth': 10,
+                       'min_samples_split': 20}, False),
+    'Random Forest': (RandomForestClassifier,
+                      {'n_estimators': 100, 'random_state': RANDOM_STATE,
+                       'max_depth': 15, 'min_samples_split': 10}, False),
+    'XGBoost': (_xgboost_classifier,
+                {'n_estimators': 100, 'max_depth': 10, 'learning_rate': 0.1,
+                 'random_state': RANDOM_STATE, 'eval_metric': 'logloss'}, False),
+}
+
+
+def available_models(names=None):
+    """
+    Candidate model names to train, dropping XGBoost if it is not installed.
+
+    Args:
+        names (list): Subset of CANDIDATES to train (default: all)
+
+    Returns:
+        list: Model names in CANDIDATES order
+    """
+    names = list(CANDIDATES) if names is None else list(names)
+    unknown = [name for name in names if name not in CANDIDATES]
+    if unknown:
+        raise ValueError(f"Unknown models {unknown}. Choose from {list(CANDIDATES)}")
+
+    if 'XGBoost' in names:
+        try:
+            import xgboost  # noqa: F401
+        except ImportError:
+            warnings.warn("xgboost is not installed; skipping the XGBoost candidate")
+            names.remove('XGBoost')
+    return [name for name in CANDIDATES if name in names]
+
+
+def load_dataset(path):
+    """
+    Load the training data (CSV, or Parquet as written by ingest.py).
+
+    Returns:
+        tuple: (X, y) with X the feature DataFrame and y the 0/1 target
+    """
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    X = df[FEATURE_COLUMNS]
+    y = df[TARGET_COLUMN].map(TARGET_MAPPING)
+    return X, y
+
+
+def split_dataset(X, y):
+    """The notebook's stratified 80/20 train/test split."""
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE,
+                            stratify=y)
+
+
+def build_model(name):
+    factory, params, _ = CANDIDATES[name]
+    return factory(**params)
+
+
+# Training data each worker process receives once at start-up
+_data = None
+
+
+def _init_worker(data):
+    global _data
+    warnings.filterwarnings('ignore')
+    _data = data
+
+
+def _fit(name, X_train, y_train, X_eval):
+    """Fit one candidate, scaling features first if it needs them."""
+    scaler = None
+    if CANDIDATES[name][2]:
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X_train)
+        X_eval = scaler.transform(X_eval)
+    model = build_model(name)
+    model.fit(X_train, y_train)
+    return model, scaler, X_eval
+
+
+def _run_task(task):
+    """
+    One unit of pool work: a cross-validation fold or a final fit.
+
+    Returns:
+        dict: Task identity, elapsed seconds and its result
+    """
+    name, fold = task
+    X_train, y_train, X_test, y_test, folds = (
+        _data['X_train'], _data['y_train'], _data['X_test'], _data['y_test'], _data['folds']
+    )
+    started = time.perf_counter()
+
+    if fold is not None:
+        train_idx, val_idx = folds[fold]
+        model, _, X_val = _fit(name, X_train.iloc[train_idx], y_train.iloc[train_idx],
+                               X_train.iloc[val_idx])
+        score = roc_auc_score(y_train.iloc[val_idx], model.predict_proba(X_val)[:, 1])
+        return {'model': name, 'fold': fold, 'seconds': time.perf_counter() - started,
+                'roc_auc': score}
+
+    model, scaler, X_eval = _fit(name, X_train, y_train, X_test)
+    fit_seconds = time.perf_counter() - started
+    pred = model.predict(X_eval)
+    pred_proba = model.predict_proba(X_eval)[:, 1]
+    metrics = {
+        'Accuracy': accuracy_score(y_test, pred),
+        'Precision': precision_score(y_test, pred),
+        'Recall': recall_score(y_test, pred),
+        'F1-Score': f1_score(y_test, pred),
+        'ROC-AUC': roc_auc_score(y_test, pred_proba)
+    }
+    return {'model': name, 'fold': None, 'seconds': time.perf_counter() - started,
+            'fit_seconds': fit_seconds, 'metrics': metrics,
+            'estimator': model, 'scaler': scaler}
+
+
+def train(data_path='data/ronin_traders_dataset.csv', output_dir='models',
+          models=None, cv=5, n_jobs=None, save=True, verbose=True,
+          profile=False, max_auc_drop=None):
+    """
+    Train, compare and (optionally) save the candidate models.
+
+    Args:
+        data_path (str): Training CSV
+        output_dir (str): Where artifacts are written
+        models (list): Candidate names to train (default: all available)
+        cv (int): Cross-validation folds on the training split (0 disables)
+        n_jobs (int): Worker processes (default: available CPUs)
+        save (bool): Write artifacts to output_dir
+        verbose (bool): Print progress
+        profile (bool): Measure each model's latency, artifact size and load time
+        max_auc_drop (float): Pick the fastest model (p50 single-row latency)
+            within this ROC-AUC of the best instead of the best; implies profile
+
+    Returns:
+        dict: results (comparison DataFrame, best first), best_model_name,
+        best_model, models (name -> fitted model), scaler, timings and
+        artifacts (paths written)
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    timings = {}
+    started = time.perf_counter()
+
+    def lap(stage, since):
+        timings[stage] = round(time.perf_counter() - since, 4)
+        return time.perf_counter()
+
+    names = available_models(models)
+    n_jobs = n_jobs or default_workers()
+
+    t = time.perf_counter()
+    X, y = load_dataset(data_path)
+    t = lap('load', t)
+
+    # Kept as DataFrames so fitted models record feature names, as in the notebook
+    X_train, X_test, y_train, y_test = split_dataset(X, y)
+    folds = []
+    if cv and cv > 1:
+        splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE)
+        folds = list(splitter.split(X_train, y_train))
+    t = lap('split', t)
+
+    log("=" * 80)
+    log(f"TRAINING {len(names)} MODELS - {len(X_train)} train / {len(X_test)} test rows, "
+        f"{len(folds)} CV folds, {n_jobs} workers")
+    log("=" * 80)
+
+    # Final fits first so the slowest candidates start as early as possible
+    tasks = [(name, None) for name in names]
+    tasks += [(name, fold) for name in names for fold in range(len(folds))]
+    data = {'X_train': X_train, 'y_train': y_train, 'X_test': X_test,
+            'y_test': y_test, 'folds': folds}
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(data,)) as executor:
+        outcomes = list(executor.map(_run_task, tasks))
+    t = lap('fit_and_cv', t)
+
+    fitted, scalers, rows = {}, {}, []
+    model_timings = {}
+    for name in names:
+        final = next(o for o in outcomes if o['model'] == name and o['fold'] is None)
+        cv_scores = [o['roc_auc'] for o in outcomes if o['model'] == name and o['fold'] is not None]
+        cv_seconds = sum(o['seconds'] for o in outcomes if o['model'] == name and o['fold'] is not None)
+
+        fitted[name] = final['estimator']
+        scalers[name] = final['scaler']
+        row = {'Model': name, **final['metrics']}
+        if cv_scores:
+            row['CV ROC-AUC'] = float(np.mean(cv_scores))
+            row['CV ROC-AUC Std'] = float(np.std(cv_scores))
+        rows.append(row)
+        model_timings[name] = {'fit': round(final['fit_seconds'], 4),
+                               'evaluate': round(final['seconds'] - final['fit_seconds'], 4),
+                               'cv_total': round(cv_seconds, 4)}
+        log(f"✅ {name} - Accuracy: {row['Accuracy']:.4f}, ROC-AUC: {row['ROC-AUC']:.4f}"
+            + (f", CV ROC-AUC: {row['CV ROC-AUC']:.4f}" if cv_scores else ""))
+
+    results_df = pd.DataFrame(rows).sort_values('ROC-AUC', ascending=False)
+    t = lap('compare', t)
+
+    if profile or max_auc_drop is not None:
+        # Sequential, in this process, so timings are not skewed by other fits
+        costs = profile_models(fitted, scalers, X_test, y_test)
+        results_df = results_df.merge(pd.DataFrame(costs), on='Model')
+        t = lap('profile', t)
+
+    best_model_name = select_model(results_df, max_auc_drop,
+                                   scaled=[name for name, scaler in scalers.items()
+                                           if scaler is not None])
+    best = results_df.set_index('Model').loc[best_model_name]
+    log(f"\n🏆 BEST MODEL: {best_model_name}")
+    log(f"   ROC-AUC Score: {best['ROC-AUC']:.4f}")
+    if max_auc_drop is not None:
+        log(f"   p50 latency: {best['p50 Latency (ms)']:.3f} ms "
+            f"(fastest within {max_auc_drop} ROC-AUC of the best)")
+
+    artifacts = {}
+    if save:
+        artifacts = save_artifacts(output_dir, best_model_name, fitted[best_model_name],
+                                   scalers[best_model_name], results_df)
+        for path in artifacts.values():
+            log(f"✅ Saved: {path}")
+    t = lap('save', t)
+
+    timings['total'] = round(time.perf_counter() - started, 4)
+    timings['models'] = model_timings
+    if save:
+        timings_path = os.path.join(output_dir, 'training_timings.json')
+        with open(timings_path, 'w') as f:
+            json.dump({'n_jobs': n_jobs, 'cv': len(folds), 'timings': timings}, f, indent=2)
+        artifacts['timings'] = timings_path
+
+    log("\nStage timings (wall clock):")
+    for stage in ('load', 'split', 'fit_and_cv', 'compare', 'profile', 'save', 'total'):
+        if stage in timings:
+            log(f"   {stage:<12} {timings[stage]:>8.3f}s")
+
+    return {
+        'results': results_df,
+        'best_model_name': best_model_name,
+        'best_model': fitted[best_model_name],
+        'models': fitted,
+        'scaler': scalers[best_model_name],
+        'timings': timings,
+        'artifacts': artifacts
+    }
+
+
+def profile_models(fitted, scalers, X_test, y_test):
+    """
+    Serving cost of each fitted model (see compression.profile_model).
+
+    Returns:
+        list: One dict of cost columns per model
+    """
+    from compression import pickle_artifact, profile_model
+
+    costs = []
+    for name, model in fitted.items():
+        X_eval = X_test if scalers[name] is None else scalers[name].transform(X_test)
+        measured = profile_model(model, X_eval, y_test, pickle_artifact(model))
+        costs.append({
+            'Model': name,
+            'p50 Latency (ms)': measured['p50_ms'],
+            'p99 Latency (ms)': measured['p99_ms'],
+            '10k Batch Latency (ms)': measured['batch_10k_ms'],
+            'Artifact Size (MB)': measured['size_mb'],
+            'Load Time (ms)': measured['load_ms']
+        })
+    return costs
+
+
+def select_model(results_df, max_auc_drop=None, scaled=()):
+    """
+    Name of the model to ship.
+
+    By default the highest ROC-AUC wins, as in the notebook. With
+    max_auc_drop, the model with the lowest p50 latency among those within
+    max_auc_drop of the best ROC-AUC wins. Models trained on scaled
+    features (`scaled`) are never picked that way: the API and predictor
+    feed them raw features, so their probabilities would be silently wrong.
+
+    Raises:
+        ValueError: If no unscaled model is within max_auc_drop
+    """
+    if max_auc_drop is None:
+        return results_df.sort_values('ROC-AUC', ascending=False).iloc[0]['Model']
+    best_auc = results_df['ROC-AUC'].max()
+    eligible = results_df[(results_df['ROC-AUC'] >= best_auc - max_auc_drop)
+                          & ~results_df['Model'].isin(list(scaled))]
+    if eligible.empty:
+        raise ValueError(f"No model that serves on raw features is within {max_auc_drop} "
+                         "ROC-AUC of the best")
+    return eligible.sort_values('p50 Latency (ms)').iloc[0]['Model']
+
+
+def save_artifacts(output_dir, best_model_name, best_model, scaler, results_df):
+    """
+    Write the artifacts the notebook's save cell writes.
+
+    Returns:
+        dict: Artifact name -> path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    artifacts = {}
+
+    model_path = os.path.join(output_dir,
+                              f'best_model_{best_model_name.lower().replace(" ", "_")}.pkl')
+    with open(model_path, 'wb') as f:
+        pickle.dump(best_model, f)
+    artifacts['model'] = model_path
+
+    # Logistic Regression is trained on scaled features
+    if scaler is not None:
+        scaler_path = os.path.join(output_dir, 'scaler.pkl')
+        with open(scaler_path, 'wb') as f:
+            pickle.dump(scaler, f)
+        artifacts['scaler'] = scaler_path
+
+    features_path = os.path.join(output_dir, 'feature_names.pkl')
+    with open(features_path, 'wb') as f:
+        pickle.dump(FEATURE_COLUMNS, f)
+    artifacts['feature_names'] = features_path
+
+    results_path = os.path.join(output_dir, 'model_comparison_results.csv')
+    results_df.to_csv(results_path, index=False)
+    artifacts['results'] = results_path
+
+    # Served in place of the pickle by app.py and predict.py while current
+    if isinstance(best_model, RandomForestClassifier):
+        row = results_df[results_df['Model'] == best_model_name].iloc[0]
+        artifacts['native'] = native_path(model_path)
+        PackedForest.from_sklearn(best_model).save(
+            artifacts['native'], feature_names=FEATURE_COLUMNS,
+            metrics={key: value for key, value in row.items() if pd.notna(value)},
+            model_name=best_model_name, source=model_path)
+    return artifacts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and compare Ronin trader models")
+    parser.add_argument('--data', default='data/ronin_traders_dataset.csv')
+    parser.add_argument('--output', default='models')
+    parser.add_argument('--models', nargs='+', help=f"Subset of {list(CANDIDATES)}")
+    parser.add_argument('--cv', type=int, default=5, help='Cross-validation folds (0 disables)')
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: available CPUs)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record latency, artifact size and load time per model')
+    parser.add_argument('--max-auc-drop', type=float,
+                        help='Ship the fastest model within this ROC-AUC of the best')
+    parser.add_argument('--publish', metavar='REGISTRY_DIR',
+                        help='Also publish the saved model as a new registry version')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
+    result = train(args.data, args.output, models=args.models, cv=args.cv, n_jobs=args.jobs,
+                   profile=args.profile, max_auc_drop=args.max_auc_drop)
+    print("\n", result['results'].to_string(index=False))
+
+    if args.publish:
+        from registry import ModelRegistry, metrics_from_results
+
+        artifacts = result['artifacts']
+        metrics = metrics_from_results(artifacts['results'], result['best_model_name'])
+        manifest = ModelRegistry(args.publish).publish(
+            artifacts['model'], artifacts['feature_names'], metrics=metrics,
+            notes=f"train.py: {result['best_model_name']}")
+        print(f"✅ Published {manifest['version']} to {args.publish}")
+
+
+if __name__ == "__main__":
+    main()
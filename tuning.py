@@ -0,0 +1,389 @@
+"""
+Ronin Trader Classification - Hyperparameter Search
+Author: Jo$h
+
+Successive-halving search over the Random Forest and XGBoost candidates.
+Each round scores every surviving configuration with stratified CV on a
+larger sample of the training split, and only the best 1/eta move on. The
+last round uses the full training split. Each survivor is then refit on
+the training split and scored on the notebook's test split.
+
+Every fold result and final fit is stored in an on-disk cache keyed by
+the training data's hash plus the model, parameters, sample size and fold.
+Re-running the search, or resuming one that was interrupted, only trains
+what is not in the cache yet. The leaderboard CSV has the same metric
+columns as models/model_comparison_results.csv, plus CV ROC-AUC, fit time
+and per-row inference latency. Latency is timed in the main process after
+the search, one finalist at a time, so busy workers do not inflate it.
+
+Usage:
+    python tuning.py
+    python tuning.py --models "Random Forest" --candidates 27 --eta 3 --jobs 4
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score
+)
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+
+from parallel import default_workers
+from train import CANDIDATES, RANDOM_STATE, available_models, load_dataset, split_dataset
+
+
+# Values tried for each tunable model; anything not listed keeps the notebook's setting
+SEARCH_SPACES = {
+    'Random Forest': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [6, 10, 15, 20, None],
+        'min_samples_split': [2, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 0.5, 1.0],
+    },
+    'XGBoost': {
+        'n_estimators': [50, 100, 200, 400],
+        'max_depth': [3, 6, 10],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0],
+        'colsample_bytree': [0.7, 1.0],
+    },
+}
+
+
+def dataset_hash(X, y):
+    """Short content hash of a feature matrix and its labels."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class TrialCache:
+    """
+    On-disk store of finished trials, one small JSON file per trial.
+
+    Files are written to a temporary name and renamed into place, so a run
+    killed mid-write never leaves a half-written entry behind.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Cache directory (created if missing)
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(**parts):
+        """Stable key for a trial described by JSON-serializable parts."""
+        encoded = json.dumps(parts, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        """Cached trial result, or None."""
+        try:
+            with open(self._path(key)) as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
+
+    def stats(self):
+        return {'directory': self.directory, 'hits': self.hits, 'misses': self.misses}
+
+
+def sample_configs(name, n_candidates, seed=RANDOM_STATE):
+    """
+    Draw parameter configurations for one model.
+
+    The first configuration is always {} (the notebook's settings), so the
+    leaderboard shows whether tuning beat the baseline.
+
+    Returns:
+        list: Parameter dicts (overrides of the notebook's settings)
+    """
+    space = SEARCH_SPACES[name]
+    n_total = math.prod(len(values) for values in space.values())
+    sampler = ParameterSampler(space, n_iter=min(n_candidates - 1, n_total), random_state=seed)
+    return [{}] + [dict(sorted(params.items())) for params in sampler]
+
+
+def rung_sizes(n_rows, n_candidates, eta, min_rows):
+    """
+    Training rows used in each halving round; the last round uses all rows.
+
+    Returns:
+        list: Row counts, smallest first
+    """
+    rounds = max(1, math.ceil(math.log(max(n_candidates, 1), eta)) + 1)
+    sizes = [int(n_rows / eta ** (rounds - 1 - r)) for r in range(rounds)]
+    return [size for size in sizes if size >= min_rows] or [n_rows]
+
+
+# Data each worker process receives once at start-up
+_data = None
+
+
+def _init_worker(data):
+    global _data
+    warnings.filterwarnings('ignore')
+    _data = data
+
+
+def _build(name, params):
+    factory, base, _ = CANDIDATES[name]
+    return factory(**{**base, **params})
+
+
+def _row_latency(model, X, repeats=50):
+    """Median seconds for single-row predict_proba calls."""
+    timings = []
+    for i in range(repeats):
+        row = X.iloc[[i % len(X)]]
+        started = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+def _run_trial(task):
+    """
+    Fit one fold (kind 'fold') or the final model on the full training
+    split (kind 'final'). Runs in a worker process.
+    """
+    kind, name, params, train_idx, val_idx = task
+    X_train, y_train = _data['X_train'], _data['y_train']
+    model = _build(name, params)
+
+    if kind == 'fold':
+        started = time.perf_counter()
+        model.fit(X_train.iloc[train_idx], y_train.iloc[train_idx])
+        fit_seconds = time.perf_counter() - started
+        proba = model.predict_proba(X_train.iloc[val_idx])[:, 1]
+        return {'roc_auc': float(roc_auc_score(y_train.iloc[val_idx], proba)),
+                'fit_seconds': fit_seconds}
+
+    X_test, y_test = _data['X_test'], _data['y_test']
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+
+    proba = model.predict_proba(X_test)
+    pred = model.classes_.take(np.argmax(proba, axis=1))
+    return {
+        'Accuracy': float(accuracy_score(y_test, pred)),
+        'Precision': float(precision_score(y_test, pred)),
+        'Recall': float(recall_score(y_test, pred)),
+        'F1-Score': float(f1_score(y_test, pred)),
+        'ROC-AUC': float(roc_auc_score(y_test, proba[:, 1])),
+        'Fit Time (s)': fit_seconds
+    }
+
+
+def time_finalist(name, params, X_train, y_train, X_test):
+    """
+    Refit one finalist and time its predictions.
+
+    Called in the parent once the worker pool has shut down, so the timings
+    are not skewed by other trials training at the same time.
+
+    Returns:
+        dict: Batch and single-row latency columns
+    """
+    model = _build(name, params)
+    model.fit(X_train, y_train)
+    model.predict_proba(X_test.iloc[:1])
+    started = time.perf_counter()
+    model.predict_proba(X_test)
+    batch_seconds = time.perf_counter() - started
+    return {
+        'Batch Latency (us/row)': batch_seconds / len(X_test) * 1e6,
+        'Single-Row Latency (ms)': _row_latency(model, X_test) * 1e3
+    }
+
+
+def _run_cached(executor, cache, tasks, keys):
+    """Run the tasks whose keys are not cached yet; return all results in order."""
+    results = [cache.get(key) for key in keys]
+    todo = [i for i, result in enumerate(results) if result is None]
+    for i, result in zip(todo, executor.map(_run_trial, [tasks[i] for i in todo])):
+        cache.put(keys[i], result)
+        results[i] = result
+    return results
+
+
+def successive_halving(executor, cache, name, X_train, y_train, data_id,
+                       n_candidates=27, eta=3, cv=3, min_rows=200, log=print):
+    """
+    Narrow a model's configurations down round by round.
+
+    Returns:
+        list: (params, cv_roc_auc) for the configurations that reached the
+        last round, best first
+    """
+    configs = sample_configs(name, n_candidates)
+    sizes = rung_sizes(len(X_train), len(configs), eta, min_rows)
+
+    for rung, n_rows in enumerate(sizes):
+        if n_rows < len(X_train):
+            subset, _ = train_test_split(np.arange(len(X_train)), train_size=n_rows,
+                                         random_state=RANDOM_STATE, stratify=y_train)
+        else:
+            subset = np.arange(len(X_train))
+        splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE)
+        folds = [(subset[tr], subset[va])
+                 for tr, va in splitter.split(subset, y_train.iloc[subset])]
+
+        tasks, keys = [], []
+        for params in configs:
+            for fold, (train_idx, val_idx) in enumerate(folds):
+                tasks.append(('fold', name, params, train_idx, val_idx))
+                keys.append(cache.key(data=data_id, model=name, params=params,
+                                      rows=int(n_rows), cv=cv, fold=fold))
+
+        started = time.perf_counter()
+        hits_before = cache.hits
+        results = _run_cached(executor, cache, tasks, keys)
+        scores = [float(np.mean([r['roc_auc'] for r in results[i * cv:(i + 1) * cv]]))
+                  for i in range(len(configs))]
+
+        ranked = sorted(zip(configs, scores), key=lambda item: item[1], reverse=True)
+        last = rung == len(sizes) - 1
+        keep = len(ranked) if last else max(1, math.ceil(len(ranked) / eta))
+        log(f"   round {rung + 1}/{len(sizes)}: {len(configs)} configs x {cv} folds on "
+            f"{n_rows:,} rows ({cache.hits - hits_before} cached) "
+            f"in {time.perf_counter() - started:.1f}s, best CV ROC-AUC {ranked[0][1]:.4f}")
+        configs = [params for params, _ in ranked[:keep]]
+        survivors = ranked[:keep]
+
+    return survivors
+
+
+def tune(data_path='data/ronin_traders_dataset.csv', output='models/tuning_leaderboard.csv',
+         cache_dir='models/tuning_cache', models=None, n_candidates=27, eta=3, cv=3,
+         n_jobs=None, verbose=True):
+    """
+    Run the search for each model and write the leaderboard.
+
+    Args:
+        data_path (str): Training CSV
+        output (str): Leaderboard CSV path (None to skip writing)
+        cache_dir (str): Trial cache directory
+        models (list): Models to tune (default: those in SEARCH_SPACES that are installed)
+        n_candidates (int): Configurations sampled per model
+        eta (int): Keep 1/eta of the configurations each round
+        cv (int): Folds per configuration and round
+        n_jobs (int): Worker processes (default: available CPUs)
+        verbose (bool): Print progress
+
+    Returns:
+        pd.DataFrame: Leaderboard, best test ROC-AUC first
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    names = [name for name in available_models(models or list(SEARCH_SPACES))
+             if name in SEARCH_SPACES]
+    if not names:
+        raise ValueError(f"No tunable models among {models}. Choose from {list(SEARCH_SPACES)}")
+
+    X, y = load_dataset(data_path)
+    X_train, X_test, y_train, y_test = split_dataset(X, y)
+    data_id = dataset_hash(pd.concat([X_train, X_test]), pd.concat([y_train, y_test]))
+    cache = TrialCache(cache_dir)
+    n_jobs = n_jobs or default_workers()
+    started = time.perf_counter()
+
+    log("=" * 80)
+    log(f"HYPERPARAMETER SEARCH - dataset {data_id}, {n_candidates} configs per model, "
+        f"eta={eta}, {cv} folds, {n_jobs} workers")
+    log("=" * 80)
+
+    data = {'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test}
+    finalists = []
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(data,)) as executor:
+        for name in names:
+            log(f"\n{name}:")
+            survivors = successive_halving(executor, cache, name, X_train, y_train, data_id,
+                                           n_candidates=n_candidates, eta=eta, cv=cv, log=log)
+
+            tasks = [('final', name, params, None, None) for params, _ in survivors]
+            keys = [cache.key(data=data_id, model=name, params=params, final=True)
+                    for params, _ in survivors]
+            for (params, cv_score), result in zip(survivors,
+                                                  _run_cached(executor, cache, tasks, keys)):
+                finalists.append((name, params, cv_score, result))
+
+    # Latency is timed one finalist at a time, with the pool gone
+    rows = []
+    for name, params, cv_score, result in finalists:
+        key = cache.key(data=data_id, model=name, params=params, final=True, timing=True)
+        timing = cache.get(key)
+        if timing is None:
+            timing = time_finalist(name, params, X_train, y_train, X_test)
+            cache.put(key, timing)
+        rows.append({'Model': name, 'Params': json.dumps(params), **result, **timing,
+                     'CV ROC-AUC': cv_score})
+
+    columns = ['Model', 'Params', 'Accuracy', 'Precision', 'Recall', 'F1-Score', 'ROC-AUC',
+               'CV ROC-AUC', 'Fit Time (s)', 'Batch Latency (us/row)', 'Single-Row Latency (ms)']
+    leaderboard = pd.DataFrame(rows, columns=columns).sort_values('ROC-AUC', ascending=False)
+
+    if output:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        leaderboard.to_csv(output, index=False)
+        log(f"\n✅ Leaderboard saved: {output}")
+    log(f"✅ Cache: {cache.hits} hits, {cache.misses} trained, "
+        f"{time.perf_counter() - started:.1f}s total")
+    return leaderboard
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search")
+    parser.add_argument('--data', default='data/ronin_traders_dataset.csv')
+    parser.add_argument('--output', default='models/tuning_leaderboard.csv')
+    parser.add_argument('--cache-dir', default='models/tuning_cache')
+    parser.add_argument('--models', nargs='+', help=f"Subset of {list(SEARCH_SPACES)}")
+    parser.add_argument('--candidates', type=int, default=27, help='Configs sampled per model')
+    parser.add_argument('--eta', type=int, default=3, help='Keep 1/eta configs per round')
+    parser.add_argument('--cv', type=int, default=3)
+    parser.add_argument('--jobs', type=int, help='Worker processes (default: available CPUs)')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
+    leaderboard = tune(args.data, args.output, args.cache_dir, models=args.models,
+                       n_candidates=args.candidates, eta=args.eta, cv=args.cv,
+                       n_jobs=args.jobs)
+    print("\n", leaderboard.drop(columns='Params').to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
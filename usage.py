@@ -1,9 +1,11 @@
+import json
 import os
-import requests
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
+from fetch_client import FetchClient
+
 load_dotenv()
 dune_api_key = os.getenv("DEFI_JOSH_DUNE_QUERY_API_KEY")
 
@@ -63,5 +65,7 @@ data = {
     "end_date": end_date
 }
 
-response = requests.post(url, json=data, headers=headers)
-print(response.json())
\ No newline at end of file
+# Pooled session with a timeout; the POST starts a query execution, so it is
+# sent once rather than retried into a duplicate run
+client = FetchClient(timeout=30, headers=headers)
+print(json.loads(client.request("POST", url, json=data)))